@@ -0,0 +1,120 @@
+"""
+Time opening a database and reading a conversation from the single chat_detail table,
+and the one-time migration of the per-chat chat_detail_<id> tables of older databases.
+
+    python benchmarks/bench_chat_detail_storage.py [--chats 100 1000 10000] [--messages 10] [--legacy]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QCoreApplication
+from PyQt6.QtSql import QSqlDatabase
+
+from util.Constants import Constants
+from util.SqliteDatabase import SqliteDatabase
+
+LEGACY_CHAT_DETAIL_TABLE = """
+  CREATE TABLE {table_name}
+    (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        chat_main_id INTEGER NOT NULL,
+        chat_type TEXT,
+        chat_model TEXT,
+        chat TEXT,
+        elapsed_time TEXT,
+        finish_reason TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+def get_rows(chat_main_id, messages):
+    for index in range(messages):
+        chat_type = "Human" if index % 2 == 0 else "AI"
+        yield chat_main_id, chat_type, "model", f"message {index} of chat {chat_main_id} " * 10, "1.0", "stop"
+
+
+def fill_database(db_filename, chats, messages, legacy):
+    # Rows are written directly so that only opening and reading are timed
+    connection = sqlite3.connect(db_filename)
+    with connection:
+        connection.executemany(f"INSERT INTO {Constants.CHAT_MAIN_TABLE} (id, title) VALUES (?, ?)",
+                               ((chat_main_id, f"chat {chat_main_id}") for chat_main_id in range(1, chats + 1)))
+        for chat_main_id in range(1, chats + 1):
+            if legacy:
+                table_name = f"{Constants.CHAT_DETAIL_TABLE}_{chat_main_id}"
+                connection.execute(LEGACY_CHAT_DETAIL_TABLE.format(table_name=table_name))
+            else:
+                table_name = Constants.CHAT_DETAIL_TABLE
+            connection.executemany(
+                f"INSERT INTO {table_name} "
+                f"(chat_main_id, chat_type, chat_model, chat, elapsed_time, finish_reason) VALUES (?, ?, ?, ?, ?, ?)",
+                get_rows(chat_main_id, messages))
+    connection.close()
+
+
+def close_database(database):
+    # Release the Qt connection so the next SqliteDatabase can take over the default connection name
+    database.close()
+    database.db.close()
+    database.db = None
+    QSqlDatabase.removeDatabase(QSqlDatabase.database(open=False).connectionName())
+
+
+def measure(directory, chats, messages, legacy, repeat):
+    db_filename = os.path.join(directory, f"chats_{chats}_{'legacy' if legacy else 'current'}.db")
+    # Create the schema first, then fill it
+    close_database(SqliteDatabase(db_filename))
+    fill_database(db_filename, chats, messages, legacy)
+
+    start = time.perf_counter()
+    database = SqliteDatabase(db_filename)
+    database.get_all_chat_main_list()
+    first_open = time.perf_counter() - start
+    close_database(database)
+
+    open_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        database = SqliteDatabase(db_filename)
+        database.get_all_chat_main_list()
+        open_times.append(time.perf_counter() - start)
+        close_database(database)
+
+    database = SqliteDatabase(db_filename)
+    detail_times = []
+    for index in range(repeat * 10):
+        chat_main_id = index * 7919 % chats + 1
+        start = time.perf_counter()
+        database.get_all_chat_details_list(chat_main_id)
+        detail_times.append(time.perf_counter() - start)
+    close_database(database)
+    return first_open, min(open_times), sorted(detail_times)[len(detail_times) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chats", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--messages", type=int, default=10, help="messages per chat")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--legacy", action="store_true",
+                        help="store the messages in chat_detail_<id> tables, the first open migrates them")
+    args = parser.parse_args()
+
+    _app = QCoreApplication(sys.argv[:1])
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'chats':>7}  {'first open':>12}  {'open':>10}  {'details':>10}")
+        for chats in args.chats:
+            first_open, open_time, detail_time = measure(directory, chats, args.messages, args.legacy, args.repeat)
+            print(f"{chats:>7}  {first_open * 1000:>9.1f} ms  {open_time * 1000:>7.1f} ms  "
+                  f"{detail_time * 1000:>7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Micro-benchmark of the SqliteDatabase reads and writes that run while chatting: inserting messages,
+reading a page of a conversation, reading its summary and searching the messages.
+
+    python benchmarks/bench_database_queries.py [--rows 20000] [--chats 20] [--repeat 3000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QCoreApplication
+
+from util.Constants import Constants
+from util.SqliteDatabase import SqliteDatabase
+
+MESSAGE_TEXT = "lorem ipsum dolor " * 40
+
+
+def time_loop(count, function):
+    start = time.perf_counter()
+    for index in range(count):
+        function(index)
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000, help="messages of about 750 bytes")
+    parser.add_argument("--chats", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3000)
+    args = parser.parse_args()
+
+    _app = QCoreApplication(sys.argv[:1])
+    with tempfile.TemporaryDirectory() as directory:
+        database = SqliteDatabase(os.path.join(directory, "queries.db"))
+        chats = [database.add_chat_main(f"chat {index}") for index in range(args.chats)]
+        for chat_main_id in chats:
+            database.save_chat_summary(chat_main_id, 0, "summary", 10)
+
+        # Queued on the writer and committed in batches
+        insert_string = (f"INSERT INTO {Constants.CHAT_DETAIL_TABLE} "
+                         f"(chat_main_id, chat_type, chat_model, chat, elapsed_time, finish_reason) "
+                         f"VALUES (:chat_main_id, 'AI', 'model', :chat, '1.0', 'stop')")
+        start = time.perf_counter()
+        for index in range(args.rows):
+            database.writer.execute(insert_string, {"chat_main_id": chats[index % args.chats],
+                                                    "chat": f"message {index} {MESSAGE_TEXT}"})
+        database.flush()
+        batched = args.rows / (time.perf_counter() - start)
+
+        # One at a time, waiting for the id like the app does for every message
+        inserts = max(args.rows // 20, 1)
+        start = time.perf_counter()
+        for index in range(inserts):
+            database.insert_chat_detail(chats[index % args.chats], "AI", "model", f"message {index} {MESSAGE_TEXT}",
+                                        1.0, "stop")
+        single = inserts / (time.perf_counter() - start)
+
+        page = time_loop(args.repeat, lambda index: database.get_chat_details_page(chats[index % args.chats],
+                                                                                   limit=20))
+        summary = time_loop(args.repeat, lambda index: database.get_chat_summary(chats[index % args.chats]))
+        search = time_loop(max(args.repeat // 10, 1), lambda index: database.search_messages(f"message {index}"))
+        database.close()
+
+    print(f"insert (writer batch)   {batched:>10,.0f} rows/s")
+    print(f"insert_chat_detail      {single:>10,.0f} rows/s")
+    print(f"20-row page select      {page * 1e6:>10.0f} us")
+    print(f"summary select          {summary * 1e6:>10.0f} us")
+    print(f"message search          {search * 1e3:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Time rendering long AI answers: the first render, streaming, rendering again after a chat switch, and
+reopening a chat and scrolling through it.
+
+    python benchmarks/bench_markdown_render.py [--size 100000] [--messages 60]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication, QListView
+
+from custom.ChatMessageDelegate import ChatMessageDelegate
+from custom.ChatMessageModel import ChatMessageModel
+from custom.IncrementalMarkdownDocument import IncrementalMarkdownDocument
+from util.ChatType import ChatType
+
+WORDS = ["alpha", "beta", "**bold**", "`inline`", "gamma", "delta"]
+FENCES = [("```python\n", "```\n"), ("```\n", "```\n"), ("~~~js\n", "~~~\n"), ("````\n", "````\n"),
+          ("   ```c++ title=x\n", "```\n")]
+
+
+def create_answer(size, rnd):
+    """Return an answer of about `size` characters alternating paragraphs and code blocks, and its block count."""
+    parts = []
+    length = 0
+    while length < size:
+        paragraph = " ".join(rnd.choice(WORDS) for _ in range(40)) + "\n\n"
+        opening, closing = rnd.choice(FENCES)
+        code = "".join(f"def f{len(parts)}_{index}(x):\n    return x * {index}  # <tag> & stuff\n" for index in range(8))
+        part = paragraph + opening + code + closing + "\n"
+        parts.append(part)
+        length += len(part)
+    return "".join(parts), len(parts)
+
+
+def time_once(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def stream(delegate, text, chunk_size):
+    document = IncrementalMarkdownDocument(delegate.code_block_format, delegate.code_char_format)
+    for position in range(0, len(text), chunk_size):
+        document.append_markdown(text[position:position + chunk_size])
+    document.finish()
+    return document
+
+
+def scroll_through(app, view, model, delegate, messages):
+    # Reopening a chat clears the model and the per-row cache, like ChatView.clear_all
+    model.clear()
+    delegate.clear_cache()
+    model.set_messages([{"chat_type": chat_type, "chat": text} for chat_type, text in messages])
+    for row in range(model.rowCount()):
+        view.scrollTo(model.index(row, 0))
+        app.processEvents()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100000, help="characters of the long answer")
+    parser.add_argument("--messages", type=int, default=60, help="messages of the reopened chat")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+    with tempfile.TemporaryDirectory() as directory:
+        # The delegate reads its style from the settings, keep them out of the working tree
+        os.chdir(directory)
+        view = QListView()
+        model = ChatMessageModel()
+        delegate = ChatMessageDelegate(view)
+        rnd = random.Random(0)
+
+        text, block_count = create_answer(args.size, rnd)
+        print(f"answer of {len(text)} characters with {block_count} code blocks")
+        _, render_time = time_once(lambda: delegate.get_document(model.create_message(ChatType.AI, text), 800))
+        print(f"first render               {render_time * 1000:8.1f} ms")
+        _, stream_time = time_once(lambda: stream(delegate, text, 40))
+        print(f"streamed in 40-char chunks {stream_time * 1000:8.1f} ms")
+        _, stream_time = time_once(lambda: stream(delegate, text, 4))
+        print(f"streamed in 4-char chunks  {stream_time * 1000:8.1f} ms")
+        delegate.clear_cache()
+        _, again_time = time_once(lambda: delegate.get_document(model.create_message(ChatType.AI, text), 800))
+        print(f"render after a chat switch {again_time * 1000:8.2f} ms")
+
+        messages = []
+        for index in range(args.messages):
+            if index % 2 == 0:
+                messages.append((ChatType.HUMAN, f"question {index}"))
+            else:
+                messages.append((ChatType.AI, create_answer(rnd.randint(500, 5000), rnd)[0]))
+        view.setModel(model)
+        view.setItemDelegate(delegate)
+        view.resize(900, 700)
+        view.show()
+        for attempt in ["first open", "reopen"]:
+            _, scroll_time = time_once(lambda: scroll_through(app, view, model, delegate, messages))
+            label = f"{attempt}, {args.messages} messages"
+            print(f"{label:<26} {scroll_time * 1000:8.1f} ms")
+        view.close()
+
+
+if __name__ == "__main__":
+    main()
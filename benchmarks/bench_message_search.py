@@ -0,0 +1,116 @@
+"""
+Time the full-text message search against a LIKE scan of chat_detail on a synthetic corpus.
+
+    python benchmarks/bench_message_search.py [--messages 100000] [--words 40] [--database path]
+
+A database given with --database is kept, so a large corpus only has to be built once.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QCoreApplication
+from PyQt6.QtSql import QSqlQuery
+
+from util.Constants import Constants
+from util.SqliteDatabase import SqliteDatabase
+
+CHATS = 1000
+RARE_WORD = "zebrafish"
+RARE_WORD_COUNT = 10
+VOCABULARY = [f"w{index}" for index in range(5000)] + ["python", "asyncio", "database", "widget", "thread"]
+QUERIES = [RARE_WORD, "python", "python asyncio", "w123", "nomatchanywhere"]
+
+
+def get_rows(messages, words, rnd):
+    rare_rows = set(rnd.sample(range(messages), RARE_WORD_COUNT))
+    for index in range(messages):
+        text = " ".join(rnd.choice(VOCABULARY) for _ in range(words))
+        if index in rare_rows:
+            text += f" {RARE_WORD}"
+        yield {"chat_main_id": index % CHATS + 1, "chat_type": "Human" if index % 2 == 0 else "AI",
+               "chat_model": "model", "chat": text, "elapsed_time": "1.0", "finish_reason": "stop"}
+
+
+def fill_database(database, messages, words):
+    # One transaction on the Qt connection, the triggers index the rows as they are inserted
+    database.db.transaction()
+    query = QSqlQuery(db=database.db)
+    query.prepare(f"INSERT INTO {Constants.CHAT_MAIN_TABLE} (id, title) VALUES (:id, :title)")
+    for chat_main_id in range(1, CHATS + 1):
+        query.bindValue(":id", chat_main_id)
+        query.bindValue(":title", f"chat {chat_main_id}")
+        query.exec()
+    query.prepare(f"INSERT INTO {Constants.CHAT_DETAIL_TABLE} "
+                  f"(chat_main_id, chat_type, chat_model, chat, elapsed_time, finish_reason) "
+                  f"VALUES (:chat_main_id, :chat_type, :chat_model, :chat, :elapsed_time, :finish_reason)")
+    for row in get_rows(messages, words, random.Random(0)):
+        for name, value in row.items():
+            query.bindValue(f":{name}", value)
+        query.exec()
+    database.db.commit()
+
+
+def count_messages(database):
+    query = QSqlQuery(f"SELECT COUNT(*) FROM {Constants.CHAT_DETAIL_TABLE}", database.db)
+    return query.value(0) if query.next() else 0
+
+
+def time_call(function, repeat):
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return result, sorted(times)[len(times) // 2]
+
+
+def like_scan(database, text):
+    query = QSqlQuery(db=database.db)
+    query.prepare(f"SELECT id FROM {Constants.CHAT_DETAIL_TABLE} WHERE chat LIKE :text ORDER BY id DESC LIMIT :limit")
+    query.bindValue(":text", f"%{text}%")
+    query.bindValue(":limit", Constants.MESSAGE_SEARCH_LIMIT)
+    ids = []
+    if query.exec():
+        while query.next():
+            ids.append(query.value(0))
+    return ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--words", type=int, default=40, help="words per message")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database", help="database file to build the corpus in, or to reuse")
+    args = parser.parse_args()
+
+    _app = QCoreApplication(sys.argv[:1])
+    with tempfile.TemporaryDirectory() as directory:
+        db_filename = args.database or os.path.join(directory, "search.db")
+        database = SqliteDatabase(db_filename)
+        if count_messages(database) == 0:
+            start = time.perf_counter()
+            fill_database(database, args.messages, args.words)
+            print(f"built {args.messages} messages in {time.perf_counter() - start:.1f} s, "
+                  f"{os.path.getsize(db_filename) / 1e6:.0f} MB")
+
+        print(f"{'query':<18}{'hits':>6}  {'LIKE scan':>10}  {'search':>10}")
+        for text in QUERIES:
+            results, search_time = time_call(lambda: database.search_messages(text), args.repeat)
+            like_time = ""
+            if " " not in text:
+                _, like_time = time_call(lambda: like_scan(database, text), 1)
+                like_time = f"{like_time * 1000:.1f} ms"
+            print(f"{text:<18}{len(results):>6}  {like_time:>10}  {search_time * 1000:>7.1f} ms")
+        database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from PyQt6.QtCore import pyqtSlot
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QDialog, QMessageBox
 
+from chat.model.ConversationStore import ConversationStore
 from chat.model.SwarmModel import SwarmModel
 from chat.view.ChatView import ChatView
 from custom.ChatListModel import ChatListModel
@@ -17,13 +18,24 @@ class ChatPresenter(QWidget):
     def __init__(self):
         super().__init__()
         self._chat_main_id = None
+        self.oldest_chat_detail_id = None
+        self.has_older_chat_detail = False
+        self.loading_older_chat_detail = False
+        self.message_search_text = ""
+        self.run_responses = {}
         self.initialize_manager()
         self.initialize_ui()
 
     def initialize_manager(self):
         self._settings = SettingsManager.get_settings()
         self._database = DataManager.get_database()
+        self.conversation_store = ConversationStore(self._database)
         self.llm = Utility.get_settings_value(section="AI_Provider", prop="llm", default="OpenAI", save=True)
+        self.max_concurrent_runs = int(Utility.get_settings_value(section="Run_Option", prop="max_concurrent_runs",
+                                                                  default=Constants.MAX_CONCURRENT_RUNS,
+                                                                  save=True))
+        self.execution_mode = Utility.get_settings_value(section="Run_Option", prop="execution_mode",
+                                                         default=Constants.EXECUTION_MODE_THREAD, save=True)
 
     def initialize_ui(self):
 
@@ -34,21 +46,24 @@ class ChatPresenter(QWidget):
         self.chatView = ChatView(self.chatViewModel)
 
         # Model
-        self.swarmModel = SwarmModel()
-        self.swarmModel.thread_started_signal.connect(self.chatView.start_chat)
-        self.swarmModel.thread_finished_signal.connect(self.chatView.finish_chat)
-        self.swarmModel.response_signal.connect(self.chatView.update_ui)
+        self.swarmModel = SwarmModel(self.max_concurrent_runs, self.execution_mode)
+        self.swarmModel.thread_finished_signal.connect(self.handle_thread_finished_signal)
+        self.swarmModel.response_signal.connect(self.handle_response_signal)
         self.swarmModel.response_finished_signal.connect(self.handle_response_finished_signal)
+        self.swarmModel.chat_summary_signal.connect(self.handle_chat_summary_signal)
+        self.swarmModel.run_error_signal.connect(self.handle_run_error_signal)
 
         # View signal
         self.chatView.submitted_signal.connect(self.submit)
-        self.chatView.stop_signal.connect(self.swarmModel.force_stop)
+        self.chatView.stop_signal.connect(self.stop_chat)
         self.chatView.reload_chat_detail_signal.connect(self.show_chat_detail)
+        self.chatView.load_older_chat_detail_signal.connect(self.load_older_chat_detail)
 
         self.chatView.chat_history.new_chat_signal.connect(self.create_new_chat)
         self.chatView.chat_history.delete_chat_signal.connect(self.confirm_delete_chat)
         self.chatView.chat_history.chat_list.delete_id_signal.connect(self.delete_chat_table)
         self.chatView.chat_history.filter_signal.connect(self.filter_list)
+        self.chatView.chat_history.message_search_result_signal.connect(self.show_message_search_result)
         self.chatView.set_default_tab(self.llm)
 
         self.initialize_chat_history()
@@ -65,16 +80,58 @@ class ChatPresenter(QWidget):
 
     def set_chat_main_id(self, chat_main_id):
         self.chat_main_id = chat_main_id
+        self.has_older_chat_detail = False
         self.view.clear_all()
-
-    @pyqtSlot(str, str, float, bool)
-    def handle_response_finished_signal(self, model, finish_reason, elapsed_time, stream):
-        last_ai_widget = self.view.get_last_ai_widget()
-        if last_ai_widget:
+        self.view.set_running(False)
+
+    @pyqtSlot(int, str, bool)
+    def handle_response_signal(self, chat_main_id, result, stream):
+        run_response = self.run_responses.get(chat_main_id)
+        if run_response is None:
+            return
+        run_response['text_result'].append(result)
+        if chat_main_id == self.chat_main_id:
+            self.chatView.update_ui(result, stream)
+
+    @pyqtSlot(int, str, str, float, bool, object)
+    def handle_response_finished_signal(self, chat_main_id, model, finish_reason, elapsed_time, stream, trace):
+        run_response = self.run_responses.get(chat_main_id)
+        if run_response is None:
+            return
+        self._database.add_run_stats(model, trace.get('agent') if trace else None, finish_reason, elapsed_time, trace)
+        if not run_response['text_result']:
+            return
+        chat_detail_id = self._database.insert_chat_detail(chat_main_id, ChatType.AI.value, model,
+                                                           "".join(run_response['text_result']), elapsed_time,
+                                                           finish_reason)
+        if chat_detail_id is not None and trace:
+            self._database.save_chat_trace(chat_detail_id, trace)
+        self.conversation_store.append_message(chat_main_id, chat_detail_id, ChatType.AI.value,
+                                               "".join(run_response['text_result']))
+        if chat_main_id == self.chat_main_id:
             self.chatView.update_ui_finish(model, finish_reason, elapsed_time, stream)
-            self._database.insert_chat_detail(self.chat_main_id, ChatType.AI.value, model,
-                                              self.view.get_last_ai_widget().get_original_text(), elapsed_time,
-                                              finish_reason)
+
+    @pyqtSlot(int, str, str, float)
+    def handle_run_error_signal(self, chat_main_id, model, agent, elapsed_time):
+        if chat_main_id in self.run_responses:
+            self._database.add_run_stats(model, agent, Constants.ERROR_STOP, elapsed_time)
+
+    @pyqtSlot(int, object)
+    def handle_chat_summary_signal(self, chat_main_id, chat_summary):
+        if chat_main_id in self.run_responses:
+            self._database.save_chat_summary(chat_main_id, chat_summary['last_chat_detail_id'],
+                                             chat_summary['summary'], chat_summary['token_count'])
+
+    @pyqtSlot(int)
+    def handle_thread_finished_signal(self, chat_main_id):
+        self.run_responses.pop(chat_main_id, None)
+        if chat_main_id == self.chat_main_id:
+            self.chatView.set_running(False)
+
+    @pyqtSlot()
+    def stop_chat(self):
+        if self.chat_main_id is not None:
+            self.swarmModel.force_stop(self.chat_main_id)
 
     @property
     def model(self):
@@ -94,9 +151,14 @@ class ChatPresenter(QWidget):
 
     @pyqtSlot(int)
     def clear_chat(self, delete_id):
+        self.run_responses.pop(delete_id, None)
+        self.swarmModel.force_stop(delete_id)
+        self.conversation_store.remove(delete_id)
         if self.chat_main_id == delete_id:
             self.chat_main_id = None
+            self.has_older_chat_detail = False
             self.view.clear_all()
+            self.view.set_running(False)
 
     @pyqtSlot()
     def confirm_delete_chat(self):
@@ -116,6 +178,15 @@ class ChatPresenter(QWidget):
     @pyqtSlot(str)
     def filter_list(self, text):
         self.chatViewModel.filter_by_title(text)
+        self.message_search_text = text
+        self.chatView.chat_history.set_message_search_results(self._database.search_messages(text))
+
+    @pyqtSlot(int, int)
+    def show_message_search_result(self, chat_main_id, chat_detail_id):
+        self.show_chat_detail(chat_main_id)
+        while self.has_older_chat_detail and self.oldest_chat_detail_id > chat_detail_id:
+            self.load_older_chat_detail()
+        self.view.show_search_result(self.message_search_text, chat_detail_id)
 
     def show_chat_detail(self, id):
         if id == -1:
@@ -126,16 +197,45 @@ class ChatPresenter(QWidget):
 
     def get_chat_detail(self, id):
         self.view.clear_all()
-        self.view.reset_search_bar()
-        chat_detail_list = self._database.get_all_chat_details_list(id)
+        chat_detail_list = self._database.get_chat_details_page(id)
+        self.update_chat_detail_paging(chat_detail_list)
+        self.view.set_messages(self.to_view_messages(chat_detail_list))
+
+        # A run still in flight for this chat shows what it has streamed so far
+        run_response = self.run_responses.get(id)
+        if run_response is not None and run_response['text_result']:
+            self.view.update_ui("".join(run_response['text_result']), run_response['stream'])
+        self.view.set_running(run_response is not None)
+
+    def load_older_chat_detail(self):
+        if not self.has_older_chat_detail or self.loading_older_chat_detail:
+            return
+        self.loading_older_chat_detail = True
+        try:
+            chat_detail_list = self._database.get_chat_details_page(self.chat_main_id,
+                                                                    before_id=self.oldest_chat_detail_id)
+            self.update_chat_detail_paging(chat_detail_list)
+            self.view.prepend_messages(self.to_view_messages(chat_detail_list))
+        finally:
+            self.loading_older_chat_detail = False
+
+    def update_chat_detail_paging(self, chat_detail_list):
+        self.has_older_chat_detail = len(chat_detail_list) == Constants.CHAT_DETAIL_PAGE_SIZE
+        if chat_detail_list:
+            self.oldest_chat_detail_id = chat_detail_list[0]['id']
+
+    def to_view_messages(self, chat_detail_list):
+        messages = []
         for chat_detail in chat_detail_list:
             if chat_detail['chat_type'] == ChatType.HUMAN.value:
-                self.view.add_user_question(ChatType.HUMAN, chat_detail['chat'])
+                messages.append({'chat_type': ChatType.HUMAN, 'chat': chat_detail['chat'],
+                                 'chat_detail_id': chat_detail['id']})
             else:
-                self.view.add_user_question(ChatType.AI, chat_detail['chat'])
-                self.view.get_last_ai_widget().set_model_name(
-                    Constants.MODEL_PREFIX + chat_detail['chat_model']
-                    + Constants.RESPONSE_TIME + format(float(chat_detail['elapsed_time']), ".2f"))
+                messages.append({'chat_type': ChatType.AI, 'chat': chat_detail['chat'],
+                                 'chat_detail_id': chat_detail['id'],
+                                 'model_name': Constants.MODEL_PREFIX + chat_detail['chat_model']
+                                 + Constants.RESPONSE_TIME + format(float(chat_detail['elapsed_time']), ".2f")})
+        return messages
 
     def delete_chat(self, index):
         self.chatViewModel.remove_chat(index)
@@ -144,11 +244,9 @@ class ChatPresenter(QWidget):
         self.chatViewModel.add_new_chat(title)
 
     def add_human_chat(self, text):
-        if self.chat_main_id:
-            self._database.insert_chat_detail(self.chat_main_id, ChatType.HUMAN.value, None, text, None, None)
-        else:
-            self.create_new_chat()
-            self._database.insert_chat_detail(self.chat_main_id, ChatType.HUMAN.value, None, text, None, None)
+        chat_detail_id = self._database.insert_chat_detail(self.chat_main_id, ChatType.HUMAN.value, None, text,
+                                                           None, None)
+        self.conversation_store.append_message(self.chat_main_id, chat_detail_id, ChatType.HUMAN.value, text)
 
     def update_chat(self, index, new_title):
         self.chatViewModel.update_chat(index, new_title)
@@ -160,6 +258,12 @@ class ChatPresenter(QWidget):
     def submit(self, args):
         text = args['search_tool_args']['query']
         if text and text.strip():
+            if not self.chat_main_id:
+                self.create_new_chat()
+            # The history is taken before the question is saved; the question is sent on its own
+            args['history'] = self.conversation_store.get_history(self.chat_main_id)
+            args['chat_summary'] = self._database.get_chat_summary(self.chat_main_id)
             self.add_human_chat(text)
             self.chatView.update_ui_submit(ChatType.HUMAN, text)
-            self.swarmModel.run_agent(args)
+            self.run_responses[self.chat_main_id] = {'text_result': [], 'stream': args['stream']}
+            self.swarmModel.run_agent(self.chat_main_id, args)
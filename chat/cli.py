@@ -0,0 +1,251 @@
+"""
+Headless runner for the agent swarm.
+
+Reads prompts from a JSONL file, one object per line ({"prompt": ..., "id": ..., "title": ...}), runs them
+with the same agents as the app and writes one JSONL result per prompt as soon as it finishes. Every prompt
+is stored as a new chat in the app's database, so the results can be opened in the app afterwards.
+
+    python -m chat.cli prompts.jsonl -o results.jsonl --parallel 4
+    python -m chat.cli prompts.jsonl --openai-base-url http://localhost:8000/v1 --tavily-base-url http://localhost:8001
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from PyQt6.QtCore import QCoreApplication
+
+from chat.model.AgentEngine import AgentEngine, AgentEventType
+from chat.model.SwarmAgents import SwarmAgents
+from util.ChatType import ChatType
+from util.ClientManager import ClientManager
+from util.Constants import Constants, MODEL_MESSAGE, ProviderName
+from util.SearchCache import SearchCache
+from util.SqliteDatabase import SqliteDatabase
+from util.Utility import Utility
+
+
+def get_setting(section, prop, default):
+    return Utility.get_settings_value(section=section, prop=prop, default=default, save=False)
+
+
+def get_domain_list(domain_type):
+    return Utility.get_tavily_domain_list(domain_type) or None
+
+
+def get_agent_prompt_list(prompt_key):
+    prompts = {}
+    for name in ["OrchestratorAgent", "SearchAgent", "ProgrammerAgent", "TesterAgent"]:
+        prompt_values = Utility.get_system_value(section=f"{name}_Prompt", prefix="prompt",
+                                                 default="You are a helpful assistant.", length=3)
+        prompts[name] = prompt_values.get(prompt_key, prompt_values['prompt1'])
+    return SwarmAgents.get_agent_prompt_list(prompts["OrchestratorAgent"], prompts["SearchAgent"],
+                                             prompts["ProgrammerAgent"], prompts["TesterAgent"])
+
+
+def get_search_tool_args(options):
+    # Same parameters the Swarm tab stores in the settings file
+    section = f"{ProviderName.TAVILY.value}_Search_Parameter"
+    return {
+        'name': ProviderName.TAVILY.value,
+        'tavily_api_key': options.tavily_api_key,
+        'tavily_base_url': options.tavily_base_url,
+        'search_depth': get_setting(section, "search_depth", "advanced"),
+        'topic': get_setting(section, "topic", "general"),
+        'max_results': int(get_setting(section, "max_result", "5")),
+        'days': int(get_setting(section, "days", "365")),
+        'include_answer': get_setting(section, "include_answer", "False") == "True",
+        'include_raw_content': get_setting(section, "include_raw_content", "True") == "True",
+        'include_images': get_setting(section, "include_images", "False") == "True",
+        'include_domains': get_domain_list('Include'),
+        'exclude_domains': get_domain_list('Exclude'),
+    }
+
+
+def read_prompts(input_file):
+    for line_number, line in enumerate(input_file, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            print(f"{MODEL_MESSAGE.CLI_INVALID_LINE} {line_number}: {e}", file=sys.stderr)
+            continue
+        if isinstance(record, str):
+            record = {'prompt': record}
+        if not isinstance(record, dict) or not str(record.get('prompt') or "").strip():
+            print(f"{MODEL_MESSAGE.CLI_INVALID_LINE} {line_number}: {line[:80]}", file=sys.stderr)
+            continue
+        record.setdefault('id', line_number)
+        yield record
+
+
+class PromptRunner:
+    """Runs one prompt through an AgentEngine on a worker thread and collects its events into a result."""
+
+    def __init__(self, options, search_cache):
+        self.options = options
+        self.search_cache = search_cache
+        self.agent_prompt_list = get_agent_prompt_list(options.prompt_key)
+        self.search_tool_args = get_search_tool_args(options)
+
+    def run(self, record):
+        start_time = time.time()
+        result = {
+            'id': record['id'],
+            'prompt': record['prompt'],
+            'response': None,
+            'agent': None,
+            'model': None,
+            'finish_reason': None,
+            'elapsed_time': None,
+            'tool_calls': [],
+            'trace': None,
+            'error': None,
+        }
+        args = {
+            'open_api_key': self.options.openai_api_key,
+            'openai_base_url': self.options.openai_base_url,
+            'agent_prompt_list': self.agent_prompt_list,
+            'search_tool_args': dict(self.search_tool_args, query=record['prompt']),
+            'max_parallel_tool_calls': self.options.max_parallel_tool_calls,
+            'stream': False,
+        }
+        text_result = []
+        try:
+            for event in AgentEngine(args, self.search_cache).run(record['prompt']):
+                if event.type == AgentEventType.TOKEN:
+                    text_result.append(event.text)
+                    result['agent'] = event.agent
+                elif event.type == AgentEventType.TOOL_CALL:
+                    result['tool_calls'].append(event.name)
+                elif event.type == AgentEventType.FINISH:
+                    result['model'] = event.model
+                    result['finish_reason'] = event.finish_reason
+                    result['trace'] = event.trace
+                elif event.type == AgentEventType.ERROR:
+                    result['model'] = event.model
+                    result['agent'] = event.agent
+                    result['error'] = event.message
+        except Exception as e:
+            result['error'] = str(e)
+        result['response'] = "".join(text_result)
+        result['elapsed_time'] = time.time() - start_time
+        return result
+
+
+def save_result(database, record, result):
+    # Each prompt becomes its own chat, stored exactly like a question asked in the app
+    title = str(record.get('title') or record['prompt'])[:Constants.CLI_TITLE_LENGTH]
+    chat_main_id = database.add_chat_main(title)
+    if chat_main_id is None:
+        return None
+    database.insert_chat_detail(chat_main_id, ChatType.HUMAN.value, None, record['prompt'], None, None)
+    finish_reason = Constants.ERROR_STOP if result['error'] is not None else result['finish_reason']
+    database.add_run_stats(result['model'], result['agent'], finish_reason, result['elapsed_time'], result['trace'])
+    # Failed runs keep only the question, as in the app, and report the error in the JSONL output
+    if result['error'] is None and result['response']:
+        chat_detail_id = database.insert_chat_detail(chat_main_id, ChatType.AI.value, result['model'],
+                                                     result['response'], result['elapsed_time'],
+                                                     result['finish_reason'])
+        if chat_detail_id is not None and result['trace']:
+            database.save_chat_trace(chat_detail_id, result['trace'])
+    return chat_main_id
+
+
+def run(options, input_file, output_file):
+    database = None if options.no_database else SqliteDatabase(options.database)
+    search_cache = None if options.no_search_cache else SearchCache(options.database)
+    runner = PromptRunner(options, search_cache)
+    prompts = read_prompts(input_file)
+    failed = 0
+
+    # Only a few prompts are read ahead, so very large input files are streamed rather than loaded
+    executor = ThreadPoolExecutor(max_workers=options.parallel)
+    running = {}
+    try:
+        while True:
+            while len(running) < options.parallel * 2:
+                record = next(prompts, None)
+                if record is None:
+                    break
+                running[executor.submit(runner.run, record)] = record
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                record = running.pop(future)
+                result = future.result()
+                if result['error'] is not None:
+                    failed += 1
+                if database is not None:
+                    result['chat_main_id'] = save_result(database, record, result)
+                output_file.write(json.dumps(result, ensure_ascii=False) + "\n")
+                output_file.flush()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        if search_cache is not None:
+            search_cache.close()
+        if database is not None:
+            database.close()
+        ClientManager.close_all()
+    return failed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m chat.cli", description="Run prompts through the agent swarm.")
+    parser.add_argument("input", help="JSONL file of prompts, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="JSONL file for the results (default: stdout)")
+    parser.add_argument("-p", "--parallel", type=int,
+                        default=int(get_setting("Run_Option", "max_concurrent_runs", Constants.MAX_CONCURRENT_RUNS)),
+                        help="number of prompts run at the same time")
+    parser.add_argument("--max-parallel-tool-calls", type=int,
+                        default=int(get_setting("Run_Option", "max_parallel_tool_calls",
+                                                Constants.MAX_PARALLEL_TOOL_CALLS)))
+    parser.add_argument("--database", default=Constants.DATABASE_NAME,
+                        help="SQLite database to store the chats in (the app's own by default, it may stay open)")
+    parser.add_argument("--no-database", action="store_true", help="do not store the chats")
+    parser.add_argument("--no-search-cache", action="store_true", help="always call the search API")
+    parser.add_argument("--prompt-key", default="prompt1", help="agent prompt to use (prompt1, prompt2, prompt3)")
+    parser.add_argument("--openai-api-key", default=os.environ.get("OPENAI_API_KEY"))
+    parser.add_argument("--openai-base-url", default=os.environ.get("OPENAI_BASE_URL"))
+    parser.add_argument("--tavily-api-key", default=os.environ.get("TAVILY_API_KEY"))
+    parser.add_argument("--tavily-base-url", default=os.environ.get("TAVILY_BASE_URL"))
+    options = parser.parse_args(argv)
+
+    options.parallel = max(1, options.parallel)
+    if not options.openai_api_key:
+        options.openai_api_key = get_setting("AI_Provider", ProviderName.OPENAI.value, "")
+    if not options.tavily_api_key:
+        options.tavily_api_key = get_setting("AI_Provider", ProviderName.TAVILY.value, "")
+    if not options.openai_api_key:
+        parser.error(MODEL_MESSAGE.CLI_OPENAI_API_KEY_MISSING)
+    return options
+
+
+def main(argv=None):
+    # QtSql needs a QCoreApplication to load its driver; no event loop or display is used
+    _app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    ClientManager.initialize_clients()
+    options = parse_args(argv)
+
+    input_file = sys.stdin if options.input == "-" else open(options.input, encoding="utf-8")
+    output_file = sys.stdout if options.output == "-" else open(options.output, "w", encoding="utf-8")
+    try:
+        failed = run(options, input_file, output_file)
+    except KeyboardInterrupt:
+        failed = 1
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+import json
+import threading
+import time
+from enum import Enum
+
+from chat.model.ContextManager import ContextManager
+from chat.model.ParallelSwarm import ParallelSwarm
+from chat.model.RunTrace import RunTrace
+from chat.model.SwarmAgents import SwarmAgents
+from util.ClientManager import ClientManager
+from util.ConnectionTracker import RequestAborted
+from util.Constants import Constants
+
+
+class AgentEventType(Enum):
+    SUMMARY = 'summary'
+    TOKEN = 'token'
+    TOOL_CALL = 'tool_call'
+    HANDOFF = 'handoff'
+    FINISH = 'finish'
+    ERROR = 'error'
+
+
+class AgentEvent:
+    """
+    One step of a run. The fields depend on the type:
+
+    SUMMARY: chat_summary            TOKEN: text, agent           TOOL_CALL: name, arguments, agent
+    HANDOFF: agent, previous_agent   FINISH: model, finish_reason, elapsed_time, trace
+    ERROR: message, model, agent, elapsed_time
+    """
+
+    def __init__(self, event_type, **fields):
+        self.type = event_type
+        self.__dict__.update(fields)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value!r}" for name, value in self.__dict__.items() if name != 'type')
+        return f"AgentEvent({self.type.name}, {fields})"
+
+
+class AgentEngine:
+    """
+    Runs one question through the agent swarm and reports its progress as AgentEvents.
+
+    The engine does not depend on Qt: iterate run() directly, or pass a callback to run_with_callback().
+    A run ends with a FINISH event, or with an ERROR event when the model call fails. SwarmThread adapts
+    the events to Qt signals; the command line runner consumes them directly.
+    stop() can be called from any thread: it aborts the request in flight and the web searches still
+    waited for, and the run ends with a FINISH event whose finish_reason is FORCE_STOP.
+    """
+
+    def __init__(self, args, search_cache=None):
+        self.openai = ClientManager.acquire_openai_client(args['open_api_key'], args.get('openai_base_url'))
+        self.openai_lock = threading.Lock()
+        self.trace = RunTrace()
+        self.client = ParallelSwarm(client=self.openai, parallel_functions=[SwarmAgents.search_web.__name__],
+                                    max_parallel_tool_calls=args['max_parallel_tool_calls'], trace=self.trace)
+        self.agents = SwarmAgents(args['agent_prompt_list'], args['search_tool_args'], search_cache, self.trace)
+        self.context_args = args.get('context_args') or {
+            'token_budget': int(Constants.CONTEXT_TOKEN_BUDGET),
+            'window_tokens': int(Constants.CONTEXT_WINDOW_TOKENS),
+            'summary_max_tokens': int(Constants.CONTEXT_SUMMARY_MAX_TOKENS),
+            'summary_model': Constants.CONTEXT_SUMMARY_MODEL,
+        }
+        self.stream = args.get('stream', False)
+        self.force_stop = False
+        self.active_agent = self.agents.orchestrator
+
+    def stop(self):
+        self.force_stop = True
+        self.client.cancel()
+        self.agents.abort_searches()
+        with self.openai_lock:
+            if self.openai is not None:
+                ClientManager.abort_openai_client(self.openai)
+
+    def close(self):
+        # The client goes back to ClientManager once, when the run is over
+        with self.openai_lock:
+            openai, self.openai = self.openai, None
+        if openai is not None:
+            ClientManager.release_openai_client(openai)
+
+    def run_with_callback(self, callback, question, history=(), chat_summary=None):
+        for event in self.run(question, history, chat_summary):
+            callback(event)
+
+    def run(self, question, history=(), chat_summary=None):
+        self.start_time = time.time()
+        self.trace.start()
+        self.active_agent = self.agents.orchestrator
+        try:
+            messages, new_chat_summary = self.build_messages(question, history, chat_summary)
+            if new_chat_summary is not None:
+                yield AgentEvent(AgentEventType.SUMMARY, chat_summary=new_chat_summary)
+            response = self.client.run(
+                agent=self.agents.orchestrator,
+                messages=messages,
+                stream=self.stream,
+            )
+            if self.stream:
+                yield from self.handle_stream_response(response)
+            else:
+                yield from self.handle_response(response)
+        except RequestAborted:
+            yield self.finish_event(self.active_agent.model, Constants.FORCE_STOP)
+        except Exception as e:
+            yield self.error_event(str(e))
+        finally:
+            self.close()
+
+    def build_messages(self, question, history, chat_summary):
+        context_manager = ContextManager(self.summarize_messages,
+                                         token_budget=self.context_args['token_budget'],
+                                         window_tokens=self.context_args['window_tokens'])
+        return context_manager.build_messages(history, question, chat_summary)
+
+    def summarize_messages(self, summary, messages):
+        conversation = "\n\n".join(f"{message['role']}: {message['content']}" for message in messages)
+        content = f"Previous summary:\n{summary}\n\n" if summary else ""
+        content += f"New messages:\n{conversation}"
+        response = self.openai.chat.completions.create(
+            model=self.context_args['summary_model'],
+            messages=[
+                {"role": "system", "content": Constants.CONTEXT_SUMMARY_PROMPT},
+                {"role": "user", "content": content},
+            ],
+            max_tokens=self.context_args['summary_max_tokens'],
+        )
+        return response.choices[0].message.content.strip()
+
+    def handle_response(self, response):
+        if self.force_stop:
+            yield self.finish_event(response.agent.model, Constants.FORCE_STOP)
+            return
+
+        for message in response.messages:
+            if message.get('role') != "assistant":
+                continue
+            handoff = self.change_agent(message.get('sender'))
+            if handoff is not None:
+                yield handoff
+            for tool_call in message.get('tool_calls') or []:
+                yield self.tool_call_event(tool_call['function']['name'], tool_call['function']['arguments'])
+
+        result = response.messages[-1]["content"] if response.messages else ""
+        yield self.token_event(result)
+        yield self.finish_event(response.agent.model, Constants.NORMAL_STOP)
+
+    def handle_stream_response(self, response):
+        tool_calls = {}
+
+        for chunk in response:
+            if self.force_stop:
+                yield self.finish_event(self.active_agent.model, Constants.FORCE_STOP)
+                return
+
+            if "sender" in chunk:
+                handoff = self.change_agent(chunk["sender"])
+                if handoff is not None:
+                    yield handoff
+
+            if "content" in chunk and chunk["content"] is not None:
+                yield self.token_event(chunk["content"])
+
+            # Tool call names and arguments arrive in pieces; they are reported once the message is complete
+            if "tool_calls" in chunk and chunk["tool_calls"] is not None:
+                for tool_call in chunk["tool_calls"]:
+                    call = tool_calls.setdefault(tool_call.get("index", 0), {"name": "", "arguments": ""})
+                    f = tool_call["function"]
+                    call["name"] += f.get("name") or ""
+                    call["arguments"] += f.get("arguments") or ""
+
+            if chunk.get("delim") == "end":
+                for call in tool_calls.values():
+                    if call["name"]:
+                        yield self.tool_call_event(call["name"], call["arguments"])
+                tool_calls = {}
+
+            if "response" in chunk:
+                yield self.finish_event(chunk['response'].agent.model, Constants.NORMAL_STOP)
+
+    def change_agent(self, agent_name):
+        if not agent_name or agent_name == self.active_agent.name:
+            return None
+        previous_agent = self.active_agent
+        self.active_agent = self.agents.get_agent(agent_name) or previous_agent
+        return AgentEvent(AgentEventType.HANDOFF, agent=agent_name, previous_agent=previous_agent.name)
+
+    def token_event(self, text):
+        self.trace.add_token()
+        return AgentEvent(AgentEventType.TOKEN, text=text, agent=self.active_agent.name)
+
+    def tool_call_event(self, name, arguments):
+        self.trace.add_pause()
+        try:
+            arguments = json.loads(arguments) if arguments else {}
+        except ValueError:
+            pass
+        return AgentEvent(AgentEventType.TOOL_CALL, name=name, arguments=arguments, agent=self.active_agent.name)
+
+    def finish_event(self, model, finish_reason):
+        elapsed_time = time.time() - self.start_time
+        return AgentEvent(AgentEventType.FINISH, model=model, finish_reason=finish_reason, elapsed_time=elapsed_time,
+                          trace=self.trace.to_dict(self.active_agent.name, elapsed_time))
+
+    def error_event(self, message):
+        return AgentEvent(AgentEventType.ERROR, message=message, model=self.active_agent.model,
+                          agent=self.active_agent.name, elapsed_time=time.time() - self.start_time)
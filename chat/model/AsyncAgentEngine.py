@@ -0,0 +1,155 @@
+import asyncio
+import json
+import time
+
+from swarm import Agent
+from swarm.types import Result
+
+from chat.model.AgentEngine import AgentEngine, AgentEvent, AgentEventType
+from chat.model.SwarmAgents import SwarmAgents
+from util.ClientManager import ClientManager
+from util.ConnectionTracker import RequestAborted
+from util.Constants import Constants
+
+
+class AsyncAgentEngine(AgentEngine):
+    """
+    AgentEngine for an asyncio event loop, using AsyncOpenAI and the async Tavily client.
+
+    Swarm only has a blocking loop, so run() follows Swarm.run_and_stream itself: ask the active agent,
+    run the tools it calls, switch agents on a handoff and repeat until no tool is called. The web searches
+    of one turn run concurrently. Cancelling the task that iterates run() stops the run at once, also in the
+    middle of a request, and closes the response stream.
+    """
+    def __init__(self, args, search_cache=None):
+        super().__init__(args, search_cache)
+        self.async_openai = ClientManager.get_async_openai_client(args['open_api_key'], args.get('openai_base_url'))
+        self.max_parallel_tool_calls = max(1, args['max_parallel_tool_calls'])
+        self.async_functions = {SwarmAgents.search_web.__name__: self.agents.search_web_async}
+
+    async def run(self, question, history=(), chat_summary=None):
+        self.start_time = time.time()
+        self.trace.start()
+        self.active_agent = self.agents.orchestrator
+        try:
+            # Summaries are rare, so they keep using the blocking client on a helper thread
+            messages, new_chat_summary = await asyncio.to_thread(self.build_messages, question, history,
+                                                                 chat_summary)
+            if new_chat_summary is not None:
+                yield AgentEvent(AgentEventType.SUMMARY, chat_summary=new_chat_summary)
+
+            context_variables = {}
+            while True:
+                params = self.client.get_completion_params(self.active_agent, messages, context_variables,
+                                                           stream=self.stream)
+                if self.stream:
+                    message = {"content": "", "tool_calls": []}
+                    async for event in self.stream_completion(params, message):
+                        yield event
+                else:
+                    message = await self.create_completion(params)
+                if self.force_stop:
+                    break
+
+                messages.append(self.to_history_message(message))
+                if not message["tool_calls"]:
+                    break
+
+                for tool_call in message["tool_calls"]:
+                    yield self.tool_call_event(tool_call["function"]["name"], tool_call["function"]["arguments"])
+                tool_messages, agent = await self.handle_tool_calls(message["tool_calls"], context_variables)
+                messages.extend(tool_messages)
+                if agent is not None:
+                    handoff = self.change_agent(agent.name)
+                    if handoff is not None:
+                        yield handoff
+
+            if self.force_stop:
+                yield self.finish_event(self.active_agent.model, Constants.FORCE_STOP)
+                return
+            if not self.stream:
+                yield self.token_event(message["content"])
+            yield self.finish_event(self.active_agent.model, Constants.NORMAL_STOP)
+        except RequestAborted:
+            yield self.finish_event(self.active_agent.model, Constants.FORCE_STOP)
+        except Exception as e:
+            yield self.error_event(str(e))
+        finally:
+            self.close()
+
+    async def create_completion(self, params):
+        completion = await self.async_openai.chat.completions.create(**params)
+        self.trace.add_usage(completion.usage)
+        message = completion.choices[0].message
+        tool_calls = [{"id": tool_call.id, "type": "function",
+                       "function": {"name": tool_call.function.name, "arguments": tool_call.function.arguments}}
+                      for tool_call in message.tool_calls or []]
+        return {"content": message.content or "", "tool_calls": tool_calls}
+
+    async def stream_completion(self, params, message):
+        tool_calls = {}
+        stream = await self.async_openai.chat.completions.create(**params)
+        async with stream:
+            async for chunk in stream:
+                self.trace.add_usage(chunk.usage)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    message["content"] += delta.content
+                    yield self.token_event(delta.content)
+                # Tool call names and arguments arrive in pieces, keyed by their index
+                for tool_call in delta.tool_calls or []:
+                    call = tool_calls.setdefault(tool_call.index, {"id": "", "type": "function",
+                                                                   "function": {"name": "", "arguments": ""}})
+                    if tool_call.id:
+                        call["id"] = tool_call.id
+                    if tool_call.function is not None:
+                        call["function"]["name"] += tool_call.function.name or ""
+                        call["function"]["arguments"] += tool_call.function.arguments or ""
+                if self.force_stop:
+                    break
+        message["tool_calls"] = [tool_calls[index] for index in sorted(tool_calls)]
+
+    @staticmethod
+    def to_history_message(message):
+        history_message = {"role": "assistant", "content": message["content"]}
+        if message["tool_calls"]:
+            history_message["tool_calls"] = message["tool_calls"]
+        return history_message
+
+    async def handle_tool_calls(self, tool_calls, context_variables):
+        function_map = {f.__name__: f for f in self.active_agent.functions}
+        semaphore = asyncio.Semaphore(self.max_parallel_tool_calls)
+
+        async def call_tool(tool_call):
+            name = tool_call["function"]["name"]
+            if name not in function_map:
+                return Result(value=f"Error: Tool {name} not found.")
+            arguments = json.loads(tool_call["function"]["arguments"] or "{}")
+            function = function_map[name]
+            if self.client.CONTEXT_VARIABLES_NAME in function.__code__.co_varnames:
+                arguments[self.client.CONTEXT_VARIABLES_NAME] = context_variables
+            if name in self.async_functions:
+                async with semaphore:
+                    return self.to_result(await self.async_functions[name](**arguments))
+            return self.to_result(function(**arguments))
+
+        # Results come back in call order, so the tool messages match the calls as in Swarm
+        results = await asyncio.gather(*(call_tool(tool_call) for tool_call in tool_calls))
+        tool_messages = []
+        agent = None
+        for tool_call, result in zip(tool_calls, results):
+            tool_messages.append({"role": "tool", "tool_call_id": tool_call["id"], "content": result.value})
+            context_variables.update(result.context_variables)
+            if result.agent is not None:
+                agent = result.agent
+        return tool_messages, agent
+
+    @staticmethod
+    def to_result(result):
+        if isinstance(result, Result):
+            return result
+        if isinstance(result, Agent):
+            return Result(value=json.dumps({"assistant": result.name}), agent=result)
+        return Result(value=str(result))
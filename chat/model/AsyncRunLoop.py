@@ -0,0 +1,49 @@
+import asyncio
+import threading
+
+from util.ClientManager import ClientManager
+
+
+class AsyncRunLoop:
+    """
+    Static owner of the one asyncio event loop that all async runs share.
+
+    The loop runs on its own thread and is started on first use. Coroutines are handed to it with
+    submit(), which returns a concurrent.futures.Future; cancelling that future cancels the run right away.
+    """
+    __loop = None
+    __thread = None
+    __lock = threading.Lock()
+
+    @classmethod
+    def get_loop(cls):
+        with cls.__lock:
+            if cls.__loop is None:
+                cls.__loop = asyncio.new_event_loop()
+                cls.__thread = threading.Thread(target=cls.__loop.run_forever, name="AsyncRunLoop", daemon=True)
+                cls.__thread.start()
+            return cls.__loop
+
+    @classmethod
+    def submit(cls, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, cls.get_loop())
+
+    @classmethod
+    def stop(cls):
+        with cls.__lock:
+            loop, thread = cls.__loop, cls.__thread
+            cls.__loop = cls.__thread = None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(cls.shutdown(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    @staticmethod
+    async def shutdown():
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await ClientManager.close_async_clients()
@@ -0,0 +1,56 @@
+import asyncio
+from pprint import pprint
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from chat.model.AsyncAgentEngine import AsyncAgentEngine
+from chat.model.AsyncRunLoop import AsyncRunLoop
+from chat.model.StreamCoalescer import StreamCoalescer
+from chat.model.SwarmThread import AgentEventHandler
+from util.Constants import Constants
+from util.DataManager import DataManager
+
+
+class AsyncSwarmRun(QObject, AgentEventHandler):
+    """
+    Runs an AsyncAgentEngine as a task on the shared AsyncRunLoop instead of on a thread of its own.
+
+    It has the same signals and methods as SwarmThread, so SwarmModel can use either. The signals are
+    emitted on the loop thread and queued to the GUI thread by Qt.
+    """
+    started = pyqtSignal()
+    finished = pyqtSignal()
+    response_signal = pyqtSignal(str, bool)
+    response_finished_signal = pyqtSignal(str, str, float, bool, object)
+    chat_summary_signal = pyqtSignal(object)
+    run_error_signal = pyqtSignal(str, str, float)
+
+    def __init__(self, args):
+        super().__init__()
+        self.engine = AsyncAgentEngine(args, DataManager.get_search_cache())
+        self.query = args['search_tool_args']['query']
+        self.history = args['history']
+        self.chat_summary = args['chat_summary']
+        self.stream = args['stream']
+        self.coalescer = StreamCoalescer(self.emit_stream_text, args['stream_flush_interval_ms'],
+                                         args['stream_flush_size'])
+        self.future = None
+        pprint(args)
+
+    def start(self):
+        self.future = AsyncRunLoop.submit(self.run())
+
+    def set_force_stop(self, force_stop):
+        if force_stop and self.future is not None:
+            self.engine.stop()
+            self.future.cancel()
+
+    async def run(self):
+        self.started.emit()
+        try:
+            async for event in self.engine.run(self.query, self.history, self.chat_summary):
+                self.handle_event(event)
+        except asyncio.CancelledError:
+            self.handle_event(self.engine.finish_event(self.engine.active_agent.model, Constants.FORCE_STOP))
+        finally:
+            self.finished.emit()
@@ -0,0 +1,147 @@
+from bisect import bisect_right
+
+from util.Constants import Constants, MODEL_MESSAGE
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+class TokenCounter:
+    """Counts tokens with tiktoken when its encoding is available, otherwise estimates them from the text length."""
+    __instance = None
+
+    def __init__(self, encoding_name=Constants.CONTEXT_TOKENIZER_ENCODING):
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.get_encoding(encoding_name)
+            except Exception:
+                # The encoding file is downloaded on first use and may be unavailable offline
+                self.encoding = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls.__instance is None:
+            cls.__instance = TokenCounter()
+        return cls.__instance
+
+    def count(self, text):
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return len(text) // Constants.CONTEXT_CHARS_PER_TOKEN + 1
+
+    def count_message(self, message):
+        # Stored messages keep their count so a long conversation is only tokenized once
+        tokens = message.get('tokens')
+        if tokens is None:
+            tokens = self.count(message['content']) + Constants.CONTEXT_MESSAGE_OVERHEAD_TOKENS
+            if 'id' in message:
+                message['tokens'] = tokens
+        return tokens
+
+
+class ContextManager:
+    """
+    Builds the messages sent with a question so that the prompt stays within a token budget.
+
+    While the conversation fits the budget it is sent as is. Once it does not, the older turns are folded
+    into a rolling summary until the recent window fits window_tokens; the summary is returned so that it
+    can be stored next to the chat and reused by later questions.
+    """
+
+    def __init__(self, summarize, token_budget=int(Constants.CONTEXT_TOKEN_BUDGET),
+                 window_tokens=int(Constants.CONTEXT_WINDOW_TOKENS), token_counter=None):
+        self.summarize = summarize
+        self.token_budget = token_budget
+        self.window_tokens = min(window_tokens, token_budget)
+        self.token_counter = token_counter or TokenCounter.get_instance()
+
+    def build_messages(self, history, question, chat_summary=None):
+        """
+        history is the conversation before the question, oldest first, as {'id', 'role', 'content'} dicts.
+        Returns the messages to send and the new chat summary, or None when the stored one is still valid.
+        Only the turns after the stored summary are looked at, so the cost does not grow with the chat.
+        """
+        summary = None
+        start = 0
+        # A stored summary only applies while the turns it covers are still part of the conversation
+        if chat_summary:
+            start = bisect_right(history, chat_summary['last_chat_detail_id'], key=lambda message: message['id'])
+            if start:
+                summary = chat_summary['summary']
+
+        question_message = {"role": "user", "content": question}
+        available_tokens = (self.token_budget - self.token_counter.count_message(question_message)
+                            - self.count_summary(summary))
+        if self.find_window_start(history, start, available_tokens) == start:
+            return self.to_messages(summary, history[start:], question_message), None
+
+        split = self.find_window_start(history, start, self.window_tokens)
+        # Start the window on a question so the model never sees an answer without it
+        while split < len(history) and history[split]['role'] != "user":
+            split += 1
+
+        older = history[start:split]
+        window = history[split:]
+        if not older:
+            return self.to_messages(summary, window, question_message), None
+
+        stored_summary = summary
+        try:
+            for chunk in self.split_by_tokens(older):
+                summary = self.summarize(summary, chunk)
+        except Exception as e:
+            print(f"{MODEL_MESSAGE.CONTEXT_SUMMARY_ERROR} {e}")
+            return self.to_messages(stored_summary, window, question_message), None
+
+        new_summary = {
+            'last_chat_detail_id': older[-1]['id'],
+            'summary': summary,
+            'token_count': self.token_counter.count(summary),
+        }
+        return self.to_messages(summary, window, question_message), new_summary
+
+    def find_window_start(self, history, start, max_tokens):
+        # Walks back from the newest message while the messages still fit max_tokens
+        split = len(history)
+        window_tokens = 0
+        while split > start:
+            message_tokens = self.token_counter.count_message(history[split - 1])
+            if window_tokens + message_tokens > max_tokens:
+                break
+            split -= 1
+            window_tokens += message_tokens
+        return split
+
+    def split_by_tokens(self, messages):
+        # Very long histories are summarized in several rolling steps, each within the token budget
+        chunk = []
+        chunk_tokens = 0
+        for message in messages:
+            message_tokens = self.token_counter.count_message(message)
+            if chunk and chunk_tokens + message_tokens > self.token_budget:
+                yield chunk
+                chunk = []
+                chunk_tokens = 0
+            chunk.append(message)
+            chunk_tokens += message_tokens
+        if chunk:
+            yield chunk
+
+    def count_summary(self, summary):
+        if not summary:
+            return 0
+        return self.token_counter.count(Constants.CONTEXT_SUMMARY_PREFIX + summary) \
+            + Constants.CONTEXT_MESSAGE_OVERHEAD_TOKENS
+
+    def to_messages(self, summary, window, question_message):
+        messages = []
+        if summary:
+            messages.append({"role": "system", "content": Constants.CONTEXT_SUMMARY_PREFIX + summary})
+        messages.extend({"role": message['role'], "content": message['content']} for message in window)
+        messages.append(question_message)
+        return messages
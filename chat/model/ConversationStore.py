@@ -0,0 +1,71 @@
+from collections import OrderedDict
+from collections.abc import Sequence
+
+from util.ChatType import ChatType
+from util.Constants import Constants
+
+
+class ConversationHistory(Sequence):
+    """Read-only view of the first `length` messages of an append-only conversation list."""
+
+    def __init__(self, messages, length):
+        self.messages = messages
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.messages[i] for i in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError(index)
+        return self.messages[index]
+
+
+class ConversationStore:
+    """
+    In-memory copy of the saved messages of recently used conversations, keyed by chat_main_id.
+
+    A conversation is read from the database once and then kept up to date as messages are saved, so a
+    run gets the raw messages without touching the database or the view. Message lists are only ever
+    appended to, which lets a worker thread read a ConversationHistory snapshot while new messages arrive.
+    """
+
+    def __init__(self, database, max_conversations=Constants.CONVERSATION_CACHE_SIZE):
+        self.database = database
+        self.max_conversations = max_conversations
+        self.conversations = OrderedDict()
+
+    @staticmethod
+    def to_message(chat_detail_id, chat_type, text):
+        role = "user" if chat_type == ChatType.HUMAN.value else "assistant"
+        return {"id": chat_detail_id, "role": role, "content": text}
+
+    def get_messages(self, chat_main_id):
+        messages = self.conversations.get(chat_main_id)
+        if messages is None:
+            messages = [self.to_message(chat_detail['id'], chat_detail['chat_type'], chat_detail['chat'])
+                        for chat_detail in self.database.get_all_chat_details_list(chat_main_id)
+                        if chat_detail['chat']]
+            self.conversations[chat_main_id] = messages
+            while len(self.conversations) > self.max_conversations:
+                self.conversations.popitem(last=False)
+        else:
+            self.conversations.move_to_end(chat_main_id)
+        return messages
+
+    def get_history(self, chat_main_id):
+        messages = self.get_messages(chat_main_id)
+        return ConversationHistory(messages, len(messages))
+
+    def append_message(self, chat_main_id, chat_detail_id, chat_type, text):
+        # Conversations that are not loaded yet read the new message from the database later
+        messages = self.conversations.get(chat_main_id)
+        if messages is not None and chat_detail_id is not None and text:
+            messages.append(self.to_message(chat_detail_id, chat_type, text))
+
+    def remove(self, chat_main_id):
+        self.conversations.pop(chat_main_id, None)
@@ -0,0 +1,131 @@
+import json
+from collections import defaultdict, deque
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from swarm import Swarm
+from swarm.util import function_to_json
+
+from util.ConnectionTracker import RequestAborted
+
+
+class ParallelSwarm(Swarm):
+    """
+    Swarm that runs the independent tool calls of one turn concurrently.
+
+    Only functions listed in parallel_functions (e.g. web search) are run ahead on a thread pool.
+    They get the same arguments as in Swarm, context_variables included. Their results are then replayed
+    through Swarm's own tool-call loop, so the tool messages reach the model in the same order as the calls
+    and agent hand-offs and context updates behave exactly as before.
+    After cancel() the turn stops waiting for them: calls that have not started are dropped and
+    RequestAborted is raised. Running ones finish on their pool thread, unless their requests are aborted
+    too, as AgentEngine.stop() does for the web searches.
+    The token usage of every completion is added to the RunTrace passed as trace.
+    """
+    CONTEXT_VARIABLES_NAME = "context_variables"
+
+    def __init__(self, client=None, parallel_functions=None, max_parallel_tool_calls=1, trace=None):
+        super().__init__(client=client)
+        self.parallel_functions = set(parallel_functions or [])
+        self.max_parallel_tool_calls = max(1, max_parallel_tool_calls)
+        self.trace = trace
+        self.cancelled = Future()
+
+    def cancel(self):
+        try:
+            self.cancelled.set_result(True)
+        except InvalidStateError:
+            pass
+
+    def get_completion_params(self, agent, history, context_variables, model_override=None, stream=False):
+        if callable(agent.instructions):
+            instructions = agent.instructions(defaultdict(str, context_variables))
+        else:
+            instructions = agent.instructions
+
+        # context_variables is filled in by Swarm, so the model never sees it
+        tools = [function_to_json(f) for f in agent.functions]
+        for tool in tools:
+            parameters = tool["function"]["parameters"]
+            parameters["properties"].pop(self.CONTEXT_VARIABLES_NAME, None)
+            if self.CONTEXT_VARIABLES_NAME in parameters["required"]:
+                parameters["required"].remove(self.CONTEXT_VARIABLES_NAME)
+
+        params = {
+            "model": model_override or agent.model,
+            "messages": [{"role": "system", "content": instructions}] + history,
+            "stream": stream,
+        }
+        if stream:
+            # The usage then arrives in one last chunk that has no choices
+            params["stream_options"] = {"include_usage": True}
+        if tools:
+            params["tools"] = tools
+            params["parallel_tool_calls"] = agent.parallel_tool_calls
+            if agent.tool_choice:
+                params["tool_choice"] = agent.tool_choice
+        return params
+
+    def get_chat_completion(self, agent, history, context_variables, model_override, stream, debug):
+        completion = self.client.chat.completions.create(
+            **self.get_completion_params(agent, history, context_variables, model_override, stream))
+        if stream:
+            return self.filter_usage_chunks(completion)
+        if self.trace is not None:
+            self.trace.add_usage(completion.usage)
+        return completion
+
+    def filter_usage_chunks(self, completion):
+        # Swarm reads the first choice of every chunk, so the usage chunk is taken out here
+        for chunk in completion:
+            if chunk.usage is not None and self.trace is not None:
+                self.trace.add_usage(chunk.usage)
+            if chunk.choices:
+                yield chunk
+
+    def handle_tool_calls(self, tool_calls, functions, context_variables, debug):
+        function_map = {f.__name__: f for f in functions}
+        parallel_calls = [tool_call for tool_call in tool_calls
+                          if tool_call.function.name in self.parallel_functions
+                          and tool_call.function.name in function_map]
+        if not parallel_calls:
+            return super().handle_tool_calls(tool_calls, functions, context_variables, debug)
+
+        # A single worker runs the calls in sequence, but still off this thread so they can be given up on
+        executor = ThreadPoolExecutor(max_workers=min(self.max_parallel_tool_calls, len(parallel_calls)))
+        futures = [(tool_call.function.name,
+                    executor.submit(function_map[tool_call.function.name],
+                                    **self.get_arguments(tool_call, function_map, context_variables)))
+                   for tool_call in parallel_calls]
+        executor.shutdown(wait=False)
+
+        pending = {future for _, future in futures}
+        while pending:
+            wait(pending | {self.cancelled}, return_when=FIRST_COMPLETED)
+            if self.cancelled.done():
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise RequestAborted()
+            pending = {future for future in pending if not future.done()}
+
+        results = defaultdict(deque)
+        for name, future in futures:
+            results[name].append(future)
+
+        replayed_functions = [self.create_replay_function(name, results[name]) if name in results else function
+                              for name, function in function_map.items()]
+        return super().handle_tool_calls(tool_calls, replayed_functions, context_variables, debug)
+
+    def get_arguments(self, tool_call, function_map, context_variables):
+        # The same arguments Swarm passes, context_variables included when the function asks for it
+        arguments = json.loads(tool_call.function.arguments)
+        if self.CONTEXT_VARIABLES_NAME in function_map[tool_call.function.name].__code__.co_varnames:
+            arguments[self.CONTEXT_VARIABLES_NAME] = context_variables
+        return arguments
+
+    @staticmethod
+    def create_replay_function(name, futures):
+        def replay(**kwargs):
+            # Raises the call's own exception, just as running it in sequence would
+            return futures.popleft().result()
+
+        replay.__name__ = name
+        return replay
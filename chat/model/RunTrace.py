@@ -0,0 +1,106 @@
+import math
+import threading
+import time
+
+
+class RunTrace:
+    """
+    Records where the time of one agent run goes: time to first token, the gaps between streamed tokens,
+    agent hand-offs (the transfer_to_* calls), web searches and the token usage reported by the model.
+
+    Times are in seconds from the start of the run. Web searches may run on pool threads, so everything
+    is recorded under a lock. to_dict() gives the summary that is shown in the status bar and stored
+    with the answer.
+    """
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.first_token_time = None
+        self.last_token_time = None
+        self.previous_token_time = None
+        self.token_count = 0
+        self.token_gaps = []
+        self.handoffs = []
+        self.searches = []
+        self.usage = {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+        self.usage_reported = False
+        self.lock = threading.Lock()
+
+    def start(self):
+        self.start_time = time.perf_counter()
+
+    def now(self):
+        return time.perf_counter() - self.start_time
+
+    def add_token(self):
+        with self.lock:
+            token_time = self.now()
+            if self.first_token_time is None:
+                self.first_token_time = token_time
+            if self.previous_token_time is not None:
+                self.token_gaps.append(token_time - self.previous_token_time)
+            self.previous_token_time = self.last_token_time = token_time
+            self.token_count += 1
+
+    def add_pause(self):
+        # Tool calls and hand-offs end a run of tokens, so the wait for them is not an inter-token gap
+        with self.lock:
+            self.previous_token_time = None
+
+    def add_handoff(self, agent):
+        with self.lock:
+            self.handoffs.append({'time': self.now(), 'agent': agent})
+
+    def add_search(self, query, start_time, results):
+        # start_time is a time.perf_counter() value taken before the search
+        end_time = time.perf_counter()
+        with self.lock:
+            self.searches.append({
+                'time': start_time - self.start_time,
+                'duration': end_time - start_time,
+                'query': query,
+                'results': len(results or []),
+                'size': len(str(results)) if results is not None else 0,
+            })
+
+    def add_usage(self, usage):
+        if usage is None:
+            return
+        with self.lock:
+            self.usage_reported = True
+            for name in self.usage:
+                self.usage[name] += getattr(usage, name, 0) or 0
+
+    @staticmethod
+    def percentile(values, percent):
+        # Nearest-rank percentile, None when nothing was measured
+        if not values:
+            return None
+        ordered = sorted(values)
+        return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+    def get_tokens_per_second(self, elapsed_time):
+        # Streamed runs: chunks after the first one over the time they took to arrive.
+        # Other runs only see the finished answer, so the reported output tokens are spread over the whole run.
+        if self.token_count > 1 and self.last_token_time > self.first_token_time:
+            return (self.token_count - 1) / (self.last_token_time - self.first_token_time)
+        if self.usage_reported and elapsed_time:
+            return self.usage['completion_tokens'] / elapsed_time
+        return None
+
+    def to_dict(self, agent, elapsed_time):
+        with self.lock:
+            return {
+                'agent': agent,
+                'elapsed_time': elapsed_time,
+                'ttft': self.first_token_time,
+                'token_count': self.token_count,
+                'tokens_per_second': self.get_tokens_per_second(elapsed_time),
+                'itl_p50': self.percentile(self.token_gaps, 50),
+                'itl_p90': self.percentile(self.token_gaps, 90),
+                'itl_p99': self.percentile(self.token_gaps, 99),
+                'usage': dict(self.usage) if self.usage_reported else None,
+                'handoffs': list(self.handoffs),
+                'searches': list(self.searches),
+                'search_time': sum(search['duration'] for search in self.searches),
+            }
@@ -0,0 +1,51 @@
+import threading
+import time
+
+
+class StreamCoalescer:
+    """
+    Batch streamed chunks and hand them to emit() once per time window or byte budget.
+
+    When the stream stalls (a tool call, a slow handoff) a timer flushes the buffered text once the window has
+    passed, so it does not stay hidden until the next chunk arrives. emit() may therefore be called from the
+    timer thread; calls never overlap and keep the order of the text.
+    """
+
+    def __init__(self, emit, flush_interval_ms, flush_size):
+        self.emit = emit
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_size = flush_size
+        self.buffer = []
+        self.buffer_size = 0
+        self.last_flush_time = time.monotonic()
+        self.lock = threading.Lock()
+        self.timer = None
+
+    def add(self, text):
+        if not text:
+            return
+        with self.lock:
+            self.buffer.append(text)
+            self.buffer_size += len(text.encode('utf-8'))
+            elapsed = time.monotonic() - self.last_flush_time
+            if self.buffer_size >= self.flush_size or elapsed >= self.flush_interval:
+                self.flush_buffer()
+            elif self.timer is None:
+                self.timer = threading.Timer(self.flush_interval - elapsed, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        with self.lock:
+            self.flush_buffer()
+
+    def flush_buffer(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if self.buffer:
+            text = "".join(self.buffer)
+            self.buffer = []
+            self.buffer_size = 0
+            self.emit(text)
+        self.last_flush_time = time.monotonic()
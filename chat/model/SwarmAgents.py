@@ -0,0 +1,195 @@
+import time
+
+from swarm import Agent
+
+from util.ClientManager import ClientManager
+from util.ConnectionTracker import ConnectionTracker
+
+
+class SwarmAgents:
+    """
+    Builds the Orchestrator / Search / Programmer / Tester agents and the functions that connect them.
+
+    It does not depend on Qt, so the same agents are used by SwarmThread in the app and by the headless
+    command line runner. Web searches are timed into the RunTrace passed as trace, and abort_searches()
+    shuts down the connections of the searches still running.
+    """
+
+    def __init__(self, agent_prompt_list, search_tool_args, search_cache=None, trace=None):
+        self.search_tool_args = search_tool_args
+        self.search_cache = search_cache
+        self.trace = trace
+        self.search_tracker = ConnectionTracker()
+        self.create_all_agents(agent_prompt_list)
+
+    @staticmethod
+    def get_agent_prompt_list(orchestrator_prompt, search_prompt, programmer_prompt, tester_prompt):
+        return {
+            "orchestrator_agent": {
+                "name": "Orchestrator Agent",
+                "instructions": orchestrator_prompt
+            },
+            "search_agent": {
+                "name": "Search Agent",
+                "instructions": search_prompt
+            },
+            "programmer_agent": {
+                "name": "Programmer Agent",
+                "instructions": programmer_prompt
+            },
+            "tester_agent": {
+                "name": "Tester Agent",
+                "instructions": tester_prompt
+            },
+        }
+
+    def create_all_agents(self, args):
+        orchestrator_agent = args['orchestrator_agent']
+        search_agent = args['search_agent']
+        programmer_agent = args['programmer_agent']
+        tester_agent = args['tester_agent']
+
+        self.orchestrator = self.create_agent(
+            orchestrator_agent['name'],
+            orchestrator_agent['instructions'],
+            [self.transfer_to_search_agent, self.transfer_to_programmer_agent, self.transfer_to_tester_agent],
+        )
+
+        self.search_agent = self.create_agent(
+            search_agent['name'],
+            search_agent['instructions'],
+            [self.search_web, self.transfer_to_orchestrator_agent]
+        )
+
+        self.programmer_agent = self.create_agent(
+            programmer_agent['name'],
+            programmer_agent['instructions'],
+            [self.transfer_to_orchestrator_agent]
+        )
+
+        self.tester_agent = self.create_agent(
+            tester_agent['name'],
+            tester_agent['instructions'],
+            [self.transfer_to_orchestrator_agent]
+        )
+
+    def get_agent(self, agent_name):
+        for agent in [self.orchestrator, self.search_agent, self.programmer_agent, self.tester_agent]:
+            if agent.name == agent_name:
+                return agent
+        return None
+
+    def create_agent(self, agent_name, agent_instructions, agent_functions):
+        return Agent(
+            name=agent_name, instructions=agent_instructions, functions=agent_functions
+        )
+
+    def transfer_to_search_agent(self):
+        """transfer to Search Agent for web search"""
+        return self.transfer_to(self.search_agent)
+
+    def transfer_to_programmer_agent(self):
+        """transfer to Programmer Agent for code generation and code refinement"""
+        return self.transfer_to(self.programmer_agent)
+
+    def transfer_to_tester_agent(self):
+        """transfer to Tester Agent to provide reliable feedback for the Programmer Agent to optimise the code iteratively"""
+        return self.transfer_to(self.tester_agent)
+
+    def transfer_to_orchestrator_agent(self):
+        """transfer to Orchestrator Agent for orchestrating the processes"""
+        return self.transfer_to(self.orchestrator)
+
+    def transfer_to(self, agent):
+        if self.trace is not None:
+            self.trace.add_handoff(agent.name)
+        return agent
+
+    def search_web(self, query):
+        """Search 'query' on the web and return the results"""
+        if self.search_tool_args:
+            start_time = time.perf_counter()
+            tavily = TavilySearch(self.search_tool_args, self.search_cache, self.search_tracker)
+            search_results = tavily.search(query)
+            if self.trace is not None:
+                self.trace.add_search(query, start_time, search_results)
+            return search_results
+        else:
+            return None
+
+    def abort_searches(self):
+        self.search_tracker.abort()
+
+    async def search_web_async(self, query):
+        if self.search_tool_args:
+            start_time = time.perf_counter()
+            tavily = TavilySearch(self.search_tool_args, self.search_cache)
+            search_results = await tavily.search_async(query)
+            if self.trace is not None:
+                self.trace.add_search(query, start_time, search_results)
+            return search_results
+        else:
+            return None
+
+
+class TavilySearch:
+
+    def __init__(self, args, cache=None, tracker=None):
+        self.search_args = args
+        self.cache = cache
+        self.tracker = tracker or ConnectionTracker()
+        self.client = None
+
+    def search(self, query):
+        if self.cache is not None:
+            search_results = self.cache.get(query, self.search_args)
+            if search_results is not None:
+                return search_results
+
+        if self.client is None:
+            self.client = ClientManager.get_tavily_client(self.search_args['tavily_api_key'],
+                                                          self.search_args.get('tavily_base_url'))
+
+        with self.tracker.track():
+            response = self.client.search(**self.get_search_params(query))
+        return self.save_search_results(query, response)
+
+    async def search_async(self, query):
+        if self.cache is not None:
+            search_results = self.cache.get(query, self.search_args)
+            if search_results is not None:
+                return search_results
+
+        client = ClientManager.get_async_tavily_client(self.search_args['tavily_api_key'],
+                                                       self.search_args.get('tavily_base_url'))
+        response = await client.search(**self.get_search_params(query))
+        return self.save_search_results(query, response)
+
+    def get_search_params(self, query):
+        return {
+            'query': query,
+            'search_depth': self.search_args['search_depth'],
+            'topic': self.search_args['topic'],
+            'days': self.search_args['days'],
+            'max_results': self.search_args['max_results'],
+            'include_domains': self.search_args['include_domains'],
+            'exclude_domains': self.search_args['exclude_domains'],
+            'include_answer': self.search_args['include_answer'],
+            'include_raw_content': self.search_args['include_raw_content'],
+            'include_images': self.search_args['include_images'],
+        }
+
+    def save_search_results(self, query, response):
+        search_results = []
+        for result in response["results"]:
+            search_results.append({
+                "title": result["title"],
+                "url": result["url"],
+                "content": result["content"],
+                "score": result["score"],
+                "raw_content": result["raw_content"],
+            })
+
+        if self.cache is not None:
+            self.cache.put(query, self.search_args, search_results)
+        return search_results
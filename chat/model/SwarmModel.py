@@ -1,35 +1,91 @@
+from collections import OrderedDict
+from functools import partial
+
 from PyQt6.QtCore import QObject, pyqtSignal
+from chat.model.AsyncSwarmRun import AsyncSwarmRun
 from chat.model.SwarmThread import SwarmThread
-from util.Constants import MODEL_MESSAGE
+from util.Constants import MODEL_MESSAGE, Constants
 
 
 class SwarmModel(QObject):
-    thread_started_signal = pyqtSignal()
-    thread_finished_signal = pyqtSignal()
-    response_signal = pyqtSignal(str, bool)
-    response_finished_signal = pyqtSignal(str, str, float, bool)
+    """
+    Runs agents for several conversations at once, one run per chat_main_id.
+
+    Runs beyond the concurrency limit wait in a queue and start as soon as another run finishes.
+    Every signal carries the chat_main_id of the run it belongs to. In the asyncio execution mode the
+    runs share one event loop thread instead of having a thread each.
+    """
+    thread_started_signal = pyqtSignal(int)
+    thread_finished_signal = pyqtSignal(int)
+    response_signal = pyqtSignal(int, str, bool)
+    response_finished_signal = pyqtSignal(int, str, str, float, bool, object)
+    chat_summary_signal = pyqtSignal(int, object)
+    run_error_signal = pyqtSignal(int, str, str, float)
 
-    def __init__(self):
+    def __init__(self, max_concurrent_runs=int(Constants.MAX_CONCURRENT_RUNS),
+                 execution_mode=Constants.EXECUTION_MODE_THREAD):
         super().__init__()
-        self.swarm_thread = None
+        self.swarm_threads = {}
+        self.pending_runs = OrderedDict()
+        self.max_concurrent_runs = max(1, max_concurrent_runs)
+        self.execution_mode = execution_mode
+
+    def set_execution_mode(self, execution_mode):
+        # Runs that already started keep their mode
+        self.execution_mode = execution_mode
+
+    def set_max_concurrent_runs(self, max_concurrent_runs):
+        self.max_concurrent_runs = max(1, max_concurrent_runs)
+        self.start_pending_runs()
 
-    def run_agent(self, args):
-        if self.swarm_thread is not None and self.swarm_thread.isRunning():
+    def is_running(self, chat_main_id):
+        return chat_main_id in self.swarm_threads or chat_main_id in self.pending_runs
+
+    def run_agent(self, chat_main_id, args):
+        if self.is_running(chat_main_id):
             print(f"{MODEL_MESSAGE.THREAD_RUNNING}")
-            self.swarm_thread.wait()
+            return
+
+        if len(self.swarm_threads) >= self.max_concurrent_runs:
+            print(f"{MODEL_MESSAGE.THREAD_QUEUED} {chat_main_id}")
+            self.pending_runs[chat_main_id] = args
+        else:
+            self.start_run(chat_main_id, args)
 
-        self.swarm_thread = SwarmThread(args)
-        self.swarm_thread.started.connect(self.thread_started_signal.emit)
-        self.swarm_thread.finished.connect(self.handle_thread_finished)
-        self.swarm_thread.response_signal.connect(self.response_signal.emit)
-        self.swarm_thread.response_finished_signal.connect(self.response_finished_signal.emit)
-        self.swarm_thread.start()
+    def start_run(self, chat_main_id, args):
+        if self.execution_mode == Constants.EXECUTION_MODE_ASYNCIO:
+            swarm_thread = AsyncSwarmRun(args)
+        else:
+            swarm_thread = SwarmThread(args)
+        swarm_thread.started.connect(partial(self.thread_started_signal.emit, chat_main_id))
+        swarm_thread.finished.connect(partial(self.handle_thread_finished, chat_main_id))
+        swarm_thread.response_signal.connect(partial(self.response_signal.emit, chat_main_id))
+        swarm_thread.response_finished_signal.connect(partial(self.response_finished_signal.emit, chat_main_id))
+        swarm_thread.chat_summary_signal.connect(partial(self.chat_summary_signal.emit, chat_main_id))
+        swarm_thread.run_error_signal.connect(partial(self.run_error_signal.emit, chat_main_id))
+        self.swarm_threads[chat_main_id] = swarm_thread
+        swarm_thread.start()
 
-    def handle_thread_finished(self):
+    def start_pending_runs(self):
+        while self.pending_runs and len(self.swarm_threads) < self.max_concurrent_runs:
+            chat_main_id, args = self.pending_runs.popitem(last=False)
+            self.start_run(chat_main_id, args)
+
+    def handle_thread_finished(self, chat_main_id):
         print(f"{MODEL_MESSAGE.THREAD_FINISHED}")
-        self.thread_finished_signal.emit()
-        self.swarm_thread = None
+        swarm_thread = self.swarm_threads.pop(chat_main_id, None)
+        if swarm_thread is not None:
+            swarm_thread.deleteLater()
+        self.thread_finished_signal.emit(chat_main_id)
+        self.start_pending_runs()
+
+    def force_stop(self, chat_main_id):
+        if chat_main_id in self.pending_runs:
+            del self.pending_runs[chat_main_id]
+            self.thread_finished_signal.emit(chat_main_id)
+        elif chat_main_id in self.swarm_threads:
+            self.swarm_threads[chat_main_id].set_force_stop(True)
 
-    def force_stop(self):
-        if self.swarm_thread is not None:
-            self.swarm_thread.set_force_stop(True)
+    def force_stop_all(self):
+        for chat_main_id in list(self.pending_runs) + list(self.swarm_threads):
+            self.force_stop(chat_main_id)
@@ -1,17 +1,20 @@
+import html
+
 from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QIcon
-from PyQt6.QtWidgets import QVBoxLayout, QWidget, QHBoxLayout, QPushButton
+from PyQt6.QtWidgets import QVBoxLayout, QWidget, QHBoxLayout, QPushButton, QListWidget, QListWidgetItem, QLabel, \
+    QSplitter
 
 from custom.ChatList import ChatList
 from custom.PromptTextEdit import PromptTextEdit
 from util.Constants import Constants, UI
-from util.Utility import Utility
+from util.StyleManager import StyleManager
 
 
 class ChatHistory(QWidget):
     new_chat_signal = pyqtSignal(str)
     delete_chat_signal = pyqtSignal()
     filter_signal = pyqtSignal(str)
+    message_search_result_signal = pyqtSignal(int, int)
 
     def __init__(self, model):
         super().__init__()
@@ -19,11 +22,11 @@ class ChatHistory(QWidget):
         self.initialize_ui()
 
     def initialize_ui(self):
-        self.add_button = QPushButton(QIcon(Utility.get_icon_path('ico', 'database--plus.png')), "")
+        self.add_button = QPushButton(StyleManager.get_icon('database--plus.png'), "")
         self.add_button.clicked.connect(self.add_new_chat)
         self.add_button.setToolTip(UI.ADD)
 
-        self.delete_button = QPushButton(QIcon(Utility.get_icon_path('ico', 'database--minus.png')), "")
+        self.delete_button = QPushButton(StyleManager.get_icon('database--minus.png'), "")
         self.delete_button.clicked.connect(self.delete_chat)
         self.delete_button.setToolTip(UI.DELETE)
 
@@ -53,9 +56,17 @@ class ChatHistory(QWidget):
 
         self._chat_list = ChatList(self.model)
 
+        self.message_search_list = QListWidget()
+        self.message_search_list.itemClicked.connect(self.select_message_search_result)
+        self.message_search_list.setVisible(False)
+
+        list_splitter = QSplitter(Qt.Orientation.Vertical)
+        list_splitter.addWidget(self._chat_list)
+        list_splitter.addWidget(self.message_search_list)
+
         main_layout = QVBoxLayout()
         main_layout.addWidget(top_widget)
-        main_layout.addWidget(self._chat_list)
+        main_layout.addWidget(list_splitter)
 
         self.setLayout(main_layout)
 
@@ -68,6 +79,28 @@ class ChatHistory(QWidget):
     def filter_list(self, text: str):
         self.filter_signal.emit(text)
 
+    def set_message_search_results(self, results):
+        self.message_search_list.clear()
+        for result in results:
+            snippet = html.escape(result['snippet'] or "")
+            snippet = snippet.replace(Constants.MESSAGE_SEARCH_MATCH_START, "<b>")
+            snippet = snippet.replace(Constants.MESSAGE_SEARCH_MATCH_END, "</b>")
+
+            label = QLabel(f"<b>{html.escape(result['title'])}</b> ({result['chat_type']})<br>{snippet}")
+            label.setWordWrap(True)
+            label.setTextFormat(Qt.TextFormat.RichText)
+
+            item = QListWidgetItem()
+            item.setData(Qt.ItemDataRole.UserRole, (result['chat_main_id'], result['id']))
+            item.setSizeHint(label.sizeHint())
+            self.message_search_list.addItem(item)
+            self.message_search_list.setItemWidget(item, label)
+        self.message_search_list.setVisible(bool(results))
+
+    def select_message_search_result(self, item):
+        chat_main_id, chat_detail_id = item.data(Qt.ItemDataRole.UserRole)
+        self.message_search_result_signal.emit(chat_main_id, chat_detail_id)
+
     @property
     def chat_list(self):
         return self._chat_list
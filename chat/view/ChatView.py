@@ -1,18 +1,20 @@
 from functools import partial
 
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QIcon
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QScrollArea, QSizePolicy, QSplitter, QComboBox, QLabel, QTabWidget, \
+from PyQt6.QtCore import Qt, pyqtSignal, QPoint, QTimer
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QSizePolicy, QSplitter, QComboBox, QLabel, QTabWidget, \
     QGroupBox, QFormLayout, QPushButton, QHBoxLayout, QApplication, QTextEdit, QSpinBox, QListWidget, \
-    QCheckBox, QLineEdit
+    QCheckBox, QLineEdit, QListView, QAbstractItemView
 
+from chat.model.SwarmAgents import SwarmAgents
 from chat.view.ChatHistory import ChatHistory
-from chat.view.ChatWidget import ChatWidget
+from custom.ChatMessageDelegate import ChatMessageDelegate
+from custom.ChatMessageModel import ChatMessageModel
 from custom.PromptTextEdit import PromptTextEdit
 from util.ChatType import ChatType
-from util.Constants import Constants
+from util.Constants import Constants, MessageDisplay
 from util.Constants import ProviderName, UI
 from util.SettingsManager import SettingsManager
+from util.StyleManager import StyleManager
 from util.Utility import Utility
 
 
@@ -20,14 +22,16 @@ class ChatView(QWidget):
     submitted_signal = pyqtSignal(object)
     stop_signal = pyqtSignal()
     reload_chat_detail_signal = pyqtSignal(int)
+    load_older_chat_detail_signal = pyqtSignal()
 
     def __init__(self, model):
         super().__init__()
         self.model = model
-        self._settings = SettingsManager.get_settings()
         self._current_chat_llm = Utility.get_settings_value(section="AI_Provider", prop="llm",
                                                             default="OpenAI", save=True)
         self.found_text_positions = []
+        self.current_position_index = -1
+        self.follow_output = False
         self.initialize_ui()
 
     def initialize_ui(self):
@@ -37,17 +41,23 @@ class ChatView(QWidget):
         self.top_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
 
         # Create buttons
-        self.clear_all_button = QPushButton(QIcon(Utility.get_icon_path('ico', 'bin.png')), UI.CLEAR_ALL)
+        self.clear_all_button = QPushButton(StyleManager.get_icon('bin.png'), UI.CLEAR_ALL)
         self.clear_all_button.clicked.connect(lambda: self.clear_all())
 
-        self.copy_all_button = QPushButton(QIcon(Utility.get_icon_path('ico', 'cards-stack.png')), UI.COPY_ALL)
+        self.copy_all_button = QPushButton(StyleManager.get_icon('cards-stack.png'), UI.COPY_ALL)
         self.copy_all_button.clicked.connect(lambda: QApplication.clipboard().setText(self.get_all_text_content()))
 
-        self.reload_button = QPushButton(QIcon(Utility.get_icon_path('ico', 'cards-address.png')), UI.RELOAD_ALL)
+        self.reload_button = QPushButton(StyleManager.get_icon('cards-address.png'), UI.RELOAD_ALL)
         self.reload_button.clicked.connect(lambda: self.reload_chat_detail_signal.emit(-1))
 
+        # The search runs as the user types, Enter moves to the next match
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(Constants.SEARCH_TYPING_DELAY_MS)
+        self.search_timer.timeout.connect(lambda: self.search(self.search_text.toPlainText()))
         self.search_text = PromptTextEdit()
-        self.search_text.submitted_signal.connect(self.search)
+        self.search_text.textChanged.connect(self.search_timer.start)
+        self.search_text.submitted_signal.connect(self.handle_search_submitted)
         self.search_text.setPlaceholderText(UI.SEARCH_PROMPT_PLACEHOLDER)
 
         self.search_text.setFixedHeight(self.clear_all_button.sizeHint().height())
@@ -55,9 +65,9 @@ class ChatView(QWidget):
         self.search_result = QLabel()
 
         # Create navigation buttons
-        self.prev_button = QPushButton(QIcon(Utility.get_icon_path('ico', 'arrow-180.png')), '')
+        self.prev_button = QPushButton(StyleManager.get_icon('arrow-180.png'), '')
         self.prev_button.clicked.connect(self.scroll_to_previous_match_widget)
-        self.next_button = QPushButton(QIcon(Utility.get_icon_path('ico', 'arrow.png')), '')
+        self.next_button = QPushButton(StyleManager.get_icon('arrow.png'), '')
         self.next_button.clicked.connect(self.scroll_to_next_match_widget)
 
         # Create a horizontal layout and add the buttons
@@ -79,21 +89,22 @@ class ChatView(QWidget):
         self.top_widget.setSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Maximum)
 
         # Result View
-        self.result_layout = QVBoxLayout()
-        self.result_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        self.result_layout.setSpacing(0)
-        self.result_layout.setContentsMargins(0, 0, 0, 0)
-
-        self.result_widget = QWidget()
-        self.result_widget.setLayout(self.result_layout)
-
-        # Scroll Area
-        self.ai_answer_scroll_area = QScrollArea()
-        self.ai_answer_scroll_area.setWidgetResizable(True)
-        self.ai_answer_scroll_area.setWidget(self.result_widget)
+        self.chat_message_model = ChatMessageModel()
+        self.chat_message_view = QListView()
+        self.chat_message_delegate = ChatMessageDelegate(self.chat_message_view)
+        self.chat_message_view.setModel(self.chat_message_model)
+        self.chat_message_view.setItemDelegate(self.chat_message_delegate)
+        self.chat_message_view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.chat_message_view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.chat_message_view.setEditTriggers(QAbstractItemView.EditTrigger.DoubleClicked)
+        self.chat_message_view.setResizeMode(QListView.ResizeMode.Adjust)
+        self.chat_message_model.dataChanged.connect(
+            lambda top_left, *args: self.chat_message_delegate.sizeHintChanged.emit(top_left))
+        self.chat_message_view.verticalScrollBar().valueChanged.connect(self.handle_scroll_value_changed)
+        self.chat_message_view.verticalScrollBar().rangeChanged.connect(self.handle_scroll_range_changed)
 
         # Stop Button
-        self.stop_button = QPushButton(QIcon(Utility.get_icon_path('ico', 'minus-circle.png')), 'Stop')
+        self.stop_button = QPushButton(StyleManager.get_icon('minus-circle.png'), 'Stop')
         self.stop_button.clicked.connect(self.force_stop)
 
         stop_layout = QHBoxLayout()
@@ -124,7 +135,7 @@ class ChatView(QWidget):
         chat_layout = QVBoxLayout()
 
         chat_layout.addWidget(self.top_widget)
-        chat_layout.addWidget(self.ai_answer_scroll_area)
+        chat_layout.addWidget(self.chat_message_view)
         chat_layout.addWidget(self.stop_widget)
         chat_layout.addWidget(self.prompt_widget)
 
@@ -134,7 +145,7 @@ class ChatView(QWidget):
         config_layout = QVBoxLayout()
 
         self.config_tabs = QTabWidget()
-        chat_icon = QIcon(Utility.get_icon_path('ico', 'processor.png'))
+        chat_icon = StyleManager.get_icon('processor.png')
         self.config_tabs.addTab(self.create_parameters_tab(), chat_icon, UI.AI_AGENT)
         self.config_tabs.addTab(self.create_chatdb_tab(), chat_icon, UI.AI_AGENT_QA_LIST)
 
@@ -155,53 +166,114 @@ class ChatView(QWidget):
         self.setLayout(main_layout)
 
     def reset_search_bar(self):
+        self.search_timer.stop()
+        self.set_search_text("")
         self.found_text_positions = []
         self.search_result.clear()
         self.current_position_index = -1
         self.update_navigation_buttons()
 
-    def search(self, text: str):
-        if text and text.strip() and len(text) >= 2:
-            self.found_text_positions = []
-            self.current_position_index = -1
+    def set_search_text(self, text):
+        if self.search_text.toPlainText() != text:
+            self.search_text.blockSignals(True)
+            self.search_text.setPlainText(text)
+            self.search_text.blockSignals(False)
+
+    def search(self, text: str, scroll=True):
+        self.search_timer.stop()
+        self.set_search_text(text)
+        current_position = self.found_text_positions[self.current_position_index] \
+            if self.current_position_index >= 0 else None
+        hits = self.chat_message_model.find_text(text) if text.strip() else {}
+
+        # Only the rows that are found now or were found before are rendered again
+        self.chat_message_model.begin_changes()
+        for row in {row for row, _ in self.found_text_positions} - hits.keys():
+            self.chat_message_model.set_display(row, MessageDisplay.STYLED)
+        for row, matches in sorted(hits.items()):
+            self.chat_message_model.set_display(row, MessageDisplay.HIGHLIGHT, text, matches)
+
+        # Every occurrence is a (row, match index) pair, so the navigation steps from match to match
+        self.found_text_positions = [(row, match_index) for row, matches in sorted(hits.items())
+                                     for match_index in range(len(matches))]
+        self.current_position_index = -1
+        if self.found_text_positions:
+            if not scroll and current_position in self.found_text_positions:
+                self.current_position_index = self.found_text_positions.index(current_position)
+            else:
+                self.current_position_index = 0
+            self.set_current_match(self.found_text_positions[self.current_position_index])
+        self.chat_message_model.end_changes()
+        if self.found_text_positions and scroll:
+            self.scroll_to_match_widget(self.found_text_positions[self.current_position_index])
+        self.update_search_result(text)
+        self.update_navigation_buttons()
 
-            search_text_lower = text.lower()
+    def show_search_result(self, text, chat_detail_id):
+        # The message picked in the search results holds the current match, not the first message of the chat
+        self.search(text, scroll=False)
+        row = self.chat_message_model.find_row(chat_detail_id)
+        positions = [position for position in self.found_text_positions if position[0] == row]
+        if positions:
+            self.current_position_index = self.found_text_positions.index(positions[0])
+            self.scroll_to_match_widget(positions[0])
+            self.update_search_result(text)
+            self.update_navigation_buttons()
+        elif row >= 0:
+            self.chat_message_view.scrollTo(self.chat_message_model.index(row),
+                                            QAbstractItemView.ScrollHint.PositionAtTop)
 
-            for i in range(self.result_layout.count()):
-                current_widget = self.result_layout.itemAt(i).widget()
-                current_text = current_widget.get_original_text()
-                current_text_lower = current_text.lower()
+    def handle_search_submitted(self, text):
+        if self.search_timer.isActive():
+            self.search(text)
+        else:
+            self.scroll_to_next_match_widget()
 
-                if search_text_lower in current_text_lower:
-                    self.found_text_positions.append(i)
-                    highlight_text = current_widget.highlight_search_text(current_text, text)
-                    current_widget.apply_highlight(highlight_text)
-                else:
-                    current_widget.show_original_text()
+    def refresh_search(self):
+        # New messages are searched too, without moving away from the current match
+        text = self.search_text.toPlainText()
+        if text.strip():
+            self.search(text, scroll=False)
 
-            if self.found_text_positions:
-                self.current_position_index = 0
-                self.scroll_to_match_widget(self.found_text_positions[self.current_position_index])
+    def update_search_result(self, text=None):
         if len(self.found_text_positions) > 0:
-            self.search_result.setText(f'{len(self.found_text_positions)} {UI.FOUNDS}')
+            self.search_result.setText(f'{self.current_position_index + 1}/{len(self.found_text_positions)} '
+                                       f'{UI.FOUNDS}')
+        elif text and text.strip():
+            self.search_result.setText(UI.NOT_FOUND)
         else:
             self.search_result.clear()
-        self.update_navigation_buttons()
-        self.search_text.clear()
+
+    def set_current_match(self, position):
+        row, match_index = position
+        self.chat_message_model.begin_changes()
+        for previous_row, _ in self.found_text_positions:
+            if previous_row != row:
+                self.chat_message_model.set_current_match(previous_row, None)
+        self.chat_message_model.set_current_match(row, match_index)
+        self.chat_message_model.end_changes()
 
     def scroll_to_match_widget(self, position):
-        self.ai_answer_scroll_area.ensureWidgetVisible(self.result_layout.itemAt(position).widget())
+        row, _ = position
+        self.set_current_match(position)
+        self.chat_message_view.scrollTo(self.chat_message_model.index(row),
+                                        QAbstractItemView.ScrollHint.PositionAtTop)
+        message = self.chat_message_model.index(row).data(ChatMessageModel.MessageRole)
+        scroll_bar = self.chat_message_view.verticalScrollBar()
+        scroll_bar.setValue(scroll_bar.value() + self.chat_message_delegate.get_current_match_offset(message))
 
     def scroll_to_previous_match_widget(self):
         if len(self.found_text_positions) > 0 and self.current_position_index > 0:
             self.current_position_index -= 1
             self.scroll_to_match_widget(self.found_text_positions[self.current_position_index])
+            self.update_search_result()
             self.update_navigation_buttons()
 
     def scroll_to_next_match_widget(self):
         if len(self.found_text_positions) > 0 and self.current_position_index < len(self.found_text_positions) - 1:
             self.current_position_index += 1
             self.scroll_to_match_widget(self.found_text_positions[self.current_position_index])
+            self.update_search_result()
             self.update_navigation_buttons()
 
     def update_navigation_buttons(self):
@@ -243,7 +315,7 @@ class ChatView(QWidget):
         current_prompt = self.findChild(QTextEdit, f"{name}_current_prompt")
         selected_key = current_promptList.currentText()
         value = current_prompt.toPlainText()
-        self._settings.setValue(f"{name}_Prompt/{selected_key}", value)
+        SettingsManager.set_value(f"{name}_Prompt/{selected_key}", value)
         self.update_prompt_list(name, Utility.extract_number_from_end(selected_key) - 1)
 
     def update_prompt_list(self, name, index=0):
@@ -364,7 +436,7 @@ class ChatView(QWidget):
         include_domain_line_edit.setPlaceholderText('Add domain name you want to include')
         include_domain_layout.addWidget(include_domain_line_edit)
 
-        include_add_button = QPushButton(QIcon(Utility.get_icon_path('ico', 'plus.png')), "Add")
+        include_add_button = QPushButton(StyleManager.get_icon('plus.png'), "Add")
         include_add_button.setObjectName(f"{name}_IncludeAddButton")
         include_domain_layout.addWidget(include_add_button)
 
@@ -382,7 +454,7 @@ class ChatView(QWidget):
         # Add buttons
         include_buttons_layout = QHBoxLayout()
 
-        include_delete_button = QPushButton(QIcon(Utility.get_icon_path('ico', 'minus.png')), "Remove")
+        include_delete_button = QPushButton(StyleManager.get_icon('minus.png'), "Remove")
         include_delete_button.setObjectName(f"{name}_IncludeDeleteButton")
         include_delete_button.setEnabled(False)
         include_buttons_layout.addWidget(include_delete_button)
@@ -411,7 +483,7 @@ class ChatView(QWidget):
         exclude_domain_line_edit.setPlaceholderText('Add domain name you want to exclude')
         exclude_domain_layout.addWidget(exclude_domain_line_edit)
 
-        exclude_add_button = QPushButton(QIcon(Utility.get_icon_path('ico', 'plus.png')), "Add")
+        exclude_add_button = QPushButton(StyleManager.get_icon('plus.png'), "Add")
         exclude_add_button.setObjectName(f"{name}_ExcludeAddButton")
         exclude_domain_layout.addWidget(exclude_add_button)
 
@@ -429,7 +501,7 @@ class ChatView(QWidget):
         # Add buttons
         exclude_buttons_layout = QHBoxLayout()
 
-        exclude_delete_button = QPushButton(QIcon(Utility.get_icon_path('ico', 'minus.png')), "Remove")
+        exclude_delete_button = QPushButton(StyleManager.get_icon('minus.png'), "Remove")
         exclude_delete_button.setObjectName(f"{name}_ExcludeDeleteButton")
         exclude_delete_button.setEnabled(False)
         exclude_buttons_layout.addWidget(exclude_delete_button)
@@ -464,15 +536,8 @@ class ChatView(QWidget):
         return tab_widget
 
     def load_domains_from_settings(self, list_widget, domain_type):
-        settings = SettingsManager.get_settings()
-        settings.beginGroup(f"Tavily_{domain_type}_Domain_List")
-
-        keys = settings.allKeys()
-        for key in keys:
-            if settings.value(key, type=bool):
-                list_widget.addItem(key)
-
-        settings.endGroup()
+        for domain in Utility.get_tavily_domain_list(domain_type):
+            list_widget.addItem(domain)
 
     def add_domain_to_list(self, domain_line_edit, domain_list_widget):
         domain = domain_line_edit.text().strip()
@@ -516,40 +581,40 @@ class ChatView(QWidget):
         return tabWidget
 
     def max_result_changed(self, value, name):
-        self._settings.setValue(f"{name}_Search_Parameter/max_result", value)
+        SettingsManager.set_value(f"{name}_Search_Parameter/max_result", value)
 
     def days_changed(self, value, name):
-        self._settings.setValue(f"{name}_Search_Parameter/days", value)
+        SettingsManager.set_value(f"{name}_Search_Parameter/days", value)
 
     def search_depth_changed(self, value, name):
-        self._settings.setValue(f"{name}_Search_Parameter/search_depth", value)
+        SettingsManager.set_value(f"{name}_Search_Parameter/search_depth", value)
 
     def topic_changed(self, value, name):
-        self._settings.setValue(f"{name}_Search_Parameter/topic", value)
+        SettingsManager.set_value(f"{name}_Search_Parameter/topic", value)
 
     def stream_changed(self, checked, name):
         if checked:
-            self._settings.setValue(f"{name}_Search_Parameter/stream", 'True')
+            SettingsManager.set_value(f"{name}_Search_Parameter/stream", 'True')
         else:
-            self._settings.setValue(f"{name}_Search_Parameter/stream", 'False')
+            SettingsManager.set_value(f"{name}_Search_Parameter/stream", 'False')
 
     def include_answer_changed(self, checked, name):
         if checked:
-            self._settings.setValue(f"{name}_Search_Parameter/include_answer", 'True')
+            SettingsManager.set_value(f"{name}_Search_Parameter/include_answer", 'True')
         else:
-            self._settings.setValue(f"{name}_Search_Parameter/include_answer", 'False')
+            SettingsManager.set_value(f"{name}_Search_Parameter/include_answer", 'False')
 
     def include_raw_content_changed(self, checked, name):
         if checked:
-            self._settings.setValue(f"{name}_Search_Parameter/include_raw_content", 'True')
+            SettingsManager.set_value(f"{name}_Search_Parameter/include_raw_content", 'True')
         else:
-            self._settings.setValue(f"{name}_Search_Parameter/include_raw_content", 'False')
+            SettingsManager.set_value(f"{name}_Search_Parameter/include_raw_content", 'False')
 
     def include_images_changed(self, checked, name):
         if checked:
-            self._settings.setValue(f"{name}_Search_Parameter/include_images", 'True')
+            SettingsManager.set_value(f"{name}_Search_Parameter/include_images", 'True')
         else:
-            self._settings.setValue(f"{name}_Search_Parameter/include_images", 'False')
+            SettingsManager.set_value(f"{name}_Search_Parameter/include_images", 'False')
 
     def create_prompt_layout(self, name):
         groupSystem = QGroupBox(f"{name} Prompt")
@@ -569,7 +634,7 @@ class ChatView(QWidget):
         current_prompt.setMinimumHeight(150)
         current_prompt.setText(prompt_values['prompt1'])
 
-        save_prompt_button = QPushButton(QIcon(Utility.get_icon_path('ico', 'disk-black.png')), 'Save')
+        save_prompt_button = QPushButton(StyleManager.get_icon('disk-black.png'), 'Save')
         save_prompt_button.clicked.connect(lambda: self.save_prompt_value(name))
 
         promptLayout.addRow(promptLabel)
@@ -593,54 +658,82 @@ class ChatView(QWidget):
         return layoutWidget
 
     def update_ui_submit(self, chatType, text):
-        self.ai_answer_scroll_area.verticalScrollBar().rangeChanged.connect(self.adjust_scroll_bar)
         self.add_user_question(chatType, text)
-        self.stop_widget.setVisible(True)
+        self.prompt_text.clear()
+        self.set_running(True)
+        self.refresh_search()
+
+    def set_running(self, running):
+        self.prompt_text.setEnabled(not running)
+        self.stop_widget.setVisible(running)
+        self.set_follow_output(running)
+        if not running:
+            self.prompt_text.setFocus()
+
+    def set_follow_output(self, follow):
+        if follow == self.follow_output:
+            return
+        self.follow_output = follow
+        if follow:
+            self.chat_message_view.verticalScrollBar().rangeChanged.connect(self.adjust_scroll_bar)
+        else:
+            self.chat_message_view.verticalScrollBar().rangeChanged.disconnect(self.adjust_scroll_bar)
+
+    def add_user_question(self, chatType, text, model_name=""):
+        self.chat_message_model.add_message(chatType, text, model_name)
+
+    def set_messages(self, messages):
+        self.chat_message_model.set_messages(messages)
+        self.chat_message_view.scrollToBottom()
+
+    def prepend_messages(self, messages):
+        first_visible_row = self.chat_message_view.indexAt(QPoint(0, 0)).row()
+        self.chat_message_model.prepend_messages(messages)
+        self.found_text_positions = [(row + len(messages), match_index)
+                                     for row, match_index in self.found_text_positions]
+        if first_visible_row >= 0:
+            self.chat_message_view.scrollTo(self.chat_message_model.index(first_visible_row + len(messages)),
+                                            QAbstractItemView.ScrollHint.PositionAtTop)
 
-    def add_user_question(self, chatType, text):
-        user_question = ChatWidget(chatType, text)
-        self.result_layout.addWidget(user_question)
+    def handle_scroll_value_changed(self, value):
+        if self.chat_message_model.rowCount() and value == self.chat_message_view.verticalScrollBar().minimum():
+            self.load_older_chat_detail_signal.emit()
+
+    def handle_scroll_range_changed(self, min_val, max_val):
+        # Keep loading older pages while the loaded ones do not fill the view
+        if self.chat_message_model.rowCount() and min_val == max_val:
+            self.load_older_chat_detail_signal.emit()
 
     def adjust_scroll_bar(self, min_val, max_val):
-        self.ai_answer_scroll_area.verticalScrollBar().setSliderPosition(max_val)
+        self.chat_message_view.verticalScrollBar().setSliderPosition(max_val)
 
     def update_ui(self, result, stream):
         if stream:
-            chatWidget = self.get_last_ai_widget()
+            row = self.chat_message_model.get_last_ai_row()
 
-            if chatWidget:
-                chatWidget.add_text(result)
+            if row is not None:
+                self.chat_message_model.append_text(row, result)
             else:
-                chatWidget = ChatWidget(ChatType.AI)
-                chatWidget.add_text(result)
-                self.result_layout.addWidget(chatWidget)
+                self.chat_message_model.add_message(ChatType.AI, result, finished=False)
 
         else:
-            ai_answer = ChatWidget(ChatType.AI, result)
-            self.result_layout.addWidget(ai_answer)
+            self.chat_message_model.add_message(ChatType.AI, result)
 
     def update_ui_finish(self, model, finish_reason, elapsed_time, stream):
-        self.ai_answer_scroll_area.verticalScrollBar().rangeChanged.disconnect()
-        chatWidget = self.get_last_ai_widget()
-        if stream:
-            if chatWidget:
-                chatWidget.apply_style()
-                self.stop_widget.setVisible(False)
-        else:
-            self.stop_widget.setVisible(False)
-
-        if chatWidget and chatWidget.get_chat_type() == ChatType.AI:
-            chatWidget.set_model_name(
-                Constants.MODEL_PREFIX + model + Constants.RESPONSE_TIME + format(elapsed_time, ".2f"))
-
-    def get_last_ai_widget(self) -> ChatWidget | None:
-        layout_item = self.result_widget.layout().itemAt(self.result_widget.layout().count() - 1)
-        if layout_item:
-            last_ai_widget = layout_item.widget()
-            if last_ai_widget.get_chat_type() == ChatType.AI:
-                return last_ai_widget
-        else:
-            return None
+        row = self.chat_message_model.get_last_ai_row()
+        if stream and row is not None:
+            self.chat_message_model.finish_text(row)
+
+        if row is not None:
+            self.chat_message_model.set_model_name(
+                row, Constants.MODEL_PREFIX + model + Constants.RESPONSE_TIME + format(elapsed_time, ".2f"))
+        self.refresh_search()
+
+    def get_last_ai_text(self) -> str | None:
+        row = self.chat_message_model.get_last_ai_row()
+        if row is not None:
+            return self.chat_message_model.get_original_text(row)
+        return None
 
     def get_agent_prompts(self):
 
@@ -649,25 +742,8 @@ class ChatView(QWidget):
         tester_agent_prompt = self.findChild(QTextEdit, 'TesterAgent_current_prompt').toPlainText()
         search_agent_prompt = self.findChild(QTextEdit, 'SearchAgent_current_prompt').toPlainText()
 
-        agent_prompts = {
-            "orchestrator_agent": {
-                "name": "Orchestrator Agent",
-                "instructions": orchestrator_agent_prompt
-            },
-            "search_agent": {
-                "name": "Search Agent",
-                "instructions": search_agent_prompt
-            },
-            "programmer_agent": {
-                "name": "Programmer Agent",
-                "instructions": programmer_agent_prompt
-            },
-            "tester_agent": {
-                "name": "Tester Agent",
-                "instructions": tester_agent_prompt
-            },
-        }
-        return agent_prompts
+        return SwarmAgents.get_agent_prompt_list(orchestrator_agent_prompt, search_agent_prompt,
+                                                 programmer_agent_prompt, tester_agent_prompt)
 
     def get_include_domain_list(self, name):
         domain_name_list = self.findChild(QListWidget, f"{name}_IncludeDomainList")
@@ -686,7 +762,7 @@ class ChatView(QWidget):
             search_tool_args = {
                 'name': 'Tavily',
                 'query': text,
-                'tavily_api_key': self._settings.value(f'AI_Provider/Tavily'),
+                'tavily_api_key': SettingsManager.get_value('AI_Provider/Tavily'),
                 'search_depth': self.findChild(QComboBox,
                                                f'{name}_search_depth_comboBox').currentText(),
                 'topic': self.findChild(QComboBox, f'{name}_topic_comboBox').currentText(),
@@ -702,47 +778,60 @@ class ChatView(QWidget):
                 'exclude_domains': self.get_exclude_domain_list(name),
             }
 
-            all_messages = self.get_all_text()
-            all_messages.append({"role": "user", "content": text})
             args = {
-                'open_api_key': self._settings.value(f'AI_Provider/OpenAI'),
-                'messages': all_messages,
+                'open_api_key': SettingsManager.get_value('AI_Provider/OpenAI'),
+                'context_args': self.get_context_args(),
                 'agent_prompt_list': self.get_agent_prompts(),
                 'search_tool_args': search_tool_args,
-                'stream': self.findChild(QCheckBox, f'{name}_streamCheckbox').isChecked()
+                'stream': self.findChild(QCheckBox, f'{name}_streamCheckbox').isChecked(),
+                'stream_flush_interval_ms': int(
+                    Utility.get_settings_value(section="Stream_Option", prop="flush_interval_ms",
+                                               default=Constants.STREAM_FLUSH_INTERVAL_MS, save=True)),
+                'stream_flush_size': int(
+                    Utility.get_settings_value(section="Stream_Option", prop="flush_size",
+                                               default=Constants.STREAM_FLUSH_SIZE, save=True)),
+                'max_parallel_tool_calls': int(
+                    Utility.get_settings_value(section="Run_Option", prop="max_parallel_tool_calls",
+                                               default=Constants.MAX_PARALLEL_TOOL_CALLS, save=True)),
             }
             self.submitted_signal.emit(args)
 
-    def start_chat(self):
-        self.prompt_text.clear()
-        self.prompt_text.setEnabled(False)
-
-    def finish_chat(self):
-        self.prompt_text.setEnabled(True)
-        self.prompt_text.setFocus()
-
     def get_all_text_content(self):
         all_previous_qa = self.get_all_text()
         return '\n'.join(qa["content"] for qa in all_previous_qa)
 
+    def get_context_args(self):
+        token_budget = Utility.get_settings_value(section="Context_Option", prop="token_budget",
+                                                  default=Constants.CONTEXT_TOKEN_BUDGET, save=True)
+        window_tokens = Utility.get_settings_value(section="Context_Option", prop="window_tokens",
+                                                   default=Constants.CONTEXT_WINDOW_TOKENS, save=True)
+        summary_max_tokens = Utility.get_settings_value(section="Context_Option", prop="summary_max_tokens",
+                                                        default=Constants.CONTEXT_SUMMARY_MAX_TOKENS, save=True)
+        summary_model = Utility.get_settings_value(section="Context_Option", prop="summary_model",
+                                                   default=Constants.CONTEXT_SUMMARY_MODEL, save=True)
+        return {
+            'token_budget': int(token_budget),
+            'window_tokens': int(window_tokens),
+            'summary_max_tokens': int(summary_max_tokens),
+            'summary_model': summary_model,
+        }
+
     def get_all_text(self):
         all_previous_qa = []
-        for i in range(self.result_layout.count()):
-            current_widget = self.result_layout.itemAt(i).widget()
-            if current_widget.get_chat_type() == ChatType.HUMAN and len(current_widget.get_text()) > 0:
-                all_previous_qa.append({"role": "user", "content": current_widget.get_text()})
-            elif current_widget.get_chat_type() == ChatType.AI and len(current_widget.get_text()) > 0:
-                all_previous_qa.append({"role": "assistant", "content": current_widget.get_text()})
+        for i in range(self.chat_message_model.rowCount()):
+            chat_type = self.chat_message_model.get_chat_type(i)
+            text = self.chat_message_model.get_text(i)
+            if chat_type == ChatType.HUMAN and len(text) > 0:
+                all_previous_qa.append({"role": "user", "content": text})
+            elif chat_type == ChatType.AI and len(text) > 0:
+                all_previous_qa.append({"role": "assistant", "content": text})
         return all_previous_qa
 
     def clear_all(self):
-        target_layout = self.result_layout
-        if target_layout is not None:
-            while target_layout.count():
-                item = target_layout.takeAt(0)
-                widget = item.widget()
-                if widget is not None:
-                    widget.deleteLater()
+        # Only the view is emptied, the agents still get the saved conversation from the ConversationStore
+        self.chat_message_model.clear()
+        self.chat_message_delegate.clear_cache()
+        self.reset_search_bar()
 
     def force_stop(self):
         self.stop_signal.emit()
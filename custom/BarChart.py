@@ -0,0 +1,81 @@
+from PyQt6.QtCore import Qt, QRectF, QSize
+from PyQt6.QtGui import QPainter, QColor, QFontMetrics
+from PyQt6.QtWidgets import QWidget, QToolTip
+
+
+class BarChart(QWidget):
+    """
+    A small bar chart drawn with QPainter: one bar per (label, value) pair, the value of a bar is shown as
+    its tooltip. Labels that do not fit under their bar are thinned out.
+    """
+
+    def __init__(self, title, value_format="{:.0f}", color="#4a90d9", parent=None):
+        super().__init__(parent)
+        self.title = title
+        self.value_format = value_format
+        self.color = QColor(color)
+        self.data = []
+        self.bar_rects = []
+        self.setMouseTracking(True)
+        self.setMinimumHeight(180)
+
+    def set_data(self, data):
+        self.data = [(str(label), value or 0) for label, value in data]
+        self.bar_rects = []
+        self.update()
+
+    def sizeHint(self):
+        return QSize(400, 220)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        metrics = QFontMetrics(self.font())
+        line_height = metrics.height()
+        text_color = self.palette().windowText().color()
+
+        painter.setPen(text_color)
+        painter.drawText(QRectF(0, 0, self.width(), line_height), Qt.AlignmentFlag.AlignCenter, self.title)
+
+        max_value = max((value for _, value in self.data), default=0)
+        max_text = self.value_format.format(max_value)
+        left = metrics.horizontalAdvance(max_text) + 8
+        top = line_height + 6
+        bottom = self.height() - line_height - 6
+        width = self.width() - left - 8
+        height = bottom - top
+        if not self.data or width <= 0 or height <= 0:
+            return
+
+        painter.drawText(QRectF(0, top - line_height / 2, left - 4, line_height),
+                         Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, max_text)
+        painter.drawText(QRectF(0, bottom - line_height / 2, left - 4, line_height),
+                         Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, "0")
+        painter.setPen(self.palette().mid().color())
+        painter.drawLine(int(left), int(bottom), int(left + width), int(bottom))
+
+        slot_width = width / len(self.data)
+        bar_width = max(1.0, slot_width * 0.8)
+        label_width = max(metrics.horizontalAdvance(label) for label, _ in self.data) + 6
+        label_step = max(1, int(label_width // slot_width) + 1) if slot_width < label_width else 1
+
+        self.bar_rects = []
+        for index, (label, value) in enumerate(self.data):
+            x = left + index * slot_width + (slot_width - bar_width) / 2
+            bar_height = height * value / max_value if max_value else 0
+            rect = QRectF(x, bottom - bar_height, bar_width, bar_height)
+            painter.fillRect(rect, self.color)
+            self.bar_rects.append((QRectF(left + index * slot_width, top, slot_width, height), label, value))
+            if index % label_step == 0:
+                painter.setPen(text_color)
+                painter.drawText(QRectF(left + index * slot_width - label_width / 2 + slot_width / 2, bottom + 4,
+                                        label_width, line_height), Qt.AlignmentFlag.AlignCenter, label)
+
+    def mouseMoveEvent(self, event):
+        position = event.position()
+        for rect, label, value in self.bar_rects:
+            if rect.contains(position):
+                QToolTip.showText(event.globalPosition().toPoint(), f"{label}: {self.value_format.format(value)}",
+                                  self)
+                return
+        QToolTip.hideText()
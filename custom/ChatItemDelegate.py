@@ -1,9 +1,9 @@
 from PyQt6.QtCore import QRect, pyqtSignal, QSize
-from PyQt6.QtGui import QIcon, QMouseEvent
+from PyQt6.QtGui import QMouseEvent
 from PyQt6.QtWidgets import QStyledItemDelegate
 
 from util.Constants import UI
-from util.Utility import Utility
+from util.StyleManager import StyleManager
 
 
 class ChatItemDelegate(QStyledItemDelegate):
@@ -18,17 +18,12 @@ class ChatItemDelegate(QStyledItemDelegate):
         super().paint(painter, option, index)
         if self.mouse_over_index == index:
             # Draw buttons when mouse is over the item
-            minus_button_icon = QIcon(Utility.get_icon_path('ico', 'card--minus.png'))
-            edit_button_icon = QIcon(Utility.get_icon_path('ico', 'card--pencil.png'))
-
             minus_button_rect = QRect(option.rect.right() - UI.ITEM_ICON_SIZE * 2 - UI.ITEM_PADDING,
                                       option.rect.top(), UI.ITEM_ICON_SIZE, UI.ITEM_ICON_SIZE)
             edit_button_rect = QRect(option.rect.right() - UI.ITEM_ICON_SIZE, option.rect.top(),
                                      UI.ITEM_ICON_SIZE, UI.ITEM_ICON_SIZE)
-            painter.drawPixmap(minus_button_rect,
-                               minus_button_icon.pixmap(UI.ITEM_ICON_SIZE, UI.ITEM_ICON_SIZE))
-            painter.drawPixmap(edit_button_rect,
-                               edit_button_icon.pixmap(UI.ITEM_ICON_SIZE, UI.ITEM_ICON_SIZE))
+            painter.drawPixmap(minus_button_rect, StyleManager.get_pixmap('card--minus.png', UI.ITEM_ICON_SIZE))
+            painter.drawPixmap(edit_button_rect, StyleManager.get_pixmap('card--pencil.png', UI.ITEM_ICON_SIZE))
 
     def editorEvent(self, event, model, option, index):
         if event.type() == QMouseEvent.Type.MouseButtonPress:
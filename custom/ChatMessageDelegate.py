@@ -0,0 +1,303 @@
+import hashlib
+import math
+import re
+from collections import OrderedDict
+
+from PyQt6.QtCore import Qt, QRect, QRectF, QSize, QUrl, QEvent, QPoint
+from PyQt6.QtGui import QFont, QColor, QPalette, QAbstractTextDocumentLayout, QDesktopServices, QTextBlockFormat, \
+    QTextCharFormat
+from PyQt6.QtWidgets import QStyledItemDelegate, QApplication
+
+from custom.ChatMessageModel import ChatMessageModel
+from custom.ChatTextView import ChatTextView
+from custom.IncrementalMarkdownDocument import IncrementalMarkdownDocument
+from util.ChatType import ChatType
+from util.Constants import UI, MessageDisplay
+from util.SearchHighlighter import SearchHighlighter
+from util.SettingsManager import SettingsManager
+from util.StyleManager import StyleManager
+from util.Utility import Utility
+
+
+class ChatMessageDelegate(QStyledItemDelegate):
+    """
+    Paints one chat message per row: a title bar with the model label and the copy / original text / clear
+    buttons, followed by the rendered text. Rendered documents are only built for rows that are measured or
+    painted and are kept in a bounded LRU cache, so memory follows the viewport rather than the chat length.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.documents = OrderedDict()
+        self.rendered_documents = OrderedDict()
+        self.heights = {}
+        self.button_pixmaps = [StyleManager.get_pixmap(icon, UI.CHAT_ICON_SIZE)
+                               for icon in ['card--plus.png', 'chat.svg', 'erase.svg']]
+        self.load_style()
+
+    @staticmethod
+    def to_pixels(value, default):
+        match = re.match(r'\s*(\d+)', str(value))
+        return int(match.group(1)) if match else default
+
+    def load_style(self):
+        padding = Utility.get_settings_value(section="Common_Label_Style", prop="padding",
+                                             default="5px",
+                                             save=True)
+        color = Utility.get_settings_value(section="Common_Label_Style", prop="color",
+                                           default="#000000",
+                                           save=True)
+        font_size = Utility.get_settings_value(section="Common_Label_Style", prop="font-size",
+                                               default="14px",
+                                               save=True)
+        font_family = Utility.get_settings_value(section="Common_Label_Style", prop="font-family",
+                                                 default="sans-serif",
+                                                 save=True)
+        human_titlebar_background_color = Utility.get_settings_value(section="Chat_TitleBar_Style", prop="human_color",
+                                                                     default="#dfccff",
+                                                                     save=True)
+        ai_titlebar_background_color = Utility.get_settings_value(section="Chat_TitleBar_Style", prop="ai_color",
+                                                                  default="#d8fabe",
+                                                                  save=True)
+        model_color = Utility.get_settings_value(section="Info_Label_Style", prop="model-color",
+                                                 default="green",
+                                                 save=True)
+        code_color = Utility.get_settings_value(section="AI_Code_Style", prop="color",
+                                                default="#ccc",
+                                                save=True)
+        code_background_color = Utility.get_settings_value(section="AI_Code_Style", prop="background-color",
+                                                           default="#333333",
+                                                           save=True)
+        code_font_size = Utility.get_settings_value(section="AI_Code_Style", prop="font-size",
+                                                    default="14px",
+                                                    save=True)
+        code_font_family = Utility.get_settings_value(section="AI_Code_Style", prop="font-family",
+                                                      default="monospace",
+                                                      save=True)
+
+        self.padding = self.to_pixels(padding, 5)
+        self.text_color = QColor(color)
+        self.text_font = QFont(font_family)
+        self.text_font.setPixelSize(self.to_pixels(font_size, 14))
+        self.human_titlebar_color = QColor(human_titlebar_background_color)
+        self.ai_titlebar_color = QColor(ai_titlebar_background_color)
+        self.model_color = QColor(model_color)
+        self.model_font = QFont()
+        self.model_font.setBold(True)
+        self.code_block_format = QTextBlockFormat()
+        self.code_block_format.setBackground(QColor(code_background_color))
+        self.code_char_format = QTextCharFormat()
+        code_font = QFont(code_font_family)
+        code_font.setPixelSize(self.to_pixels(code_font_size, 14))
+        self.code_char_format.setFont(code_font)
+        self.code_char_format.setForeground(QColor(code_color))
+        self.highlight_style = f"color: {code_color}; background-color: {code_background_color};"
+        self.current_highlight_style = f"color: {code_background_color}; background-color: {code_color};"
+        self.style_version = SettingsManager.get_version()
+        self.rendered_documents.clear()
+        self.clear_cache()
+
+    def clear_cache(self):
+        self.documents.clear()
+        self.heights.clear()
+
+    def highlight_search_text(self, target_text, message):
+        return SearchHighlighter.to_html(target_text, message['search_matches'], self.highlight_style,
+                                         self.current_highlight_style, message['current_match'])
+
+    def is_incremental(self, message):
+        return message['chat_type'] == ChatType.AI and message['display'] == MessageDisplay.STYLED
+
+    def create_document(self, message):
+        text = "".join(filter(None, message['text_result']))
+        document = IncrementalMarkdownDocument(self.code_block_format, self.code_char_format)
+        document.setDefaultFont(self.text_font)
+        document.setDocumentMargin(self.padding)
+
+        if message['display'] == MessageDisplay.CLEARED:
+            pass
+        elif message['display'] == MessageDisplay.HIGHLIGHT:
+            document.set_html(self.highlight_search_text(text, message))
+        elif message['chat_type'] == ChatType.HUMAN:
+            document.set_plain_text(text)
+        elif message['display'] == MessageDisplay.ORIGINAL:
+            document.set_markdown(text, format_code=False)
+        elif message['finished']:
+            document.set_markdown(text)
+        else:
+            document.append_markdown(text)
+        return document
+
+    def update_style(self):
+        # A changed setting may change the style, the documents are then built again
+        if self.style_version != SettingsManager.get_version():
+            self.load_style()
+
+    def get_document(self, message, width):
+        self.update_style()
+        uid = message['uid']
+        state = self.documents.get(uid)
+        text_count = len(message['text_result'])
+
+        if state is not None and state['version'] == message['version'] \
+                and (state['text_count'] == text_count or (self.is_incremental(message) and not state['finished'])):
+            self.documents.move_to_end(uid)
+            document = state['document']
+            if state['text_count'] < text_count:
+                document.append_markdown("".join(filter(None, message['text_result'][state['text_count']:])))
+                state['text_count'] = text_count
+            if message['finished'] and not state['finished']:
+                document.finish()
+                state['finished'] = True
+        else:
+            document = self.get_rendered_document(message)
+            self.documents[uid] = {
+                'version': message['version'],
+                'text_count': text_count,
+                'finished': message['finished'],
+                'document': document,
+            }
+            while len(self.documents) > UI.CHAT_DOCUMENT_CACHE_SIZE:
+                self.documents.popitem(last=False)
+
+        if document.textWidth() != width:
+            document.setTextWidth(width)
+        return document
+
+    def get_rendered_document(self, message):
+        # A finished message is rendered once per text and display, so reopening a chat or scrolling back to
+        # a row whose document was evicted reuses the rendered document instead of formatting the text again
+        if not message['finished']:
+            return self.create_document(message)
+        text = "".join(filter(None, message['text_result']))
+        key = (message['chat_type'], message['display'], message['search_text'], message['current_match'],
+               hashlib.blake2b(text.encode(), digest_size=16).digest())
+        document = self.rendered_documents.get(key)
+        if document is not None:
+            self.rendered_documents.move_to_end(key)
+            return document
+        document = self.create_document(message)
+        self.rendered_documents[key] = document
+        while len(self.rendered_documents) > UI.CHAT_RENDER_CACHE_SIZE:
+            self.rendered_documents.popitem(last=False)
+        return document
+
+    def get_current_match_offset(self, message):
+        # Distance from the top of the row to the line holding the current search match
+        document = self.get_document(message, self.text_width())
+        block = document.begin()
+        while block.isValid():
+            iterator = block.begin()
+            while not iterator.atEnd():
+                fragment = iterator.fragment()
+                if UI.CURRENT_MATCH_ANCHOR in fragment.charFormat().anchorNames():
+                    line = block.layout().lineForTextPosition(fragment.position() - block.position())
+                    top = document.documentLayout().blockBoundingRect(block).top()
+                    return UI.CHAT_TITLE_BAR_HEIGHT + int(top + (line.y() if line.isValid() else 0))
+                iterator += 1
+            block = block.next()
+        return 0
+
+    def text_width(self):
+        return max(self.parent().viewport().width(), UI.CHAT_BUTTON_SIZE * 3)
+
+    def button_rects(self, title_rect):
+        top = title_rect.top() + (title_rect.height() - UI.CHAT_BUTTON_SIZE) // 2
+        right = title_rect.right() - self.padding
+        return [QRect(right - UI.CHAT_BUTTON_SIZE * (3 - i), top, UI.CHAT_BUTTON_SIZE, UI.CHAT_BUTTON_SIZE)
+                for i in range(3)]
+
+    def title_rect(self, rect):
+        return QRect(rect.left(), rect.top(), rect.width(), UI.CHAT_TITLE_BAR_HEIGHT)
+
+    def sizeHint(self, option, index):
+        self.update_style()
+        message = index.data(ChatMessageModel.MessageRole)
+        width = self.text_width()
+        key = (message['version'], len(message['text_result']), message['finished'], width)
+        cached = self.heights.get(message['uid'])
+        if cached is not None and cached[0] == key:
+            height = cached[1]
+        else:
+            height = math.ceil(self.get_document(message, width).size().height())
+            self.heights[message['uid']] = (key, height)
+        return QSize(width, UI.CHAT_TITLE_BAR_HEIGHT + height)
+
+    def paint(self, painter, option, index):
+        message = index.data(ChatMessageModel.MessageRole)
+        rect = option.rect
+        title_rect = self.title_rect(rect)
+
+        painter.save()
+        if message['chat_type'] == ChatType.HUMAN:
+            painter.fillRect(title_rect, self.human_titlebar_color)
+        else:
+            painter.fillRect(title_rect, self.ai_titlebar_color)
+
+        painter.setFont(self.model_font)
+        painter.setPen(self.model_color)
+        text_rect = title_rect.adjusted(self.padding, 0, -(UI.CHAT_BUTTON_SIZE * 3 + self.padding), 0)
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, message['model_name'])
+        if message['display'] == MessageDisplay.HIGHLIGHT:
+            painter.drawText(text_rect, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter,
+                             f"{len(message['search_matches'])} {UI.MATCHES}")
+
+        for pixmap, button_rect in zip(self.button_pixmaps, self.button_rects(title_rect)):
+            icon_rect = QRect(0, 0, UI.CHAT_ICON_SIZE, UI.CHAT_ICON_SIZE)
+            icon_rect.moveCenter(button_rect.center())
+            painter.drawPixmap(icon_rect, pixmap)
+
+        document = self.get_document(message, self.text_width())
+        text_top = title_rect.bottom() + 1
+        visible_rect = rect.intersected(self.parent().viewport().rect())
+
+        context = QAbstractTextDocumentLayout.PaintContext()
+        context.palette.setColor(QPalette.ColorRole.Text, self.text_color)
+        context.clip = QRectF(visible_rect.translated(-rect.left(), -text_top))
+        painter.translate(rect.left(), text_top)
+        painter.setClipRect(context.clip)
+        document.documentLayout().draw(painter, context)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            position = event.position().toPoint()
+            row = index.row()
+            copy_rect, original_text_rect, clear_rect = self.button_rects(self.title_rect(option.rect))
+            if copy_rect.contains(position):
+                QApplication.clipboard().setText(model.get_original_text(row))
+                return True
+            elif original_text_rect.contains(position):
+                model.toggle_original_text(row)
+                return True
+            elif clear_rect.contains(position):
+                model.toggle_clear_text(row)
+                return True
+
+            message = index.data(ChatMessageModel.MessageRole)
+            document = self.get_document(message, self.text_width())
+            text_origin = QPoint(option.rect.left(), option.rect.top() + UI.CHAT_TITLE_BAR_HEIGHT)
+            anchor = document.documentLayout().anchorAt((position - text_origin).toPointF())
+            if anchor:
+                QDesktopServices.openUrl(QUrl(anchor))
+                return True
+        return super().editorEvent(event, model, option, index)
+
+    def createEditor(self, parent, option, index):
+        # Double-clicking a message opens a read-only view of it so its text can be selected
+        message = index.data(ChatMessageModel.MessageRole)
+        document = self.get_document(message, self.text_width()).clone()
+        editor = ChatTextView(document)
+        document.setParent(editor)
+        editor.setParent(parent)
+        editor.setObjectName("chat_text_view")
+        return editor
+
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(option.rect.adjusted(0, UI.CHAT_TITLE_BAR_HEIGHT, 0, 0))
+
+    def setEditorData(self, editor, index):
+        pass
+
+    def setModelData(self, editor, model, index):
+        pass
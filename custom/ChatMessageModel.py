@@ -0,0 +1,188 @@
+from itertools import count
+
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt
+
+from util.ChatType import ChatType
+from util.Constants import MessageDisplay
+from util.MessageSearchIndex import MessageSearchIndex
+from util.SearchHighlighter import SearchHighlighter
+
+
+class ChatMessageModel(QAbstractListModel):
+    MessageRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.uid_counter = count()
+        self.search_index = MessageSearchIndex()
+        self.changed_rows = []
+        self.change_depth = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return len(self.messages)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        message = self.messages[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.get_text(index.row())
+        if role == self.MessageRole:
+            return message
+        return None
+
+    def flags(self, index):
+        return super().flags(index) | Qt.ItemFlag.ItemIsEditable
+
+    def create_message(self, chat_type, text, model_name="", finished=True, chat_detail_id=None):
+        uid = next(self.uid_counter)
+        if text:
+            self.search_index.add(uid, text)
+        return {
+            'uid': uid,
+            'chat_detail_id': chat_detail_id,
+            'chat_type': chat_type,
+            'text_result': [text] if text else [],
+            'model_name': model_name,
+            'finished': finished,
+            'display': MessageDisplay.STYLED,
+            'search_text': None,
+            'search_matches': [],
+            'current_match': None,
+            'version': 0,
+        }
+
+    def add_message(self, chat_type, text, model_name="", finished=True):
+        row = len(self.messages)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.messages.append(self.create_message(chat_type, text, model_name, finished))
+        self.endInsertRows()
+        return row
+
+    def set_messages(self, messages):
+        self.beginResetModel()
+        self.search_index.clear()
+        self.messages = [self.create_message(message['chat_type'], message['chat'], message.get('model_name', ""),
+                                             chat_detail_id=message.get('chat_detail_id'))
+                         for message in messages]
+        self.endResetModel()
+
+    def prepend_messages(self, messages):
+        if not messages:
+            return
+        self.beginInsertRows(QModelIndex(), 0, len(messages) - 1)
+        self.messages[0:0] = [self.create_message(message['chat_type'], message['chat'],
+                                                  message.get('model_name', ""),
+                                                  chat_detail_id=message.get('chat_detail_id'))
+                              for message in messages]
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.messages = []
+        self.search_index.clear()
+        self.endResetModel()
+
+    def append_text(self, row, text):
+        self.messages[row]['text_result'].append(text)
+        if text:
+            self.search_index.add(self.messages[row]['uid'], text)
+        self.notify_changed(row)
+
+    def finish_text(self, row):
+        self.messages[row]['finished'] = True
+        self.notify_changed(row)
+
+    def set_model_name(self, row, name):
+        self.messages[row]['model_name'] = name
+        self.notify_changed(row)
+
+    def set_display(self, row, display, search_text=None, search_matches=None):
+        if row >= len(self.messages):
+            return
+        message = self.messages[row]
+        search_matches = search_matches or []
+        if message['display'] == display and message['search_text'] == search_text \
+                and message['search_matches'] == search_matches and message['current_match'] is None:
+            return
+        message['display'] = display
+        message['search_text'] = search_text
+        message['search_matches'] = search_matches
+        message['current_match'] = None
+        message['version'] += 1
+        self.notify_changed(row)
+
+    def set_current_match(self, row, current_match):
+        if row >= len(self.messages):
+            return
+        message = self.messages[row]
+        if message['current_match'] == current_match:
+            return
+        message['current_match'] = current_match
+        message['version'] += 1
+        self.notify_changed(row)
+
+    def toggle_original_text(self, row):
+        if self.messages[row]['display'] == MessageDisplay.ORIGINAL:
+            self.set_display(row, MessageDisplay.STYLED)
+        else:
+            self.set_display(row, MessageDisplay.ORIGINAL)
+
+    def toggle_clear_text(self, row):
+        if self.messages[row]['display'] == MessageDisplay.CLEARED:
+            self.set_display(row, MessageDisplay.STYLED)
+        else:
+            self.set_display(row, MessageDisplay.CLEARED)
+
+    def notify_changed(self, row):
+        if self.change_depth:
+            self.changed_rows.append(row)
+            return
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+    def begin_changes(self):
+        # The view lays out all rows again for every change it is told about, so changes are collected
+        self.change_depth += 1
+
+    def end_changes(self):
+        self.change_depth -= 1
+        if self.change_depth or not self.changed_rows:
+            return
+        changed_rows, self.changed_rows = self.changed_rows, []
+        self.dataChanged.emit(self.index(min(changed_rows)), self.index(max(changed_rows)))
+
+    def get_chat_type(self, row):
+        return self.messages[row]['chat_type']
+
+    def get_original_text(self, row):
+        return "".join(filter(None, self.messages[row]['text_result']))
+
+    def get_text(self, row):
+        if self.messages[row]['display'] == MessageDisplay.CLEARED:
+            return ""
+        return self.get_original_text(row)
+
+    def find_text(self, search_text):
+        # Returns the matches per row; only the messages the index cannot rule out are scanned
+        candidates = self.search_index.get_candidates(search_text)
+        hits = {}
+        for row, message in enumerate(self.messages):
+            if candidates is None or message['uid'] in candidates:
+                matches = SearchHighlighter.find_matches(self.get_original_text(row), search_text)
+                if matches:
+                    hits[row] = matches
+        self.search_index.set_hits(search_text, (self.messages[row]['uid'] for row in hits))
+        return hits
+
+    def find_row(self, chat_detail_id):
+        for row, message in enumerate(self.messages):
+            if message['chat_detail_id'] == chat_detail_id:
+                return row
+        return -1
+
+    def get_last_ai_row(self):
+        if self.messages and self.messages[-1]['chat_type'] == ChatType.AI:
+            return len(self.messages) - 1
+        return None
@@ -0,0 +1,30 @@
+import math
+
+from PyQt6.QtCore import Qt, QSizeF
+from PyQt6.QtWidgets import QTextBrowser, QSizePolicy, QFrame
+
+
+class ChatTextView(QTextBrowser):
+    """Read-only text view that grows with its document instead of scrolling."""
+
+    def __init__(self, document=None):
+        super().__init__()
+        if document is not None:
+            self.setDocument(document)
+        self.setOpenExternalLinks(True)
+        self.setFrameShape(QFrame.Shape.NoFrame)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+        self.setTextInteractionFlags(
+            Qt.TextInteractionFlag.TextSelectableByMouse |
+            Qt.TextInteractionFlag.LinksAccessibleByMouse
+        )
+        self.document().documentLayout().documentSizeChanged.connect(self.fit_to_document)
+        self.fit_to_document(self.document().size())
+
+    def fit_to_document(self, size: QSizeF):
+        margins = self.contentsMargins()
+        height = math.ceil(size.height()) + margins.top() + margins.bottom()
+        if height != self.height():
+            self.setFixedHeight(height)
@@ -0,0 +1,235 @@
+import re
+
+from PyQt6.QtGui import QTextDocument, QTextCursor, QTextBlockFormat, QTextCharFormat, QTextFormat, \
+    QTextDocumentFragment
+
+
+class IncrementalMarkdownDocument(QTextDocument):
+    """
+    QTextDocument that is fed streamed Markdown.
+
+    While streaming, the text is cut into top-level blocks. A block is frozen (inserted once and never touched
+    again) only when the next one starts where no Markdown construct can carry on: after a blank line, not
+    indented, and not continuing an open list or block quote. The open block is the tail, removed and re-inserted
+    on every append. Inside a top-level code fence the lines are added as plain code as they arrive, and the fence
+    is rendered once when it closes, so the cost of an append stays proportional to the open block.
+
+    Some Markdown only resolves with the whole text (a reference definition changes links above it), so the
+    finished text is rendered again in one pass, exactly as set_markdown renders a stored message.
+    """
+    # CommonMark fences: indented by at most three spaces, and a backtick fence's info string has no backticks
+    FENCE_PATTERN = re.compile(r'( {0,3})(`{3,}(?![^\n]*`)|~{3,})[ \t]*([^\s`]*)')
+    LIST_ITEM_PATTERN = re.compile(r' {0,3}([-+*]|\d{1,9}[.)])(\s|$)')
+
+    def __init__(self, code_block_format=None, code_char_format=None, parent=None):
+        super().__init__(parent)
+        self.code_block_format = code_block_format
+        self.code_char_format = code_char_format
+        self.reset_stream()
+
+    def reset_stream(self):
+        self.source = []
+        self.pending = ""
+        self.scan_position = 0
+        self.segment_start = 0
+        self.block_kind = None
+        self.after_blank_line = False
+        self.fence = None
+        self.fence_indent = 0
+        self.code_block_formats = None
+        self.tail_position = 0
+
+    def set_plain_text(self, text):
+        self.reset_stream()
+        self.setPlainText(text or "")
+
+    def set_html(self, html_text):
+        self.reset_stream()
+        self.setHtml(html_text or "")
+
+    def set_markdown(self, text, format_code=True):
+        # A finished or stored message is rendered in one pass, only the streamed tail goes block by block
+        self.reset_stream()
+        self.setMarkdown(text or "")
+        if format_code:
+            self.style_code_blocks(0, self.characterCount())
+
+    def append_markdown(self, text):
+        if not text:
+            return
+        self.source.append(text)
+        self.pending += text
+        cursor = self.remove_tail()
+
+        line_start = self.scan_position
+        line_end = self.pending.find('\n', line_start)
+        while line_end != -1:
+            line_end += 1
+            if self.fence is None:
+                self.scan_line(cursor, line_start, line_end)
+            else:
+                self.scan_code_line(cursor, line_start, line_end)
+            line_start = line_end
+            line_end = self.pending.find('\n', line_start)
+
+        self.scan_position = line_start - self.segment_start
+        self.pending = self.pending[self.segment_start:]
+        self.segment_start = 0
+        if self.fence is None:
+            self.insert_markdown(cursor, self.pending)
+        else:
+            # The unfinished line of an open fence is shown as it is and replaced on the next append
+            cursor.insertText(self.strip_code_indent(self.pending[self.scan_position:]), self.code_block_formats[1])
+
+    def finish(self):
+        self.set_markdown("".join(self.source))
+
+    def remove_tail(self):
+        # Inside a fence only the unfinished code line is removed, the finished ones stay
+        cursor = QTextCursor(self)
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        if self.fence is not None:
+            cursor.movePosition(QTextCursor.MoveOperation.StartOfBlock, QTextCursor.MoveMode.KeepAnchor)
+            cursor.removeSelectedText()
+            return cursor
+        cursor.setPosition(self.tail_position, QTextCursor.MoveMode.KeepAnchor)
+        cursor.removeSelectedText()
+        self.reset_block_format(cursor)
+        return cursor
+
+    @staticmethod
+    def reset_block_format(cursor):
+        # The emptied block still carries the removed block and list format, the next block must not inherit it
+        text_list = cursor.currentList()
+        if text_list is not None:
+            text_list.remove(cursor.block())
+        cursor.setBlockFormat(QTextBlockFormat())
+        cursor.setBlockCharFormat(QTextCharFormat())
+        cursor.setCharFormat(QTextCharFormat())
+
+    def scan_line(self, cursor, line_start, line_end):
+        line = self.pending[line_start:line_end]
+        if not line.strip():
+            self.after_blank_line = True
+            return
+
+        indented = line[0] in ' \t'
+        fence_match = self.FENCE_PATTERN.match(line)
+        if fence_match and not (indented and self.block_kind in ('list', 'quote')):
+            self.freeze(cursor, line_start)
+            self.open_fence(cursor, fence_match)
+            return
+
+        if self.after_blank_line and not indented and not self.continues_block(line):
+            self.freeze(cursor, line_start)
+        if self.block_kind is None:
+            self.block_kind = self.get_block_kind(line)
+        self.after_blank_line = False
+
+    def scan_code_line(self, cursor, line_start, line_end):
+        line = self.pending[line_start:line_end]
+        stripped_line = line.strip()
+        if stripped_line and stripped_line == self.fence[0] * len(stripped_line) and len(stripped_line) >= len(self.fence) \
+                and len(line) - len(line.lstrip(' ')) < 4:
+            # The fence is rendered once, now that it is complete
+            cursor.setPosition(self.tail_position)
+            cursor.movePosition(QTextCursor.MoveOperation.End, QTextCursor.MoveMode.KeepAnchor)
+            cursor.removeSelectedText()
+            self.reset_block_format(cursor)
+            self.fence = None
+            self.freeze(cursor, line_end)
+            return
+        block_format, char_format = self.code_block_formats
+        cursor.insertText(self.strip_code_indent(line.rstrip('\r\n')), char_format)
+        cursor.insertBlock(block_format, char_format)
+
+    def continues_block(self, line):
+        if self.block_kind == 'list':
+            return self.LIST_ITEM_PATTERN.match(line) is not None
+        if self.block_kind == 'quote':
+            return line.startswith('>')
+        return False
+
+    def get_block_kind(self, line):
+        if self.LIST_ITEM_PATTERN.match(line):
+            return 'list'
+        if line.lstrip(' ').startswith('>'):
+            return 'quote'
+        return 'paragraph'
+
+    def freeze(self, cursor, end):
+        segment = self.pending[self.segment_start:end]
+        self.segment_start = end
+        self.block_kind = None
+        self.after_blank_line = False
+        if segment.strip():
+            self.insert_markdown(cursor, segment)
+            cursor.insertBlock(QTextBlockFormat(), QTextCharFormat())
+            self.tail_position = cursor.position()
+
+    def open_fence(self, cursor, fence_match):
+        self.fence = fence_match.group(2)
+        self.fence_indent = len(fence_match.group(1))
+        # Same formats as a fenced block rendered by setMarkdown, plus the code style
+        block_format = QTextBlockFormat()
+        block_format.setNonBreakableLines(True)
+        block_format.setProperty(QTextFormat.Property.BlockCodeFence, self.fence[0])
+        if fence_match.group(3):
+            block_format.setProperty(QTextFormat.Property.BlockCodeLanguage, fence_match.group(3))
+        char_format = QTextCharFormat()
+        char_format.setFontFamilies(['monospace'])
+        if self.code_block_format is not None:
+            block_format.merge(self.code_block_format)
+        if self.code_char_format is not None:
+            char_format.merge(self.code_char_format)
+        self.code_block_formats = (block_format, char_format)
+        cursor.setBlockFormat(block_format)
+        cursor.setBlockCharFormat(char_format)
+
+    def strip_code_indent(self, line):
+        # Code lines lose as much indentation as the opening fence had
+        return line[min(self.fence_indent, len(line) - len(line.lstrip(' '))):]
+
+    def insert_markdown(self, cursor, markdown):
+        start = cursor.position()
+        rendered = QTextDocument()
+        rendered.setMarkdown(markdown)
+        # A text starting with a rule is rendered after an empty first block, which is not part of it
+        first_block = rendered.begin()
+        if not first_block.text() and first_block.next().blockFormat().hasProperty(
+                QTextFormat.Property.BlockTrailingHorizontalRulerWidth):
+            first_block = first_block.next()
+        rendered_cursor = QTextCursor(rendered)
+        rendered_cursor.setPosition(first_block.position())
+        rendered_cursor.movePosition(QTextCursor.MoveOperation.End, QTextCursor.MoveMode.KeepAnchor)
+
+        block_count = self.blockCount()
+        cursor.insertFragment(rendered_cursor.selection())
+        if self.blockCount() - block_count > rendered.blockCount() - first_block.blockNumber() - 1:
+            # A list, rule or table is inserted after the block it was meant to fill, which is left empty
+            empty_cursor = QTextCursor(self)
+            empty_cursor.setPosition(start)
+            empty_cursor.setPosition(start + 1, QTextCursor.MoveMode.KeepAnchor)
+            empty_cursor.removeSelectedText()
+        elif first_block.textList() is None:
+            # The block that is filled keeps its own format, the first block's format (paragraph margins,
+            # heading level, code fence) is copied over
+            block_cursor = QTextCursor(self.findBlock(start))
+            block_cursor.setBlockFormat(first_block.blockFormat())
+            block_cursor.setBlockCharFormat(first_block.charFormat())
+        self.style_code_blocks(start, cursor.position())
+
+    def style_code_blocks(self, start, end):
+        if self.code_block_format is None and self.code_char_format is None:
+            return
+        block = self.findBlock(start)
+        while block.isValid() and block.position() <= end:
+            if block.blockFormat().nonBreakableLines():
+                cursor = QTextCursor(block)
+                cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock, QTextCursor.MoveMode.KeepAnchor)
+                if self.code_block_format is not None:
+                    cursor.mergeBlockFormat(self.code_block_format)
+                if self.code_char_format is not None:
+                    cursor.mergeBlockCharFormat(self.code_char_format)
+                    cursor.mergeCharFormat(self.code_char_format)
+            block = block.next()
@@ -0,0 +1,218 @@
+import datetime
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QComboBox, QPushButton, QLabel, \
+    QTableWidget, QTableWidgetItem, QHeaderView, QGroupBox, QScrollArea
+
+from custom.BarChart import BarChart
+from util.Constants import Constants, UI
+from util.DataManager import DataManager
+from util.StyleManager import StyleManager
+
+
+class DashboardView(QWidget):
+    """
+    Charts and tables over the recorded agent runs: latency distribution, throughput, web search share and
+    error rate over time, per model and per agent. Everything is read from the daily run_stats totals.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._database = DataManager.get_database()
+        self._search_cache = DataManager.get_search_cache()
+        self.latency_labels = self.get_latency_labels()
+        self.initialize_ui()
+
+    @staticmethod
+    def get_latency_labels():
+        buckets = Constants.RUN_STATS_LATENCY_BUCKETS
+        labels = [f"<{buckets[0]}s"]
+        labels.extend(f"{lower}-{upper}s" for lower, upper in zip(buckets, buckets[1:]))
+        labels.append(f"≥{buckets[-1]}s")
+        return labels
+
+    def initialize_ui(self):
+        self.period_combo = QComboBox()
+        for days in Constants.RUN_STATS_PERIODS:
+            self.period_combo.addItem(UI.DASHBOARD_PERIOD.format(days), days)
+        self.period_combo.setCurrentIndex(1)
+        self.period_combo.currentIndexChanged.connect(self.refresh)
+
+        self.model_combo = QComboBox()
+        self.model_combo.currentIndexChanged.connect(self.refresh)
+        self.agent_combo = QComboBox()
+        self.agent_combo.currentIndexChanged.connect(self.refresh)
+
+        self.refresh_button = QPushButton(StyleManager.get_icon('arrow-circle-double.png'), "")
+        self.refresh_button.setToolTip(UI.DASHBOARD_REFRESH)
+        self.refresh_button.clicked.connect(self.refresh)
+
+        control_layout = QHBoxLayout()
+        control_layout.addWidget(QLabel(UI.DASHBOARD))
+        control_layout.addStretch()
+        control_layout.addWidget(self.period_combo)
+        control_layout.addWidget(self.model_combo)
+        control_layout.addWidget(self.agent_combo)
+        control_layout.addWidget(self.refresh_button)
+
+        self.latency_chart = BarChart(UI.DASHBOARD_LATENCY_CHART)
+        self.runs_chart = BarChart(UI.DASHBOARD_RUNS_CHART)
+        self.throughput_chart = BarChart(UI.DASHBOARD_THROUGHPUT_CHART, "{:.1f}", "#3aa776")
+        self.search_chart = BarChart(UI.DASHBOARD_SEARCH_CHART, "{:.0f}%", "#e0a030")
+        self.error_chart = BarChart(UI.DASHBOARD_ERROR_CHART, "{:.1f}%", "#d9534f")
+
+        chart_layout = QGridLayout()
+        chart_layout.addWidget(self.latency_chart, 0, 0)
+        chart_layout.addWidget(self.runs_chart, 0, 1)
+        chart_layout.addWidget(self.throughput_chart, 1, 0)
+        chart_layout.addWidget(self.search_chart, 1, 1)
+        chart_layout.addWidget(self.error_chart, 2, 0)
+
+        self.search_cache_label = QLabel()
+        search_cache_layout = QVBoxLayout()
+        search_cache_layout.addWidget(self.search_cache_label)
+        search_cache_group = QGroupBox(UI.DASHBOARD_SEARCH_CACHE)
+        search_cache_group.setLayout(search_cache_layout)
+        chart_layout.addWidget(search_cache_group, 2, 1, Qt.AlignmentFlag.AlignTop)
+
+        self.model_table = self.create_table(UI.DASHBOARD_BY_MODEL)
+        self.agent_table = self.create_table(UI.DASHBOARD_BY_AGENT)
+
+        content_layout = QVBoxLayout()
+        content_layout.addLayout(chart_layout)
+        content_layout.addWidget(self.model_table)
+        content_layout.addWidget(self.agent_table)
+
+        content_widget = QWidget()
+        content_widget.setLayout(content_layout)
+
+        scroll_area = QScrollArea()
+        scroll_area.setWidgetResizable(True)
+        scroll_area.setWidget(content_widget)
+
+        main_layout = QVBoxLayout()
+        main_layout.addLayout(control_layout)
+        main_layout.addWidget(scroll_area)
+        self.setLayout(main_layout)
+
+    @staticmethod
+    def create_table(title):
+        table = QTableWidget(0, len(UI.DASHBOARD_TABLE_HEADERS) + 1)
+        table.setHorizontalHeaderLabels([title] + UI.DASHBOARD_TABLE_HEADERS)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        table.horizontalHeader().setStretchLastSection(True)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.setMinimumHeight(160)
+        return table
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+    def get_since_day(self):
+        return (datetime.date.today() - datetime.timedelta(days=self.period_combo.currentData() - 1)).isoformat()
+
+    def refresh(self):
+        since_day = self.get_since_day()
+        model_stats = self._database.get_run_stats("model", since_day)
+        agent_stats = self._database.get_run_stats("agent", since_day)
+        self.update_filter(self.model_combo, [row['model'] for row in model_stats])
+        self.update_filter(self.agent_combo, [row['agent'] for row in agent_stats])
+
+        model = self.model_combo.currentData()
+        agent = self.agent_combo.currentData()
+        day_stats = self._database.get_run_stats("day", since_day, model, agent)
+        if model is not None or agent is not None:
+            model_stats = self._database.get_run_stats("model", since_day, model, agent)
+            agent_stats = self._database.get_run_stats("agent", since_day, model, agent)
+
+        self.update_charts(since_day, day_stats)
+        self.update_table(self.model_table, "model", model_stats)
+        self.update_table(self.agent_table, "agent", agent_stats)
+        self.update_search_cache()
+
+    @staticmethod
+    def update_filter(combo, names):
+        # Keeps the selection when the names change and does not refresh again while filling the list
+        current = combo.currentData()
+        combo.blockSignals(True)
+        combo.clear()
+        combo.addItem(UI.DASHBOARD_ALL, None)
+        for name in names:
+            combo.addItem(name or "-", name)
+        index = combo.findData(current) if current is not None else 0
+        combo.setCurrentIndex(max(index, 0))
+        combo.blockSignals(False)
+
+    def update_charts(self, since_day, day_stats):
+        latency = [0] * len(self.latency_labels)
+        for row in day_stats:
+            for index, column in enumerate(self._database.RUN_STATS_LATENCY_COLUMNS):
+                latency[index] += row[column]
+        self.latency_chart.set_data(zip(self.latency_labels, latency))
+
+        # Days without runs are shown as empty bars
+        rows = {row['day']: row for row in day_stats}
+        day = datetime.date.fromisoformat(since_day)
+        days = []
+        while day <= datetime.date.today():
+            days.append((day.strftime("%m-%d"), rows.get(day.isoformat())))
+            day += datetime.timedelta(days=1)
+
+        self.runs_chart.set_data((label, row['runs'] if row else 0) for label, row in days)
+        self.throughput_chart.set_data((label, self.ratio(row, 'tokens_per_second', 'tokens_per_second_runs'))
+                                       for label, row in days)
+        self.search_chart.set_data((label, 100 * self.ratio(row, 'search_runs', 'runs')) for label, row in days)
+        self.error_chart.set_data((label, 100 * self.ratio(row, 'errors', 'runs')) for label, row in days)
+
+    @staticmethod
+    def ratio(row, numerator, denominator):
+        if not row or not row[denominator]:
+            return 0
+        return row[numerator] / row[denominator]
+
+    @staticmethod
+    def get_completed_runs(row):
+        return row['runs'] - row['errors'] - row['force_stops']
+
+    def get_p90_label(self, row):
+        # The 90th percentile is only known to the latency bucket it falls in
+        counts = [row[column] for column in self._database.RUN_STATS_LATENCY_COLUMNS]
+        total = sum(counts)
+        if not total:
+            return "-"
+        cumulative = 0
+        for label, count in zip(self.latency_labels, counts):
+            cumulative += count
+            if cumulative >= 0.9 * total:
+                return label
+        return self.latency_labels[-1]
+
+    def update_table(self, table, name, stats):
+        table.setRowCount(len(stats))
+        for row_index, row in enumerate(stats):
+            completed = self.get_completed_runs(row)
+            values = [
+                row[name] or "-",
+                f"{row['runs']:.0f}",
+                format(row['elapsed_time'] / completed, ".2f") if completed else "-",
+                self.get_p90_label(row),
+                format(row['ttft'] / row['ttft_runs'], ".2f") if row['ttft_runs'] else "-",
+                format(self.ratio(row, 'tokens_per_second', 'tokens_per_second_runs'), ".1f"),
+                format(100 * self.ratio(row, 'search_runs', 'runs'), ".0f"),
+                format(row['search_time'], ".1f"),
+                format(100 * self.ratio(row, 'errors', 'runs'), ".1f"),
+                format(100 * self.ratio(row, 'force_stops', 'runs'), ".1f"),
+            ]
+            for column_index, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column_index:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                table.setItem(row_index, column_index, item)
+
+    def update_search_cache(self):
+        stats = self._search_cache.get_stats()
+        lookups = stats['hits'] + stats['misses']
+        hit_rate = format(100 * stats['hits'] / lookups, ".0f") + "%" if lookups else "-"
+        self.search_cache_label.setText(UI.DASHBOARD_SEARCH_CACHE_STATS.format(hit_rate=hit_rate, **stats))
@@ -2,18 +2,22 @@ import sys
 from os import path
 
 from PyQt6.QtCore import QSize, QFile
-from PyQt6.QtGui import QIcon, QAction, QGuiApplication, QPixmap, QFont
+from PyQt6.QtGui import QAction, QGuiApplication, QPixmap, QFont
 from PyQt6.QtWidgets import QMainWindow, QApplication, QWidget, QMenu, QToolBar, QHBoxLayout, \
     QPushButton, QWidgetAction, QSpacerItem, QSizePolicy, QStackedWidget, QStyleFactory, QSplashScreen, \
     QMessageBox, QLabel
 
 from chat.ChatPresenter import ChatPresenter
+from chat.model.AsyncRunLoop import AsyncRunLoop
+from dashboard.DashboardView import DashboardView
 from util.AnimatedProgressBar import AnimatedProgressBar
 from util.AppInfoDialog import AppInfoDialog
+from util.ClientManager import ClientManager
 from util.Constants import Constants, MainWidgetIndex, UI, ProviderName
 from util.DataManager import DataManager
 from util.GlobalSetting import GlobalSetting
 from util.SettingsManager import SettingsManager
+from util.StyleManager import StyleManager
 from util.Utility import Utility
 from util.VerticalLine import VerticalLine
 
@@ -36,21 +40,26 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, UI.WARNING_TITLE, UI.WARNING_API_KEY_SETTING_MESSAGE)
 
         SettingsManager.initialize_settings()
-        self._settings = SettingsManager.get_settings()
 
         DataManager.initialize_database()
         self._database = DataManager.get_database()
 
+        ClientManager.initialize_clients()
+
     def initialize_variables(self):
         self.progress_bar = None
 
     def initialize_ui(self):
 
+        StyleManager.apply_style_sheet()
         self.initialize_window()
 
         self._chat = ChatPresenter()
-        self._chat.model.thread_started_signal.connect(self.show_result_info)
-        self._chat.model.response_finished_signal.connect(self.show_result_info)
+        self._chat.model.thread_started_signal.connect(lambda chat_main_id: self.show_result_info())
+        self._chat.model.response_finished_signal.connect(
+            lambda chat_main_id, *result: self.show_result_info(*result))
+
+        self._dashboard = DashboardView()
 
         self.set_main_widgets()
 
@@ -61,17 +70,18 @@ class MainWindow(QMainWindow):
 
         self._main_widget_index = {
             MainWidgetIndex.CHAT_WIDGET: self._main_widget.addWidget(self._chat),
+            MainWidgetIndex.DASHBOARD_WIDGET: self._main_widget.addWidget(self._dashboard),
         }
         self.setCentralWidget(self._main_widget)
         self.set_current_widget(MainWidgetIndex.CHAT_WIDGET)
 
     def set_current_widget(self, index: MainWidgetIndex):
-        self._settings.setValue('AI_Provider/llm', ProviderName.OPENAI.value)
+        SettingsManager.set_value('AI_Provider/llm', ProviderName.OPENAI.value)
         self._main_widget.setCurrentIndex(self._main_widget_index[index])
 
     def initialize_window(self):
         self.setWindowTitle(Constants.APPLICATION_TITLE)
-        self.setWindowIcon(QIcon(Utility.get_icon_path('ico', 'app.svg')))
+        self.setWindowIcon(StyleManager.get_icon('app.svg'))
         self.setGeometry(*self.set_window_size(3 / 5))
         self.set_actions()
         self.set_menubar()
@@ -83,6 +93,10 @@ class MainWindow(QMainWindow):
         self.chat_action.setStatusTip(UI.CHAT_TIP)
         self.chat_action.triggered.connect(lambda: self.set_current_widget(MainWidgetIndex.CHAT_WIDGET))
 
+        self.dashboard_action = QAction("Dashboard", self)
+        self.dashboard_action.setStatusTip(UI.DASHBOARD_TIP)
+        self.dashboard_action.triggered.connect(lambda: self.set_current_widget(MainWidgetIndex.DASHBOARD_WIDGET))
+
         self.setting_action = QAction("Setting", self)
         self.setting_action.setStatusTip(UI.SETTING_TIP)
         self.setting_action.triggered.connect(self.open_global_setting)
@@ -115,6 +129,7 @@ class MainWindow(QMainWindow):
 
         view_menu = QMenu(UI.VIEW, self)
         view_menu.addAction(self.chat_action)
+        view_menu.addAction(self.dashboard_action)
         menubar.addMenu(view_menu)
 
         help_menu = QMenu(UI.HELP, self)
@@ -129,14 +144,14 @@ class MainWindow(QMainWindow):
 
         main_toolbar_layout = QHBoxLayout()
 
-        self.setting_button = QPushButton(QIcon(Utility.get_icon_path('ico', 'setting.svg')), '')
+        self.setting_button = QPushButton(StyleManager.get_icon('setting.svg'), '')
         self.setting_button.setFixedSize(40, 40)
         self.setting_button.setIconSize(icon_size)
         self.setting_button.setCheckable(True)
         self.setting_button.setToolTip(UI.SETTING_TIP)
         self.setting_button.clicked.connect(self.open_global_setting)
 
-        self.exit_button = QPushButton(QIcon(Utility.get_icon_path('ico', 'exit.svg')), '')
+        self.exit_button = QPushButton(StyleManager.get_icon('exit.svg'), '')
         self.exit_button.setFixedSize(40, 40)
         self.exit_button.setIconSize(icon_size)
         self.exit_button.setCheckable(True)
@@ -145,9 +160,12 @@ class MainWindow(QMainWindow):
 
         self.chat_button = self.create_button('chat.svg', UI.CHAT, MainWidgetIndex.CHAT_WIDGET)
 
-        self.buttons.extend([self.chat_button, self.setting_button, self.exit_button])
+        self.dashboard_button = self.create_button('dashboard.svg', UI.DASHBOARD_TIP, MainWidgetIndex.DASHBOARD_WIDGET)
+
+        self.buttons.extend([self.chat_button, self.dashboard_button, self.setting_button, self.exit_button])
 
         main_toolbar_layout.addWidget(self.chat_button)
+        main_toolbar_layout.addWidget(self.dashboard_button)
         main_toolbar_layout.addItem(QSpacerItem(20, 40, QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Expanding))
         main_toolbar_layout.addWidget(self.setting_button)
         main_toolbar_layout.addItem(QSpacerItem(20, 40, QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Expanding))
@@ -165,7 +183,7 @@ class MainWindow(QMainWindow):
         self.addToolBar(main_toolbar)
 
     def create_button(self, icon_path, tooltip, widget_index):
-        button = QPushButton(QIcon(Utility.get_icon_path('ico', icon_path)), '')
+        button = QPushButton(StyleManager.get_icon(icon_path), '')
         button.setFixedSize(40, 40)
         button.setIconSize(QSize(32, 32))
         button.setCheckable(True)
@@ -190,39 +208,12 @@ class MainWindow(QMainWindow):
         self.toggle_buttons(self.setting_button)
         self.global_settings = GlobalSetting()
         self.global_settings.exec()
+        StyleManager.apply_style_sheet()
 
-    def show_result_info(self, model=None, finish_reason=None, elapsed_time=None, stream=False):
+    def show_result_info(self, model=None, finish_reason=None, elapsed_time=None, stream=False, trace=None):
         boldFont = QFont()
         boldFont.setBold(True)
 
-        model_color = Utility.get_settings_value(section="Info_Label_Style", prop="model-color",
-                                                 default="green",
-                                                 save=True)
-
-        model_time_label_style = f"""
-                    QLabel {{
-                        color: {model_color};
-                    }}
-                    """
-
-        elapsed_time_color = Utility.get_settings_value(section="Info_Label_Style", prop="elapsedtime-color",
-                                                        default="orange",
-                                                        save=True)
-        elapsed_time_label_style = f"""
-                    QLabel {{
-                        color: {elapsed_time_color};
-                    }}
-                    """
-
-        finish_reason_color = Utility.get_settings_value(section="Info_Label_Style", prop="finishreason-color",
-                                                         default="blue",
-                                                         save=True)
-        finish_reason_label_style = f"""
-                    QLabel {{
-                        color: {finish_reason_color};
-                    }}
-                    """
-
         status_bar = self.statusBar()
         status_bar.setFont(boldFont)
 
@@ -238,20 +229,18 @@ class MainWindow(QMainWindow):
             model_label = QLabel()
             model_label.setText(Constants.MODEL_PREFIX + model)
             model_label.setFont(boldFont)
-            model_label.setStyleSheet(model_time_label_style)
+            model_label.setObjectName("model_label")
 
             elapsed_time_label = QLabel()
             elapsed_time_label.setText(Constants.ELAPSED_TIME + format(elapsed_time, ".2f"))
             elapsed_time_label.setFont(boldFont)
-            elapsed_time_label.setStyleSheet(elapsed_time_label_style)
+            elapsed_time_label.setObjectName("elapsed_time_label")
 
             finish_reason_label = QLabel()
             finish_reason_label.setText(Constants.FINISH_REASON + finish_reason)
             finish_reason_label.setFont(boldFont)
-            if finish_reason == Constants.FORCE_STOP:
-                finish_reason_label.setStyleSheet("color: red")
-            else:
-                finish_reason_label.setStyleSheet(finish_reason_label_style)
+            finish_reason_label.setObjectName("finish_reason_label")
+            finish_reason_label.setProperty("force_stop", finish_reason == Constants.FORCE_STOP)
 
             status_bar.addPermanentWidget(model_label)
             status_bar.addPermanentWidget(VerticalLine())
@@ -260,11 +249,53 @@ class MainWindow(QMainWindow):
             status_bar.addPermanentWidget(finish_reason_label)
             status_bar.addPermanentWidget(VerticalLine())
 
+            if trace:
+                trace_label = QLabel()
+                trace_label.setText(self.get_trace_text(trace))
+                trace_label.setToolTip(self.get_trace_tooltip(trace))
+                trace_label.setFont(boldFont)
+                trace_label.setObjectName("trace_label")
+                status_bar.addPermanentWidget(trace_label)
+                status_bar.addPermanentWidget(VerticalLine())
+
         else:
             self.progress_bar = AnimatedProgressBar()
             self.progress_bar.start_animation()
             status_bar.addPermanentWidget(self.progress_bar)
 
+    @staticmethod
+    def get_trace_text(trace):
+        parts = []
+        if trace['ttft'] is not None:
+            parts.append(Constants.TTFT + format(trace['ttft'], ".2f"))
+        if trace['tokens_per_second'] is not None:
+            parts.append(Constants.TOKENS_PER_SECOND + format(trace['tokens_per_second'], ".1f"))
+        if trace['usage']:
+            usage = trace['usage']
+            parts.append(Constants.TOKEN_USAGE + f"{usage['prompt_tokens']}/{usage['completion_tokens']}")
+        if trace['searches']:
+            parts.append(Constants.SEARCH_TIME + f"{len(trace['searches'])} x " + format(trace['search_time'], ".2f"))
+        if trace['handoffs']:
+            parts.append(Constants.HANDOFFS + str(len(trace['handoffs'])))
+        return "  ".join(parts)
+
+    @staticmethod
+    def get_trace_tooltip(trace):
+        lines = []
+        if trace['itl_p50'] is not None:
+            lines.append("Inter-token latency p50/p90/p99: " +
+                         "/".join(format(trace[name] * 1000, ".0f") for name in ['itl_p50', 'itl_p90', 'itl_p99'])
+                         + " ms")
+        if trace['usage']:
+            lines.append(f"Prompt tokens: {trace['usage']['prompt_tokens']}, "
+                         f"completion tokens: {trace['usage']['completion_tokens']}")
+        for handoff in trace['handoffs']:
+            lines.append(f"{format(handoff['time'], '.2f')}s  -> {handoff['agent']}")
+        for search in trace['searches']:
+            lines.append(f"{format(search['time'], '.2f')}s  search '{search['query']}': "
+                         f"{format(search['duration'], '.2f')}s, {search['results']} results, {search['size']} chars")
+        return "\n".join(lines)
+
     def show_app_info(self):
         aboutDialog = AppInfoDialog()
         aboutDialog.exec()
@@ -273,6 +304,10 @@ class MainWindow(QMainWindow):
         self.toggle_buttons(self.exit_button)
         should_close = Utility.confirm_dialog(UI.EXIT_APPLICATION_TITLE, UI.EXIT_APPLICATION_MESSAGE)
         if should_close:
+            AsyncRunLoop.stop()
+            ClientManager.close_all()
+            self._database.close()
+            SettingsManager.sync()
             event.accept()
         else:
             event.ignore()
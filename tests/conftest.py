@@ -0,0 +1,17 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The settings file and the database are opened relative to the working directory
+os.chdir(tempfile.mkdtemp())
+
+
+@pytest.fixture(scope="session")
+def app():
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
@@ -0,0 +1,71 @@
+import pytest
+
+from custom.ChatMessageModel import ChatMessageModel
+from util.ChatType import ChatType
+from util.Constants import MessageDisplay
+
+
+def create_messages(count):
+    return [{'chat_type': ChatType.AI if i % 2 else ChatType.HUMAN, 'chat': f"message {i} with a needle"}
+            for i in range(count)]
+
+
+def test_find_text_narrows_and_sees_appended_text(app):
+    model = ChatMessageModel()
+    model.set_messages(create_messages(4))
+    assert sorted(model.find_text("needle")) == [0, 1, 2, 3]
+    assert model.find_text("message 2") == {2: [(0, 9)]}
+
+    row = model.add_message(ChatType.AI, "", finished=False)
+    model.append_text(row, "a nee")
+    model.append_text(row, "dle split over chunks")
+    assert model.find_text("NEEDLE")[row] == [(2, 8)]
+
+
+def test_changes_to_removed_rows_are_ignored(app):
+    model = ChatMessageModel()
+    model.set_messages(create_messages(4))
+    model.clear()
+    model.set_display(3, MessageDisplay.HIGHLIGHT, "needle", [(0, 6)])
+    model.set_current_match(3, 0)
+    assert model.rowCount() == 0
+
+
+def test_search_after_clear_all(app):
+    pytest.importorskip("swarm")
+    from chat.view.ChatView import ChatView
+    from custom.ChatListModel import ChatListModel
+    from util.DataManager import DataManager
+
+    view = ChatView(ChatListModel(DataManager.get_database()))
+    view.set_messages(create_messages(6))
+    view.search("needle")
+    assert len(view.found_text_positions) == 6
+
+    view.clear_all()
+    assert view.found_text_positions == []
+    assert not view.next_button.isEnabled()
+
+    view.scroll_to_next_match_widget()
+    view.update_ui_submit(ChatType.HUMAN, "a needle again")
+    view.search("needle")
+    assert view.found_text_positions == [(0, 0)]
+
+
+def test_search_result_makes_its_message_the_current_match(app):
+    pytest.importorskip("swarm")
+    from chat.view.ChatView import ChatView
+    from custom.ChatListModel import ChatListModel
+    from util.DataManager import DataManager
+
+    view = ChatView(ChatListModel(DataManager.get_database()))
+    messages = create_messages(6)
+    for chat_detail_id, message in enumerate(messages, start=100):
+        message['chat_detail_id'] = chat_detail_id
+    view.set_messages(messages)
+    assert view.chat_message_model.find_row(104) == 4
+
+    view.show_search_result("needle", 104)
+    assert view.found_text_positions[view.current_position_index] == (4, 0)
+    assert view.chat_message_model.index(4).data(ChatMessageModel.MessageRole)['current_match'] == 0
+    assert view.chat_message_model.index(0).data(ChatMessageModel.MessageRole)['current_match'] is None
@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("swarm")
+
+from util.ChatType import ChatType
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Stores results the way the command line runner does while the app writes to the same database
+CLI_SCRIPT = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from PyQt6.QtCore import QCoreApplication
+from chat.cli import save_result
+from util.SqliteDatabase import SqliteDatabase
+app = QCoreApplication([])
+database = SqliteDatabase(sys.argv[2])
+print("ready", flush=True)
+sys.stdin.readline()
+for i in range(20):
+    save_result(database, {'prompt': f"cli prompt {i}"},
+                {'error': None, 'finish_reason': "stop", 'model': "model", 'agent': "agent", 'elapsed_time': 1.0,
+                 'trace': None, 'response': f"cli answer {i}"})
+database.close()
+"""
+
+
+def test_cli_and_app_share_the_database(app, tmp_path):
+    from util.SqliteDatabase import SqliteDatabase
+
+    db_filename = str(tmp_path / "myaiagent.db")
+    database = SqliteDatabase(db_filename)
+    chat_main_id = database.add_chat_main("app")
+
+    # Both sides open the database before either of them writes
+    process = subprocess.Popen([sys.executable, "-c", CLI_SCRIPT, ROOT, db_filename],
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    assert process.stdout.readline().strip() == "ready"
+    process.stdin.write("go\n")
+    process.stdin.flush()
+    ids = [database.insert_chat_detail(chat_main_id, ChatType.HUMAN.value, None, f"app message {i}", None, None)
+           for i in range(40)]
+    assert process.wait(timeout=60) == 0
+
+    assert [row['id'] for row in database.get_all_chat_details_list(chat_main_id)] == ids
+    cli_chats = [chat for chat in database.get_all_chat_main_list() if chat['id'] != chat_main_id]
+    assert len(cli_chats) == 20
+    for chat in cli_chats:
+        assert [row['chat_type'] for row in database.get_all_chat_details_list(chat['id'])] == \
+               [ChatType.HUMAN.value, ChatType.AI.value]
+    database.close()
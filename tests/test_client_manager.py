@@ -0,0 +1,77 @@
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from util.ClientManager import ClientManager
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    # Answers chat completions and Tavily searches, and counts the connections they come in on
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        self.server.connections += 1
+        super().setup()
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        if self.path.endswith('/search'):
+            body = {"query": "query", "results": [], "response_time": 0}
+        else:
+            body = {"id": "completion", "object": "chat.completion", "created": 0, "model": "model",
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": "answer"}}]}
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+    server.connections = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    ClientManager.close_all()
+
+
+def ask(base_url):
+    client = ClientManager.acquire_openai_client("key", base_url)
+    try:
+        client.chat.completions.create(model="model", messages=[{"role": "user", "content": "question"}])
+    finally:
+        ClientManager.release_openai_client(client)
+    return client
+
+
+def test_runs_reuse_the_openai_connection(server):
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    clients = {ask(base_url) for _ in range(5)}
+    assert len(clients) == 1
+    assert server.connections == 1
+
+
+def test_aborted_openai_client_is_not_reused(server):
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    client = ClientManager.acquire_openai_client("key", base_url)
+    ClientManager.abort_openai_client(client)
+    ClientManager.release_openai_client(client)
+    assert client.is_closed()
+    assert ask(base_url) is not client
+
+
+def test_searches_reuse_the_tavily_connection(server):
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    for _ in range(5):
+        ClientManager.get_tavily_client("key", base_url).search(query="query")
+    assert server.connections == 1
@@ -0,0 +1,88 @@
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from util.ClientManager import ClientManager
+from util.ConnectionTracker import ConnectionTracker
+
+SLOW_SECONDS = 10
+
+
+class SearchHandler(BaseHTTPRequestHandler):
+    # Answers a search for "slow" only after SLOW_SECONDS, every other search right away
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        self.server.connections += 1
+        super().setup()
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        if body['query'] == "slow":
+            time.sleep(SLOW_SECONDS)
+        data = json.dumps({"query": body['query'], "results": [], "response_time": 0}).encode()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SearchHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    ClientManager.close_all()
+
+
+def search(server, tracker, query):
+    client = ClientManager.get_tavily_client("key", f"http://127.0.0.1:{server.server_address[1]}")
+    with tracker.track():
+        return client.search(query=query)
+
+
+def test_abort_ends_a_search_in_flight(server):
+    tracker = ConnectionTracker()
+    errors = []
+
+    def run():
+        try:
+            search(server, tracker, "slow")
+        except BaseException as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not tracker.sockets and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    started = time.monotonic()
+    tracker.abort()
+    thread.join(SLOW_SECONDS)
+    assert time.monotonic() - started < 1
+    assert len(errors) == 1
+
+
+def test_finished_search_leaves_the_shared_connection_to_other_runs(server):
+    stopped_run = ConnectionTracker()
+    search(server, stopped_run, "first")
+    assert not stopped_run.sockets
+    stopped_run.abort()
+
+    assert search(server, ConnectionTracker(), "second")['query'] == "second"
+    assert server.connections == 1
@@ -0,0 +1,109 @@
+import pytest
+
+from chat.model import ContextManager as context_manager_module
+from chat.model.ContextManager import ContextManager, TokenCounter
+from util.Constants import Constants
+
+
+class WordCounter:
+    # One token per word and no per-message overhead keeps the budgets easy to follow
+    def count(self, text):
+        return len(text.split()) if text else 0
+
+    def count_message(self, message):
+        return self.count(message['content'])
+
+
+class Summarizer:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, summary, messages):
+        self.calls.append((summary, [message['id'] for message in messages]))
+        return f"summary up to {messages[-1]['id']}"
+
+
+def create_history(count, words=10):
+    return [{'id': index, 'role': "user" if index % 2 == 0 else "assistant",
+             'content': " ".join(["word"] * words)} for index in range(count)]
+
+
+def create_manager(summarizer, token_budget=100, window_tokens=50):
+    return ContextManager(summarizer, token_budget=token_budget, window_tokens=window_tokens,
+                          token_counter=WordCounter())
+
+
+def test_history_within_the_budget_is_sent_as_is():
+    summarizer = Summarizer()
+    messages, summary = create_manager(summarizer).build_messages(create_history(4), "question")
+    assert [message['content'] for message in messages[:-1]] == ["word " * 9 + "word"] * 4
+    assert messages[-1] == {"role": "user", "content": "question"}
+    assert summary is None
+    assert summarizer.calls == []
+
+
+def test_older_turns_are_summarized_down_to_the_window():
+    summarizer = Summarizer()
+    history = create_history(20)
+    messages, summary = create_manager(summarizer).build_messages(history, "question")
+
+    # The window starts on a question and fits window_tokens, everything before it is summarized
+    assert summary['last_chat_detail_id'] == 15
+    assert summary['summary'] == "summary up to 15"
+    assert messages[0] == {"role": "system", "content": Constants.CONTEXT_SUMMARY_PREFIX + "summary up to 15"}
+    assert len(messages) == 1 + 4 + 1
+    assert sum(WordCounter().count(message['content']) for message in messages[1:-1]) <= 50
+    assert summarizer.calls == [(None, list(range(10))), ("summary up to 9", list(range(10, 16)))]
+
+
+def test_stored_summary_is_reused_while_its_turns_are_present():
+    summarizer = Summarizer()
+    history = create_history(20)
+    chat_summary = {'last_chat_detail_id': 15, 'summary': "stored", 'token_count': 1}
+    messages, summary = create_manager(summarizer).build_messages(history, "question", chat_summary)
+    assert summary is None
+    assert summarizer.calls == []
+    assert messages[0]['content'] == Constants.CONTEXT_SUMMARY_PREFIX + "stored"
+    assert len(messages) == 1 + 4 + 1
+
+
+def test_stored_summary_is_dropped_once_its_turns_are_deleted():
+    summarizer = Summarizer()
+    # The turns up to id 15 were cleared, only the newer ones are left
+    history = create_history(24)[16:]
+    chat_summary = {'last_chat_detail_id': 15, 'summary': "stored", 'token_count': 1}
+    messages, summary = create_manager(summarizer).build_messages(history, "question", chat_summary)
+    assert summary is None
+    assert all(Constants.CONTEXT_SUMMARY_PREFIX not in message['content'] for message in messages)
+    assert len(messages) == 8 + 1
+
+
+def test_failed_summary_sends_the_recent_window():
+    def summarize(summary, messages):
+        raise RuntimeError("offline")
+
+    messages, summary = create_manager(summarize).build_messages(create_history(20), "question")
+    assert summary is None
+    assert len(messages) == 4 + 1
+
+
+def test_token_counter_estimates_without_tiktoken(monkeypatch):
+    monkeypatch.setattr(context_manager_module, "tiktoken", None)
+    counter = TokenCounter()
+    assert counter.encoding is None
+    assert counter.count("") == 0
+    assert counter.count("x" * 40) == 40 // Constants.CONTEXT_CHARS_PER_TOKEN + 1
+
+    message = {'id': 1, 'role': "user", 'content': "x" * 40}
+    assert counter.count_message(message) == 11 + Constants.CONTEXT_MESSAGE_OVERHEAD_TOKENS
+    assert message['tokens'] == 11 + Constants.CONTEXT_MESSAGE_OVERHEAD_TOKENS
+
+
+def test_token_counter_estimates_when_the_encoding_is_unavailable(monkeypatch):
+    tiktoken = pytest.importorskip("tiktoken")
+
+    def get_encoding(name):
+        raise OSError("no network")
+
+    monkeypatch.setattr(tiktoken, "get_encoding", get_encoding)
+    assert TokenCounter().count("x" * 40) == 11
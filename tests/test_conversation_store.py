@@ -0,0 +1,61 @@
+from chat.model.ConversationStore import ConversationStore
+from util.ChatType import ChatType
+
+
+class Database:
+    def __init__(self, chats):
+        self.chats = chats
+        self.loads = []
+
+    def get_all_chat_details_list(self, chat_main_id):
+        self.loads.append(chat_main_id)
+        return self.chats.get(chat_main_id, [])
+
+
+def chat_detail(chat_detail_id, chat_type, chat):
+    return {'id': chat_detail_id, 'chat_type': chat_type.value, 'chat': chat}
+
+
+def test_first_load_reads_the_database_once():
+    database = Database({1: [chat_detail(10, ChatType.HUMAN, "question"), chat_detail(11, ChatType.AI, ""),
+                             chat_detail(12, ChatType.AI, "answer")]})
+    store = ConversationStore(database)
+
+    # Nothing is loaded yet, the new message is read with the rest later
+    store.append_message(1, 13, ChatType.HUMAN.value, "not loaded")
+    assert store.get_messages(1) == [{"id": 10, "role": "user", "content": "question"},
+                                     {"id": 12, "role": "assistant", "content": "answer"}]
+    store.append_message(1, 14, ChatType.AI.value, "later")
+    assert store.get_messages(1)[-1] == {"id": 14, "role": "assistant", "content": "later"}
+    assert database.loads == [1]
+
+
+def test_history_is_a_snapshot_of_an_append_only_list():
+    store = ConversationStore(Database({1: [chat_detail(10, ChatType.HUMAN, "question")]}))
+    history = store.get_history(1)
+    store.append_message(1, 11, ChatType.AI.value, "answer")
+    assert len(history) == 1
+    assert history[-1]['id'] == 10
+    assert [message['id'] for message in store.get_history(1)] == [10, 11]
+
+
+def test_least_recently_used_conversation_is_evicted():
+    database = Database({})
+    store = ConversationStore(database, max_conversations=2)
+    store.get_messages(1)
+    store.get_messages(2)
+    store.get_messages(1)
+    store.get_messages(3)
+    assert list(store.conversations) == [1, 3]
+
+    store.get_messages(2)
+    assert database.loads == [1, 2, 3, 2]
+
+
+def test_removed_conversation_is_read_again():
+    database = Database({1: [chat_detail(10, ChatType.HUMAN, "question")]})
+    store = ConversationStore(database)
+    store.get_messages(1)
+    store.remove(1)
+    store.get_messages(1)
+    assert database.loads == [1, 1]
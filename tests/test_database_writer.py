@@ -0,0 +1,54 @@
+import concurrent.futures
+import logging
+import os
+import sqlite3
+import time
+
+import pytest
+
+from util.Constants import DATABASE_MESSAGE
+from util.DatabaseWriter import DatabaseWriter
+
+
+class SlowWriter(DatabaseWriter):
+    def write_batch(self, connection, batch):
+        time.sleep(0.5)
+        super().write_batch(connection, batch)
+
+
+def test_writes_are_committed_in_order(tmp_path):
+    writer = DatabaseWriter(str(tmp_path / "test.db"))
+    writer.execute_and_wait("CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT)")
+    for name in ["a", "b"]:
+        writer.execute("INSERT INTO item (name) VALUES (:name)", {"name": name})
+    assert writer.execute_and_wait("INSERT INTO item (name) VALUES (:name)", {"name": "c"}) == (3, 1)
+    writer.close()
+
+    connection = sqlite3.connect(str(tmp_path / "test.db"))
+    assert connection.execute("SELECT name FROM item ORDER BY id").fetchall() == [("a",), ("b",), ("c",)]
+    connection.close()
+
+
+def test_failed_connection_fails_every_write(tmp_path, caplog):
+    caplog.set_level(logging.ERROR)
+    writer = DatabaseWriter(os.path.join(str(tmp_path), "missing", "test.db"), timeout=5)
+    with pytest.raises(sqlite3.Error):
+        writer.execute_and_wait("CREATE TABLE item (id INTEGER PRIMARY KEY)")
+    writer.thread.join(5)
+    assert writer.closed
+
+    start = time.monotonic()
+    with pytest.raises(sqlite3.ProgrammingError):
+        writer.execute_and_wait("SELECT 1")
+    writer.flush()
+    writer.close()
+    assert time.monotonic() - start < 1
+    assert DATABASE_MESSAGE.DATABASE_WRITER_CONNECT_ERROR in caplog.text
+
+
+def test_waiting_for_a_write_times_out(tmp_path):
+    writer = SlowWriter(str(tmp_path / "test.db"), timeout=0.1)
+    with pytest.raises(concurrent.futures.TimeoutError):
+        writer.execute_and_wait("CREATE TABLE item (id INTEGER PRIMARY KEY)")
+    writer.timeout = 5
+    writer.close()
@@ -0,0 +1,136 @@
+import random
+
+import pytest
+from PyQt6.QtGui import QColor, QTextBlockFormat, QTextCharFormat, QTextDocument
+
+from custom.IncrementalMarkdownDocument import IncrementalMarkdownDocument
+
+TEXTS = [
+    "1. first\n2. second\n3. third",
+    "1. first\n\n2. second\n\n3. third",
+    "intro\n\n```python\ncode\n```\nafter\n",
+    "a\n\n\n\nb",
+    "- x\n- y\n\npara\n\n# H\n\ntext",
+    "text\n```\nx\n```\n\n1. a\n2. b\n\n> quote\n\nend",
+    "## Title\n\nSome *it* and **bold**\n\n- a\n  - nested\n- b\n\n~~~\ntilde\n~~~\n",
+    "  ```js\n  let a;\n    b;\n  ```\n\n| a | b |\n|---|---|\n| 1 | 2 |\n",
+    "unclosed\n```c\nint x;\n",
+    "> q1\n\n> q2\n\nafter",
+    "para\n\n    indented code\n\nafter",
+    "x\n\n---\n\ny\n===\n",
+]
+
+# Markdown whose blocks carry on over blank lines, they must not be cut while streaming
+OPEN_BLOCK_TEXTS = [
+    "- a\n\n  - b\n\n  - c\n\n- d",
+    "1. a\n\n   continued\n2. b",
+    "1. first\n\n2. second\n\n3. third",
+    "- item\n\n  ```py\n  code\n  ```\n- next",
+]
+
+
+def render(text):
+    document = QTextDocument()
+    document.setMarkdown(text)
+    return document
+
+
+def stream(chunks, document=None):
+    document = document or IncrementalMarkdownDocument()
+    for chunk in chunks:
+        document.append_markdown(chunk)
+    return document
+
+
+def split_randomly(text, rnd):
+    chunks = []
+    position = 0
+    while position < len(text):
+        size = rnd.randint(1, 8)
+        chunks.append(text[position:position + size])
+        position += size
+    return chunks
+
+
+def iter_blocks(document):
+    block = document.begin()
+    while block.isValid():
+        yield block
+        block = block.next()
+
+
+def get_blocks(document):
+    blocks = []
+    block = document.begin()
+    while block.isValid():
+        text_list = block.textList()
+        list_item = (text_list.format().indent(), text_list.itemNumber(block)) if text_list else None
+        blocks.append((block.text(), list_item, block.blockFormat().nonBreakableLines(),
+                       block.blockFormat().headingLevel()))
+        block = block.next()
+    return blocks
+
+
+@pytest.mark.parametrize("text", TEXTS + OPEN_BLOCK_TEXTS + ["see [x][1]\n\n[1]: http://e.com"])
+def test_finished_stream_matches_one_shot_render(app, text):
+    rnd = random.Random(text)
+    expected = render(text).toHtml()
+    splits = [[text], list(text), text.splitlines(True)] + [split_randomly(text, rnd) for _ in range(30)]
+    for chunks in splits:
+        document = stream(chunks)
+        document.finish()
+        assert document.toHtml() == expected
+
+
+@pytest.mark.parametrize("text", OPEN_BLOCK_TEXTS)
+def test_streamed_blocks_match_one_shot_render_before_finish(app, text):
+    expected = get_blocks(render(text))
+    assert get_blocks(stream(text.splitlines(True))) == expected
+    assert get_blocks(stream(list(text))) == expected
+
+
+def test_open_fence_appends_code_lines_without_rendering_again(app, monkeypatch):
+    code_block_format = QTextBlockFormat()
+    code_block_format.setBackground(QColor("#333333"))
+    code_char_format = QTextCharFormat()
+    code_char_format.setForeground(QColor("#cccccc"))
+    document = stream(["intro\n\n```python\n"], IncrementalMarkdownDocument(code_block_format, code_char_format))
+
+    rendered = []
+    monkeypatch.setattr(QTextDocument, "setMarkdown", lambda self, text: rendered.append(text))
+    stream([f"line {index}\n" for index in range(50)], document)
+    assert rendered == []
+
+    code_blocks = [block for block in get_blocks(document) if block[2]]
+    assert [block[0] for block in code_blocks[:50]] == [f"line {index}" for index in range(50)]
+    block = document.findBlockByNumber(1)
+    assert block.blockFormat().background().color() == QColor("#333333")
+    assert block.charFormat().foreground().color() == QColor("#cccccc")
+
+
+def test_reloaded_message_matches_the_streamed_one(app):
+    from custom.ChatMessageDelegate import ChatMessageDelegate
+    from custom.ChatMessageModel import ChatMessageModel
+    from util.ChatType import ChatType
+
+    text = TEXTS[6] + "\n" + OPEN_BLOCK_TEXTS[3]
+    delegate = ChatMessageDelegate()
+    model = ChatMessageModel()
+
+    streamed = model.create_message(ChatType.AI, text[:20], finished=False)
+    delegate.get_document(streamed, 600)
+    for position in range(20, len(text), 7):
+        streamed['text_result'].append(text[position:position + 7])
+        delegate.get_document(streamed, 600)
+    streamed['finished'] = True
+    streamed_document = delegate.get_document(streamed, 600)
+
+    delegate.clear_cache()
+    delegate.rendered_documents.clear()
+    reloaded_document = delegate.get_document(model.create_message(ChatType.AI, text), 600)
+
+    assert reloaded_document is not streamed_document
+    assert reloaded_document.toHtml() == streamed_document.toHtml()
+    assert get_blocks(reloaded_document) == get_blocks(render(text))
+    code_block = next(block for block in iter_blocks(reloaded_document) if block.blockFormat().nonBreakableLines())
+    assert code_block.blockFormat().background().color() == delegate.code_block_format.background().color()
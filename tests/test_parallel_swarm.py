@@ -0,0 +1,167 @@
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+pytest.importorskip("swarm")
+
+from openai.types.chat.chat_completion_message_tool_call import ChatCompletionMessageToolCall, Function
+from swarm import Agent
+from swarm.types import Result
+
+from chat.model.ParallelSwarm import ParallelSwarm
+from chat.model.SwarmAgents import SwarmAgents
+from util.ClientManager import ClientManager
+from util.ConnectionTracker import RequestAborted
+
+
+def tool_call(call_id, name, **arguments):
+    return ChatCompletionMessageToolCall(id=call_id, type="function",
+                                         function=Function(name=name, arguments=json.dumps(arguments)))
+
+
+class Calls:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.names = []
+
+    def add(self, name):
+        with self.lock:
+            self.names.append(name)
+
+
+def create_functions(calls):
+    def search_web(query):
+        # The first query answers last, so the results come back out of order
+        time.sleep(0.2 if query == "first" else 0)
+        calls.add(f"search {query}")
+        return f"found {query}"
+
+    def remember(note, context_variables):
+        calls.add(f"remember {note}")
+        return Result(value=f"noted {note} for {context_variables['user']}", context_variables={'note': note})
+
+    def fail_search(query):
+        raise ValueError(query)
+
+    return [search_web, remember, fail_search]
+
+
+def create_swarm(max_parallel_tool_calls=4):
+    return ParallelSwarm(client=object(), parallel_functions=["search_web", "fail_search"],
+                         max_parallel_tool_calls=max_parallel_tool_calls)
+
+
+@pytest.mark.parametrize("max_parallel_tool_calls", [1, 4])
+def test_tool_messages_keep_the_call_order(max_parallel_tool_calls):
+    calls = Calls()
+    tool_calls = [tool_call("1", "search_web", query="first"), tool_call("2", "remember", note="n"),
+                  tool_call("3", "search_web", query="second")]
+
+    response = create_swarm(max_parallel_tool_calls).handle_tool_calls(tool_calls, create_functions(calls),
+                                                                       {'user': "ann"}, False)
+
+    assert [(message["tool_call_id"], message["content"]) for message in response.messages] == \
+           [("1", "found first"), ("2", "noted n for ann"), ("3", "found second")]
+    assert response.context_variables == {'note': "n"}
+    # Every search ran once, ahead of the sequential call
+    assert sorted(calls.names) == ["remember n", "search first", "search second"]
+    assert calls.names[-1] == "remember n"
+
+
+def test_parallel_calls_get_the_context_variables():
+    received = []
+
+    def search_web(query, context_variables):
+        received.append(context_variables)
+        return query
+
+    context_variables = {'user': "ann"}
+    create_swarm().handle_tool_calls([tool_call("1", "search_web", query="q")], [search_web], context_variables,
+                                     False)
+    assert received == [context_variables]
+
+
+def test_parallel_call_raises_where_the_sequential_call_would():
+    calls = Calls()
+    tool_calls = [tool_call("1", "search_web", query="a"), tool_call("2", "fail_search", query="broken")]
+    with pytest.raises(ValueError, match="broken"):
+        create_swarm().handle_tool_calls(tool_calls, create_functions(calls), {'user': "ann"}, False)
+
+
+def test_handoff_after_parallel_calls():
+    other_agent = Agent(name="Other")
+
+    def search_web(query):
+        return query
+
+    def transfer():
+        return other_agent
+
+    response = create_swarm().handle_tool_calls([tool_call("1", "search_web", query="q"),
+                                                 tool_call("2", "transfer")], [search_web, transfer], {}, False)
+    assert response.agent is other_agent
+    assert [message["tool_call_id"] for message in response.messages] == ["1", "2"]
+
+
+class SlowSearchHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.server.requests += 1
+        time.sleep(10)
+
+
+def test_cancel_aborts_the_searches_in_flight():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowSearchHandler)
+    server.daemon_threads = True
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    search_tool_args = {'tavily_api_key': "key", 'tavily_base_url': f"http://127.0.0.1:{server.server_address[1]}",
+                        'search_depth': "basic", 'topic': "general", 'days': 1, 'max_results': 1,
+                        'include_domains': None, 'exclude_domains': None, 'include_answer': False,
+                        'include_raw_content': False, 'include_images': False}
+    agents = SwarmAgents(SwarmAgents.get_agent_prompt_list("orchestrator", "search", "programmer", "tester"),
+                         search_tool_args)
+    searches_done = threading.Event()
+
+    def search_web(query):
+        try:
+            return agents.search_web(query)
+        finally:
+            searches_done.set()
+
+    swarm = create_swarm()
+    errors = []
+
+    def run():
+        try:
+            swarm.handle_tool_calls([tool_call("1", "search_web", query="q")], [search_web], {}, False)
+        except BaseException as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=run, daemon=True)
+    try:
+        thread.start()
+        deadline = time.monotonic() + 5
+        while not server.requests and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        # What AgentEngine.stop() does
+        started = time.monotonic()
+        swarm.cancel()
+        agents.abort_searches()
+        thread.join(5)
+        assert searches_done.wait(5)
+        assert time.monotonic() - started < 1
+        assert len(errors) == 1 and isinstance(errors[0], RequestAborted)
+    finally:
+        server.shutdown()
+        server.server_close()
+        ClientManager.close_all()
@@ -0,0 +1,122 @@
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+pytest.importorskip("swarm")
+
+# Stop has to end a run well before the slow server answers
+STOP_BOUND_SECONDS = 1.0
+SLOW_SECONDS = 10
+
+
+def chunk(delta, finish_reason=None):
+    return {"id": "chunk", "object": "chat.completion.chunk", "created": 0, "model": "model",
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    # Answers every chat completion slowly: a stream sends one word and then stalls, a plain request stalls
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests += 1
+        try:
+            if not body.get('stream'):
+                time.sleep(SLOW_SECONDS)
+                data = json.dumps({"id": "completion", "object": "chat.completion", "created": 0, "model": "model",
+                                   "choices": [{"index": 0, "finish_reason": "stop",
+                                                "message": {"role": "assistant", "content": "late"}}]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for event in [chunk({"role": "assistant", "content": None}), chunk({"content": "partial "})]:
+                self.send_event(json.dumps(event))
+            time.sleep(SLOW_SECONDS)
+            self.send_event(json.dumps(chunk({"content": "late"}, "stop")))
+            self.send_event("[DONE]")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def send_event(self, data):
+        data = f"data: {data}\n\n".encode()
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+@pytest.fixture
+def slow_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    server.daemon_threads = True
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def create_args(port, stream):
+    from chat.model.SwarmAgents import SwarmAgents
+    return {
+        'open_api_key': "key",
+        'openai_base_url': f"http://127.0.0.1:{port}/v1",
+        'agent_prompt_list': SwarmAgents.get_agent_prompt_list("orchestrator", "search", "programmer", "tester"),
+        'search_tool_args': {'tavily_api_key': "key", 'tavily_base_url': f"http://127.0.0.1:{port}",
+                             'search_depth': "basic", 'topic': "general", 'days': 1, 'max_results': 1,
+                             'include_domains': None, 'exclude_domains': None, 'include_answer': False,
+                             'include_raw_content': False, 'include_images': False, 'query': "question"},
+        'max_parallel_tool_calls': 1,
+        'stream': stream,
+        'history': [],
+        'chat_summary': None,
+        'stream_flush_interval_ms': 0,
+        'stream_flush_size': 1,
+    }
+
+
+def process_events_until(app, condition, timeout):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+    return condition()
+
+
+@pytest.mark.parametrize("stream", [True, False], ids=["stream mid-response", "waiting for the model"])
+def test_stop_ends_the_run_thread_quickly(app, slow_server, stream):
+    from chat.model.SwarmModel import SwarmModel
+    from util.ClientManager import ClientManager
+    from util.Constants import Constants
+
+    model = SwarmModel(max_concurrent_runs=2)
+    finish_reasons = {}
+    model.response_finished_signal.connect(
+        lambda chat_main_id, model_name, finish_reason, elapsed_time, streamed, trace:
+        finish_reasons.__setitem__(chat_main_id, finish_reason))
+    try:
+        model.run_agent(1, create_args(slow_server.server_address[1], stream))
+        # The request is in flight once the server has seen it; give the stream its first words
+        assert process_events_until(app, lambda: slow_server.requests > 0, 5)
+        process_events_until(app, lambda: False, 0.3)
+
+        started = time.monotonic()
+        model.force_stop(1)
+        assert process_events_until(app, lambda: 1 not in model.swarm_threads, SLOW_SECONDS)
+        assert time.monotonic() - started < STOP_BOUND_SECONDS
+        assert finish_reasons.get(1) == Constants.FORCE_STOP
+    finally:
+        ClientManager.close_all()
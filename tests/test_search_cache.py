@@ -0,0 +1,125 @@
+import pytest
+
+import util.SearchCache
+from util.SearchCache import SearchCache
+
+SEARCH_ARGS = {
+    'tavily_api_key': "key",
+    'search_depth': "basic",
+    'topic': "general",
+    'days': 3,
+    'max_results': 5,
+    'include_domains': ["b.com", "a.com"],
+    'exclude_domains': [],
+    'include_answer': False,
+    'include_raw_content': False,
+    'include_images': False,
+}
+RESULTS = [{"title": "title", "url": "https://a.com", "content": "content", "score": 1.0, "raw_content": None}]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(util.SearchCache, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = SearchCache(str(tmp_path / "cache.db"), max_entries=3, ttl={'news': 60, 'general': 3600})
+    yield cache
+    cache.close()
+
+
+def test_query_is_normalized(cache):
+    cache.put("  Latest  PyQt6\tRelease ", SEARCH_ARGS, RESULTS)
+    assert cache.get("latest pyqt6 release", SEARCH_ARGS) == RESULTS
+    assert cache.get("LATEST PyQt6 release", dict(SEARCH_ARGS, include_domains=["a.com", "b.com"])) == RESULTS
+    assert cache.get("latest pyqt5 release", SEARCH_ARGS) is None
+
+
+def test_every_search_parameter_is_part_of_the_key(cache):
+    cache.put("query", SEARCH_ARGS, RESULTS)
+    for field, value in [('search_depth', "advanced"), ('days', 7), ('max_results', 10),
+                         ('exclude_domains', ["c.com"]), ('include_answer', True), ('include_images', True)]:
+        assert cache.get("query", dict(SEARCH_ARGS, **{field: value})) is None, field
+
+
+def test_entries_expire_per_topic(cache, clock):
+    news_args = dict(SEARCH_ARGS, topic="news")
+    cache.put("query", SEARCH_ARGS, RESULTS)
+    cache.put("query", news_args, RESULTS)
+
+    clock.now += 61
+    assert cache.get("query", news_args) is None
+    assert cache.get("query", SEARCH_ARGS) == RESULTS
+
+    clock.now += 3600
+    assert cache.get("query", SEARCH_ARGS) is None
+    assert cache.get_stats()['entries'] == 0
+
+
+def test_least_recently_used_entries_are_evicted(cache, clock):
+    for query in ["first", "second", "third"]:
+        cache.put(query, SEARCH_ARGS, RESULTS)
+        clock.now += 1
+    # Reading "first" makes "second" the least recently used entry
+    assert cache.get("first", SEARCH_ARGS) == RESULTS
+    clock.now += 1
+    cache.put("fourth", SEARCH_ARGS, RESULTS)
+
+    assert cache.get_stats()['entries'] == 3
+    assert cache.get("second", SEARCH_ARGS) is None
+    for query in ["first", "third", "fourth"]:
+        assert cache.get(query, SEARCH_ARGS) == RESULTS
+
+
+def test_hits_and_misses_are_counted(cache):
+    assert cache.get("query", SEARCH_ARGS) is None
+    cache.put("query", SEARCH_ARGS, RESULTS)
+    assert cache.get("query", SEARCH_ARGS) == RESULTS
+    assert cache.get("Query ", SEARCH_ARGS) == RESULTS
+    assert cache.get_stats() == {'hits': 2, 'misses': 1, 'entries': 1}
+
+
+def test_results_survive_reopening(tmp_path, clock):
+    db_filename = str(tmp_path / "cache.db")
+    cache = SearchCache(db_filename)
+    cache.put("query", SEARCH_ARGS, RESULTS)
+    cache.close()
+    cache = SearchCache(db_filename)
+    assert cache.get("query", SEARCH_ARGS) == RESULTS
+    cache.close()
+
+
+class StubTavilyClient:
+    def __init__(self):
+        self.queries = []
+
+    def search(self, query, **params):
+        self.queries.append(query)
+        return {"results": RESULTS}
+
+
+def test_tavily_search_only_calls_the_client_on_a_miss(cache, monkeypatch):
+    pytest.importorskip("swarm")
+    from chat.model.SwarmAgents import TavilySearch
+    from util.ClientManager import ClientManager
+
+    client = StubTavilyClient()
+    monkeypatch.setattr(ClientManager, "get_tavily_client", lambda *args: client)
+
+    assert TavilySearch(SEARCH_ARGS, cache).search("query") == RESULTS
+    assert TavilySearch(SEARCH_ARGS, cache).search(" QUERY") == RESULTS
+    assert TavilySearch(dict(SEARCH_ARGS, topic="news"), cache).search("query") == RESULTS
+    assert client.queries == ["query", "query"]
+    assert cache.get_stats() == {'hits': 1, 'misses': 2, 'entries': 2}
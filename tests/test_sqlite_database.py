@@ -0,0 +1,59 @@
+import json
+import os
+import subprocess
+import sys
+
+from util.ChatType import ChatType
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Inserts chat details into a shared database and prints the ids it was given
+WRITER_SCRIPT = """
+import json, sys
+sys.path.insert(0, sys.argv[1])
+from PyQt6.QtCore import QCoreApplication
+from util.SqliteDatabase import SqliteDatabase
+app = QCoreApplication([])
+database = SqliteDatabase(sys.argv[2])
+ids = {}
+for i in range(int(sys.argv[4])):
+    text = f"{sys.argv[3]}-{i}"
+    ids[text] = database.insert_chat_detail(int(sys.argv[5]), "Human", None, text, None, None)
+database.close()
+print(json.dumps(ids))
+"""
+
+
+def test_processes_sharing_a_database_get_distinct_ids(app, tmp_path):
+    from util.SqliteDatabase import SqliteDatabase
+
+    db_filename = str(tmp_path / "shared.db")
+    database = SqliteDatabase(db_filename)
+    chat_main_id = database.add_chat_main("shared")
+
+    processes = [subprocess.Popen([sys.executable, "-c", WRITER_SCRIPT, ROOT, db_filename, name, "50",
+                                   str(chat_main_id)], stdout=subprocess.PIPE, text=True)
+                 for name in ("first", "second")]
+    ids = {}
+    for process in processes:
+        output, _ = process.communicate(timeout=60)
+        assert process.returncode == 0
+        ids.update(json.loads(output.splitlines()[-1]))
+
+    rows = database.get_all_chat_details_list(chat_main_id)
+    assert len(rows) == 100
+    assert {row['chat']: row['id'] for row in rows} == ids
+    database.close()
+
+
+def test_insert_returns_the_committed_id(app, tmp_path):
+    from util.SqliteDatabase import SqliteDatabase
+
+    database = SqliteDatabase(str(tmp_path / "chat.db"))
+    chat_main_id = database.add_chat_main("chat")
+    first = database.insert_chat_detail(chat_main_id, ChatType.HUMAN.value, None, "question", None, None)
+    second = database.insert_chat_detail(chat_main_id, ChatType.AI.value, "model", "answer", 1.0, "stop")
+    assert second > first
+    assert [row['id'] for row in database.get_all_chat_details_list(chat_main_id)] == [first, second]
+    assert database.insert_chat_detail(-1, ChatType.HUMAN.value, None, "no chat", None, None) is None
+    database.close()
@@ -0,0 +1,59 @@
+import threading
+import time
+
+from chat.model.StreamCoalescer import StreamCoalescer
+
+
+class Emitted:
+    def __init__(self):
+        self.texts = []
+        self.event = threading.Event()
+
+    def __call__(self, text):
+        self.texts.append(text)
+        self.event.set()
+
+
+def test_flushes_once_the_byte_budget_is_reached():
+    emitted = Emitted()
+    coalescer = StreamCoalescer(emitted, 60_000, 6)
+    for text in ["ab", "cd", "ef", "g"]:
+        coalescer.add(text)
+    assert emitted.texts == ["abcdef"]
+
+    coalescer.flush()
+    assert emitted.texts == ["abcdef", "g"]
+
+
+def test_flushes_on_the_next_chunk_once_the_window_has_passed(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    emitted = Emitted()
+    coalescer = StreamCoalescer(emitted, 60_000, 1000)
+    coalescer.add("a")
+    coalescer.add("b")
+    assert emitted.texts == []
+
+    now[0] += 60
+    coalescer.add("c")
+    assert emitted.texts == ["abc"]
+    coalescer.flush()
+
+
+def test_flushes_a_stalled_stream_without_another_chunk():
+    emitted = Emitted()
+    coalescer = StreamCoalescer(emitted, 50, 1000)
+    coalescer.add("partial ")
+    assert emitted.texts == []
+
+    assert emitted.event.wait(2)
+    assert emitted.texts == ["partial "]
+
+
+def test_flush_cancels_the_timer():
+    emitted = Emitted()
+    coalescer = StreamCoalescer(emitted, 50, 1000)
+    coalescer.add("text")
+    coalescer.flush()
+    time.sleep(0.2)
+    assert emitted.texts == ["text"]
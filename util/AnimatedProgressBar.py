@@ -1,8 +1,6 @@
 from PyQt6.QtWidgets import QProgressBar
 from PyQt6.QtCore import QPropertyAnimation, QAbstractAnimation, QEasingCurve
 
-from util.Constants import UI
-
 
 class AnimatedProgressBar(QProgressBar):
     def __init__(self):
@@ -15,7 +13,7 @@ class AnimatedProgressBar(QProgressBar):
         self.setTextVisible(False)
         self.loading_animation = QPropertyAnimation(self, b"value")
 
-        self.setStyleSheet(UI.PROGRESS_BAR_STYLE)
+        self.setObjectName("progress_bar")
         self.loading_animation.setStartValue(self.minimum())
         self.loading_animation.setEndValue(self.maximum())
 
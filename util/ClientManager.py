@@ -0,0 +1,165 @@
+import importlib.util
+import threading
+
+import httpx
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
+from tavily import TavilyClient, AsyncTavilyClient
+
+from util.ConnectionTracker import ConnectionTracker, TrackedHTTPAdapter
+from util.Constants import Constants, MODEL_MESSAGE
+from util.Utility import Utility
+
+
+class ClientManager:
+    """
+    Static registry of long-lived OpenAI / Tavily clients keyed by API key and base URL.
+
+    Runs reuse the same clients, so their keep-alive connection pools stay warm between questions
+    instead of paying for a new TLS handshake every time.
+    The async clients are bound to the event loop they are used on, so only AsyncRunLoop uses them.
+    Agent runs check out an OpenAI client of their own with acquire_openai_client(), so a stopped run can
+    abort its requests without touching the other runs.
+    """
+    __idle_openai_clients = {}
+    __connection_trackers = {}
+    __tavily_clients = {}
+    __async_openai_clients = {}
+    __async_tavily_clients = {}
+    __async_http_clients = []
+    __lock = threading.Lock()
+    __max_connections = int(Constants.HTTP_MAX_CONNECTIONS)
+    __max_keepalive_connections = int(Constants.HTTP_MAX_KEEPALIVE_CONNECTIONS)
+    __keepalive_expiry = float(Constants.HTTP_KEEPALIVE_EXPIRY)
+    __http2 = importlib.util.find_spec('h2') is not None
+
+    @classmethod
+    def initialize_clients(cls):
+        max_connections = Utility.get_settings_value(section="Connection_Option", prop="max_connections",
+                                                     default=Constants.HTTP_MAX_CONNECTIONS,
+                                                     save=True)
+        max_keepalive_connections = Utility.get_settings_value(section="Connection_Option",
+                                                               prop="max_keepalive_connections",
+                                                               default=Constants.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                                                               save=True)
+        keepalive_expiry = Utility.get_settings_value(section="Connection_Option", prop="keepalive_expiry",
+                                                      default=Constants.HTTP_KEEPALIVE_EXPIRY,
+                                                      save=True)
+        cls.set_pool_limits(int(max_connections), int(max_keepalive_connections), float(keepalive_expiry))
+
+    @classmethod
+    def set_pool_limits(cls, max_connections, max_keepalive_connections, keepalive_expiry):
+        # Only clients created afterwards pick up the new limits
+        with cls.__lock:
+            cls.__max_connections = max_connections
+            cls.__max_keepalive_connections = max_keepalive_connections
+            cls.__keepalive_expiry = keepalive_expiry
+
+    @classmethod
+    def acquire_openai_client(cls, api_key, base_url=None) -> OpenAI:
+        key = (api_key, base_url)
+        with cls.__lock:
+            idle_clients = cls.__idle_openai_clients.get(key)
+            if idle_clients:
+                return idle_clients.pop()
+            tracker = ConnectionTracker()
+            http_client = DefaultHttpxClient(http2=cls.__http2, limits=cls.get_limits(),
+                                             event_hooks={'request': [tracker.request_hook]})
+            client = OpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+            cls.__connection_trackers[client] = (key, tracker)
+            return client
+
+    @classmethod
+    def abort_openai_client(cls, client):
+        with cls.__lock:
+            key, tracker = cls.__connection_trackers.get(client, (None, None))
+        if tracker is not None:
+            tracker.abort()
+
+    @classmethod
+    def release_openai_client(cls, client):
+        with cls.__lock:
+            key, tracker = cls.__connection_trackers.get(client, (None, None))
+            if tracker is not None and not tracker.aborted:
+                # The next run picks it up with its connections still open
+                cls.__idle_openai_clients.setdefault(key, []).append(client)
+                return
+            cls.__connection_trackers.pop(client, None)
+        # The connections of an aborted client are shut down, so it is not reused
+        try:
+            client.close()
+        except Exception as e:
+            print(f"{MODEL_MESSAGE.CLIENT_CLOSE_ERROR} {e}")
+
+    @classmethod
+    def get_tavily_client(cls, api_key, base_url=None) -> TavilyClient:
+        key = (api_key, base_url)
+        with cls.__lock:
+            client = cls.__tavily_clients.get(key)
+            if client is None:
+                client = TavilyClient(api_key=api_key, api_base_url=base_url)
+                # TavilyClient talks through a requests session, which pools connections per host.
+                # Each run tracks its own searches on it, so a stopped run can abort them
+                adapter = TrackedHTTPAdapter(pool_connections=cls.__max_keepalive_connections,
+                                      pool_maxsize=cls.__max_connections)
+                client.session.mount('https://', adapter)
+                client.session.mount('http://', adapter)
+                cls.__tavily_clients[key] = client
+            return client
+
+    @classmethod
+    def get_limits(cls):
+        return httpx.Limits(max_connections=cls.__max_connections,
+                            max_keepalive_connections=cls.__max_keepalive_connections,
+                            keepalive_expiry=cls.__keepalive_expiry)
+
+    @classmethod
+    def get_async_openai_client(cls, api_key, base_url=None) -> AsyncOpenAI:
+        key = (api_key, base_url)
+        with cls.__lock:
+            client = cls.__async_openai_clients.get(key)
+            if client is None:
+                http_client = DefaultAsyncHttpxClient(http2=cls.__http2, limits=cls.get_limits())
+                client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+                cls.__async_openai_clients[key] = client
+            return client
+
+    @classmethod
+    def get_async_tavily_client(cls, api_key, base_url=None) -> AsyncTavilyClient:
+        key = (api_key, base_url)
+        with cls.__lock:
+            client = cls.__async_tavily_clients.get(key)
+            if client is None:
+                http_client = httpx.AsyncClient(http2=cls.__http2, limits=cls.get_limits())
+                client = AsyncTavilyClient(api_key=api_key, api_base_url=base_url, client=http_client)
+                # Tavily leaves closing a client that is passed in to its owner
+                cls.__async_http_clients.append(http_client)
+                cls.__async_tavily_clients[key] = client
+            return client
+
+    @classmethod
+    async def close_async_clients(cls):
+        with cls.__lock:
+            clients = list(cls.__async_openai_clients.values()) + cls.__async_http_clients
+            cls.__async_openai_clients.clear()
+            cls.__async_tavily_clients.clear()
+            cls.__async_http_clients = []
+        for client in clients:
+            try:
+                if isinstance(client, AsyncOpenAI):
+                    await client.close()
+                else:
+                    await client.aclose()
+            except Exception as e:
+                print(f"{MODEL_MESSAGE.CLIENT_CLOSE_ERROR} {e}")
+
+    @classmethod
+    def close_all(cls):
+        with cls.__lock:
+            for client in list(cls.__connection_trackers) + list(cls.__tavily_clients.values()):
+                try:
+                    client.close()
+                except Exception as e:
+                    print(f"{MODEL_MESSAGE.CLIENT_CLOSE_ERROR} {e}")
+            cls.__idle_openai_clients.clear()
+            cls.__connection_trackers.clear()
+            cls.__tavily_clients.clear()
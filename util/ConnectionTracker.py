@@ -0,0 +1,125 @@
+import socket
+import threading
+import weakref
+from contextlib import contextmanager
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+class RequestAborted(BaseException):
+    """
+    Raised in a run whose requests were aborted from another thread.
+
+    Like asyncio.CancelledError it is not an Exception, so the OpenAI client does not retry the request
+    and the 'except Exception' blocks of Swarm and the tools let it through.
+    """
+
+
+class ConnectionTracker:
+    """
+    Remembers the sockets an httpx client opens, so its requests can be aborted from another thread.
+
+    It is installed as a request event hook and follows the connections through the httpcore trace
+    extension. Requests sent through a TrackedHTTPAdapter (the shared Tavily session) are followed while
+    track() is active on the sending thread. abort() shuts the sockets down: unlike closing them, this also
+    wakes up a thread that is blocked reading the response.
+    """
+    CONNECTED_EVENTS = ("connection.connect_tcp.complete", "connection.start_tls.complete")
+    ABORTED_EVENTS = ("connect_tcp.started", "send_request_headers.started", ".failed")
+
+    local = threading.local()
+
+    def __init__(self):
+        self.aborted = False
+        self.sockets = weakref.WeakSet()
+        self.lock = threading.Lock()
+
+    def request_hook(self, request):
+        request.extensions["trace"] = self.trace
+
+    def trace(self, event_name, info):
+        if event_name in self.CONNECTED_EVENTS:
+            sock = info["return_value"].get_extra_info("socket")
+            if sock is not None:
+                with self.lock:
+                    self.sockets.add(sock)
+        # After abort() a failing request ends the run instead of being retried, and no new one starts
+        if self.aborted and event_name.endswith(self.ABORTED_EVENTS):
+            raise RequestAborted()
+
+    @contextmanager
+    def track(self):
+        # A shared session's connection only belongs to this tracker while the request runs, then it goes
+        # back to the pool for the other runs
+        sockets = []
+        self.local.current = (self, sockets)
+        try:
+            yield
+        finally:
+            self.local.current = None
+            with self.lock:
+                for sock in sockets:
+                    self.sockets.discard(sock)
+
+    @classmethod
+    def add_current_socket(cls, sock):
+        current = getattr(cls.local, 'current', None)
+        if current is None or sock is None:
+            return
+        tracker, sockets = current
+        with tracker.lock:
+            if not tracker.aborted:
+                tracker.sockets.add(sock)
+                sockets.append(sock)
+                return
+        raise RequestAborted()
+
+    def abort(self):
+        with self.lock:
+            self.aborted = True
+            sockets = list(self.sockets)
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class TrackedConnectionMixin:
+    """Reports the socket of every request to the ConnectionTracker tracking the sending thread."""
+
+    def connect(self):
+        super().connect()
+        ConnectionTracker.add_current_socket(self.sock)
+
+    def getresponse(self, *args, **kwargs):
+        # A connection reused from the pool is already connected
+        ConnectionTracker.add_current_socket(self.sock)
+        return super().getresponse(*args, **kwargs)
+
+
+class TrackedHTTPConnection(TrackedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TrackedHTTPSConnection(TrackedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TrackedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TrackedHTTPConnection
+
+
+class TrackedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TrackedHTTPSConnection
+
+
+class TrackedHTTPAdapter(HTTPAdapter):
+    """requests adapter whose connections can be aborted through ConnectionTracker.track()."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": TrackedHTTPConnectionPool,
+                                                   "https": TrackedHTTPSConnectionPool}
@@ -7,6 +7,7 @@ class Constants:
 
     # Setting file name
     SETTINGS_FILENAME = "settings.ini"
+    SETTINGS_SYNC_DELAY_MS = 500
 
     # App Style
     FUSION = 'Fusion'
@@ -15,20 +16,90 @@ class Constants:
     MODEL_PREFIX = "Model: "
     ELAPSED_TIME = "Elapsed Time: "
     FINISH_REASON = "Finish Reason: "
+    TTFT = "TTFT: "
+    TOKENS_PER_SECOND = "Tokens/s: "
+    TOKEN_USAGE = "Tokens: "
+    SEARCH_TIME = "Search: "
+    HANDOFFS = "Handoffs: "
 
     FORCE_STOP = "Force Stop"
+    ERROR_STOP = "Error"
     NORMAL_STOP = "stop"
     RESPONSE_TIME = " | Response Time : "
 
+    # Stream coalescing
+    STREAM_FLUSH_INTERVAL_MS = "30"
+    STREAM_FLUSH_SIZE = "512"
+
+    # Agent runs
+    MAX_CONCURRENT_RUNS = "3"
+    MAX_PARALLEL_TOOL_CALLS = "4"
+    EXECUTION_MODE_THREAD = "thread"
+    EXECUTION_MODE_ASYNCIO = "asyncio"
+
+    # Conversation context
+    CONTEXT_TOKEN_BUDGET = "8000"
+    CONTEXT_WINDOW_TOKENS = "4000"
+    CONTEXT_SUMMARY_MAX_TOKENS = "600"
+    CONTEXT_SUMMARY_MODEL = "gpt-4o-mini"
+    CONTEXT_TOKENIZER_ENCODING = "o200k_base"
+    CONTEXT_MESSAGE_OVERHEAD_TOKENS = 4
+    CONTEXT_CHARS_PER_TOKEN = 4
+    CONTEXT_SUMMARY_PROMPT = (
+        "You maintain a running summary of a conversation between a user and a team of AI agents. "
+        "Merge the previous summary and the new messages into one concise summary. Keep facts, decisions, "
+        "code names, open questions and user preferences; drop greetings and repetition. "
+        "Answer with the summary only."
+    )
+    CONTEXT_SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+    # HTTP connection pool
+    HTTP_MAX_CONNECTIONS = "20"
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = "10"
+    HTTP_KEEPALIVE_EXPIRY = "60"
+
     # Database
     DATABASE_NAME = "myaiagent.db"
     SQLITE_DATABASE = "QSQLITE"
 
+    DATABASE_WRITE_BATCH_SIZE = 100
+    DATABASE_WRITE_FLUSH_INTERVAL_MS = 100
+    DATABASE_WRITE_TIMEOUT_SECONDS = 30
+    DATABASE_BUSY_TIMEOUT_MS = 5000
+    DATABASE_CACHE_SIZE_KB = 16384
+    DATABASE_MMAP_SIZE = 256 * 1024 * 1024
+
     CHAT_MAIN_TABLE = "chat_main"
     CHAT_DETAIL_TABLE = "chat_detail"
+    CHAT_DETAIL_INDEX = "idx_chat_detail_chat_main_id"
+    CHAT_DETAIL_FTS_TABLE = "chat_detail_fts"
+    CHAT_DETAIL_PAGE_SIZE = 50
+    CHAT_SUMMARY_TABLE = "chat_summary"
+    CHAT_TRACE_TABLE = "chat_trace"
+    RUN_STATS_TABLE = "run_stats"
+    RUN_STATS_LATENCY_BUCKETS = [1, 2, 5, 10, 20, 30, 60, 120]
+    RUN_STATS_PERIODS = [7, 30, 90, 365]
+    CONVERSATION_CACHE_SIZE = 20
+
+    MESSAGE_SEARCH_LIMIT = 50
+    MESSAGE_SEARCH_RANK_WINDOW = 1000
+    MESSAGE_SEARCH_SNIPPET_TOKENS = 16
+    MESSAGE_SEARCH_MATCH_START = "\x02"
+    MESSAGE_SEARCH_MATCH_END = "\x03"
+    SEARCH_TYPING_DELAY_MS = 200
     CHAT_PROMPT_TABLE = "prompt"
 
+    SEARCH_CACHE_TABLE = "tavily_search_cache"
+    SEARCH_CACHE_INDEX = "idx_tavily_search_cache_accessed_at"
+    SEARCH_CACHE_MAX_ENTRIES = 1000
+    SEARCH_CACHE_TTL = {
+        "general": 7 * 24 * 60 * 60,
+        "news": 30 * 60,
+    }
+    SEARCH_CACHE_DEFAULT_TTL = 60 * 60
+
     NEW_CHAT = "New Chat"
+    CLI_TITLE_LENGTH = 50
 
     SEARCH_DEPTH_LIST = [
         "basic",
@@ -62,6 +133,7 @@ class UI:
     UI = "UI"
     FOUNDS = "founds"
     NOT_FOUND = "not found"
+    MATCHES = "matches"
     METHOD = "Method "
 
     AI_AGENT = "Swarm AI"
@@ -71,6 +143,23 @@ class UI:
     CHAT_TIP = "Chat"
     CHAT_LIST = "Chat List"
 
+    DASHBOARD = "Dashboard"
+    DASHBOARD_TIP = "Performance Dashboard"
+    DASHBOARD_PERIOD = "Last {} days"
+    DASHBOARD_ALL = "All"
+    DASHBOARD_REFRESH = "Refresh"
+    DASHBOARD_LATENCY_CHART = "Latency distribution"
+    DASHBOARD_RUNS_CHART = "Runs per day"
+    DASHBOARD_THROUGHPUT_CHART = "Tokens/s per day"
+    DASHBOARD_SEARCH_CHART = "Runs using web search per day (%)"
+    DASHBOARD_ERROR_CHART = "Error rate per day (%)"
+    DASHBOARD_BY_MODEL = "By model"
+    DASHBOARD_BY_AGENT = "By agent"
+    DASHBOARD_TABLE_HEADERS = ["Runs", "Avg latency (s)", "p90 latency", "Avg TTFT (s)", "Tokens/s",
+                               "Web search (%)", "Search time (s)", "Errors (%)", "Stopped (%)"]
+    DASHBOARD_SEARCH_CACHE = "Search cache"
+    DASHBOARD_SEARCH_CACHE_STATS = "Hits: {hits}   Misses: {misses}   Hit rate: {hit_rate}   Entries: {entries}"
+
     SETTING = "Setting"
     SETTING_TIP = "Setting"
 
@@ -140,17 +229,24 @@ class UI:
     ITEM_EXTRA_SIZE = 20
     ITEM_PADDING = 5
 
+    CHAT_TITLE_BAR_HEIGHT = 36
+    CHAT_BUTTON_SIZE = 28
+    CHAT_ICON_SIZE = 16
+    CHAT_DOCUMENT_CACHE_SIZE = 100
+    CHAT_RENDER_CACHE_SIZE = 200
+    CURRENT_MATCH_ANCHOR = "current-match"
+
     QSPLITTER_LEFT_WIDTH = 200
     QSPLITTER_RIGHT_WIDTH = 800
     QSPLITTER_HANDLEWIDTH = 3
 
     PROGRESS_BAR_STYLE = """
-            QProgressBar{
+            QProgressBar#progress_bar {
                 border: 1px grey;
                 border-radius: 5px;            
             }
     
-            QProgressBar::chunk {
+            QProgressBar#progress_bar::chunk {
                 background-color: lightgreen;
                 width: 10px;
                 margin: 1px;
@@ -177,9 +273,14 @@ class MODEL_MESSAGE:
     MODEL_UNSUPPORTED_TYPE = "Unsupported model type"
     THREAD_RUNNING = "Previous thread is still running!"
     THREAD_FINISHED = "SwarmThread has been finished"
+    THREAD_QUEUED = "Concurrent run limit reached, queued run for chat:"
     INVALID_CREATION_TYPE = "Invalid creation type: "
     UNEXPECTED_ERROR = "An unexpected error occurred: "
     AUTHENTICATION_FAILED_OPENAI = "Authentication failed. The OpenAI API key is not valid."
+    CLIENT_CLOSE_ERROR = "Failed to close API client: "
+    CONTEXT_SUMMARY_ERROR = "Failed to summarize earlier conversation, sending the recent window only: "
+    CLI_INVALID_LINE = "Skipped invalid prompt on line"
+    CLI_OPENAI_API_KEY_MISSING = "No OpenAI API key: pass --openai-api-key, set OPENAI_API_KEY or save it in the app."
 
     def __setattr__(self, name, value):
         if name in self.__dict__:
@@ -200,10 +301,26 @@ class DATABASE_MESSAGE:
     DATABASE_CHAT_MAIN_ENTRY_SUCCESS = "Successfully deleted chat main entry with id: "
     DATABASE_CHAT_MAIN_ENTRY_FAIL = "Failed to delete chat main entry with id "
 
-    DATABASE_CHAT_DETAIL_CREATE_TABLE_ERROR = "Failed to create chat detail table for chat_main_id "
+    DATABASE_CHAT_DETAIL_CREATE_TABLE_ERROR = "Failed to create chat_detail table: "
     DATABASE_CHAT_DETAIL_INSERT_ERROR = "Failed to insert chat detail: "
-    DATABASE_CHAT_DETAIL_DELETE_ERROR = "Failed to delete chat detail table "
+    DATABASE_CHAT_DETAIL_MIGRATE_SUCCESS = "Migrated legacy chat detail tables into chat_detail: "
+    DATABASE_CHAT_DETAIL_MIGRATE_ERROR = "Failed to migrate legacy chat detail tables: "
     DATABASE_CHAT_DETAIL_FETCH_ERROR = "Failed to fetch chat details for chat_main_id"
+    DATABASE_CHAT_DETAIL_FTS_CREATE_ERROR = "Failed to create chat_detail full-text index: "
+    DATABASE_CHAT_DETAIL_SEARCH_ERROR = "Failed to search chat details: "
+    DATABASE_CHAT_SUMMARY_CREATE_TABLE_ERROR = "Failed to create chat summary table: "
+    DATABASE_CHAT_SUMMARY_FETCH_ERROR = "Failed to fetch chat summary for chat_main_id"
+    DATABASE_CHAT_SUMMARY_SAVE_ERROR = "Failed to save chat summary for chat_main_id"
+    DATABASE_CHAT_TRACE_CREATE_TABLE_ERROR = "Failed to create chat trace table: "
+    DATABASE_CHAT_TRACE_SAVE_ERROR = "Failed to save chat trace for chat_detail_id"
+    DATABASE_RUN_STATS_CREATE_TABLE_ERROR = "Failed to create run stats table: "
+    DATABASE_RUN_STATS_BACKFILL_SUCCESS = "Filled run stats from existing chat details: "
+    DATABASE_RUN_STATS_BACKFILL_ERROR = "Failed to fill run stats from existing chat details: "
+    DATABASE_RUN_STATS_SAVE_ERROR = "Failed to save run stats: "
+    DATABASE_RUN_STATS_FETCH_ERROR = "Failed to fetch run stats: "
+    DATABASE_SEARCH_CACHE_CREATE_TABLE_ERROR = "Failed to create search cache table: "
+    DATABASE_SEARCH_CACHE_READ_ERROR = "Failed to read search cache: "
+    DATABASE_SEARCH_CACHE_WRITE_ERROR = "Failed to write search cache: "
 
     DATABASE_RETRIEVE_DATA_FAIL = "Failed to retrieve data from "
     DATABASE_DELETE_TABLE_SUCCESS = "Successfully deleted table: "
@@ -212,6 +329,25 @@ class DATABASE_MESSAGE:
     DATABASE_FAILED_OPEN = "Failed to open database."
     DATABASE_ENABLE_FOREIGN_KEY = "Failed to enable foreign key: "
     DATABASE_PRAGMA_FOREIGN_KEYS_ON = "PRAGMA foreign_keys = ON;"
+    DATABASE_PRAGMA_JOURNAL_MODE_WAL = "PRAGMA journal_mode = WAL;"
+    DATABASE_PRAGMA_SYNCHRONOUS_NORMAL = "PRAGMA synchronous = NORMAL;"
+    DATABASE_PRAGMA_TEMP_STORE_MEMORY = "PRAGMA temp_store = MEMORY;"
+    DATABASE_PRAGMA_CACHE_SIZE = f"PRAGMA cache_size = -{Constants.DATABASE_CACHE_SIZE_KB};"
+    DATABASE_PRAGMA_MMAP_SIZE = f"PRAGMA mmap_size = {Constants.DATABASE_MMAP_SIZE};"
+    DATABASE_PRAGMA_BUSY_TIMEOUT = f"PRAGMA busy_timeout = {Constants.DATABASE_BUSY_TIMEOUT_MS};"
+    DATABASE_TUNING_PRAGMAS = [
+        DATABASE_PRAGMA_JOURNAL_MODE_WAL,
+        DATABASE_PRAGMA_SYNCHRONOUS_NORMAL,
+        DATABASE_PRAGMA_TEMP_STORE_MEMORY,
+        DATABASE_PRAGMA_CACHE_SIZE,
+        DATABASE_PRAGMA_MMAP_SIZE,
+        DATABASE_PRAGMA_BUSY_TIMEOUT,
+    ]
+    DATABASE_TUNE_CONNECTION = "Failed to tune database connection: "
+    DATABASE_PREPARE_QUERY_ERROR = "Failed to prepare query: "
+    DATABASE_WRITE_ERROR = "Failed to write to database: "
+    DATABASE_WRITER_CLOSED = "Database writer is already closed."
+    DATABASE_WRITER_CONNECT_ERROR = "Database writer failed to open its connection: "
 
     NEW_TITLE = "New Title"
     NEW_PROMPT = "New Prompt"
@@ -222,8 +358,16 @@ class ProviderName(Enum):
     TAVILY = 'Tavily'
 
 
+class MessageDisplay(Enum):
+    STYLED = auto()
+    ORIGINAL = auto()
+    CLEARED = auto()
+    HIGHLIGHT = auto()
+
+
 class MainWidgetIndex(Enum):
     CHAT_WIDGET = auto()
+    DASHBOARD_WIDGET = auto()
 
 
 def get_ai_provider_names():
@@ -1,10 +1,12 @@
 from util.Constants import Constants
+from util.SearchCache import SearchCache
 from util.SqliteDatabase import SqliteDatabase
 
 
 class DataManager:
     """Static class to manage database operations."""
     __db_instance = None
+    __search_cache_instance = None
 
     @classmethod
     def initialize_database(cls, db_filename=Constants.DATABASE_NAME):
@@ -16,3 +18,14 @@ class DataManager:
         if cls.__db_instance is None:
             cls.initialize_database()
         return cls.__db_instance
+
+    @classmethod
+    def initialize_search_cache(cls, db_filename=Constants.DATABASE_NAME):
+        if cls.__search_cache_instance is None:
+            cls.__search_cache_instance = SearchCache(db_filename)
+
+    @classmethod
+    def get_search_cache(cls) -> SearchCache:
+        if cls.__search_cache_instance is None:
+            cls.initialize_search_cache()
+        return cls.__search_cache_instance
@@ -0,0 +1,152 @@
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from util.Constants import Constants, DATABASE_MESSAGE
+
+
+class DatabaseWriter:
+    """
+    Applies database writes on a dedicated thread with its own connection.
+
+    Queued statements are committed together once a batch fills up or the flush interval has passed, so a
+    burst of writes (summaries, traces, run stats) costs one transaction instead of one fsync each and does
+    not block the caller. Statements whose result is needed (e.g. a new row id) are sent with
+    execute_and_wait, which commits the batch right away and blocks the caller until then, at most
+    timeout seconds.
+    If the connection cannot be opened the writer closes itself: every waiting and later write fails.
+    """
+    STOP = object()
+
+    def __init__(self, db_filename, batch_size=Constants.DATABASE_WRITE_BATCH_SIZE,
+                 flush_interval_ms=Constants.DATABASE_WRITE_FLUSH_INTERVAL_MS,
+                 timeout=Constants.DATABASE_WRITE_TIMEOUT_SECONDS):
+        self.db_filename = db_filename
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.timeout = timeout
+        self.queue = queue.Queue()
+        self.pending = 0
+        self.pending_lock = threading.Lock()
+        self.closed = False
+        self.thread = threading.Thread(target=self.run, name="DatabaseWriter", daemon=True)
+        self.thread.start()
+
+    def put(self, item):
+        # Checked under the lock, so nothing is queued after the writer has failed and emptied its queue
+        with self.pending_lock:
+            if self.closed:
+                logging.error(DATABASE_MESSAGE.DATABASE_WRITER_CLOSED)
+                return False
+            self.pending += 1
+            self.queue.put(item)
+        return True
+
+    def execute(self, query_string, params=None):
+        self.put((query_string, params or {}, None))
+
+    def execute_and_wait(self, query_string, params=None):
+        """Run a statement and wait until it is committed; returns (lastrowid, rowcount)."""
+        future = Future()
+        if not self.put((query_string, params or {}, future)):
+            raise sqlite3.ProgrammingError(DATABASE_MESSAGE.DATABASE_WRITER_CLOSED)
+        return future.result(timeout=self.timeout)
+
+    def flush(self):
+        """Wait until every queued write is committed, so a following read sees it."""
+        with self.pending_lock:
+            if not self.pending:
+                return
+        future = Future()
+        if self.put((None, None, future)):
+            future.result(timeout=self.timeout)
+
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        with self.pending_lock:
+            self.closed = True
+            self.queue.put(self.STOP)
+        self.thread.join(timeout=self.timeout)
+
+    def connect(self):
+        connection = sqlite3.connect(self.db_filename, isolation_level=None, check_same_thread=False)
+        connection.execute(DATABASE_MESSAGE.DATABASE_PRAGMA_FOREIGN_KEYS_ON)
+        for pragma in DATABASE_MESSAGE.DATABASE_TUNING_PRAGMAS:
+            connection.execute(pragma)
+        return connection
+
+    def run(self):
+        try:
+            connection = self.connect()
+        except sqlite3.Error as e:
+            logging.error(f"{DATABASE_MESSAGE.DATABASE_WRITER_CONNECT_ERROR} {e}")
+            self.fail_queued(e)
+            return
+        while True:
+            item = self.queue.get()
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            # Keep collecting until the batch is full, the interval is over or someone waits for a result
+            while item is not self.STOP and item[2] is None and len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            self.write_batch(connection, [item for item in batch if item is not self.STOP])
+            if batch[-1] is self.STOP:
+                break
+        connection.close()
+
+    def fail_queued(self, error):
+        with self.pending_lock:
+            self.closed = True
+            while not self.queue.empty():
+                item = self.queue.get_nowait()
+                if item is not self.STOP and item[2] is not None:
+                    item[2].set_exception(error)
+            self.pending = 0
+
+    def write_batch(self, connection, batch):
+        if not batch:
+            return
+        results = []
+        try:
+            connection.execute("BEGIN")
+            for query_string, params, future in batch:
+                if query_string is None:
+                    results.append((future, None))
+                    continue
+                try:
+                    cursor = connection.execute(query_string, params)
+                    results.append((future, (cursor.lastrowid, cursor.rowcount)))
+                except sqlite3.Error as e:
+                    # A failed statement only rolls back itself; the rest of the batch is still committed
+                    logging.error(f"{DATABASE_MESSAGE.DATABASE_WRITE_ERROR} {e}")
+                    results.append((future, e))
+            connection.execute("COMMIT")
+        except sqlite3.Error as e:
+            logging.error(f"{DATABASE_MESSAGE.DATABASE_WRITE_ERROR} {e}")
+            if connection.in_transaction:
+                connection.rollback()
+            results = [(future, e) for _, _, future in batch]
+
+        for future, result in results:
+            if future is None:
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+        with self.pending_lock:
+            self.pending -= len(batch)
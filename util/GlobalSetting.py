@@ -11,7 +11,6 @@ class GlobalSetting(QDialog):
     def __init__(self):
         super().__init__()
         self.setWindowTitle(UI.SETTINGS)
-        self._settings = SettingsManager.get_settings()
 
         mainLayout = QVBoxLayout(self)
 
@@ -41,7 +40,7 @@ class GlobalSetting(QDialog):
             ai_provider_layout.addWidget(QLabel(label), i, 0)
             ai_provider_layout.addWidget(self.ai_provider_editors[i], i, 1, 1, 2)
 
-            ai_provider_value = self._settings.value(f'AI_Provider/{self.ai_provider_keys[i]}')
+            ai_provider_value = SettingsManager.get_value(f'AI_Provider/{self.ai_provider_keys[i]}')
             if ai_provider_value:
                 self.ai_provider_editors[i].setText(ai_provider_value)
 
@@ -70,7 +69,7 @@ class GlobalSetting(QDialog):
             info_label_window_layout.addWidget(self.info_color_editors[i], i, 1)
             info_label_window_layout.addWidget(self.info_buttons[i], i, 2)
 
-            info_key = self._settings.value(f'Info_Label_Style/{self.info_keys[i]}')
+            info_key = SettingsManager.get_value(f'Info_Label_Style/{self.info_keys[i]}')
             if info_key:
                 self.info_color_editors[i].setText(info_key)
 
@@ -82,7 +81,7 @@ class GlobalSetting(QDialog):
         ai_code_view_layout = QGridLayout()
         self.ai_labels = ['Color', 'Background Color', 'Font-Family', 'Font-Size']
         self.ai_keys = ['color', 'background-color', 'font-family', 'font-size']
-        self.ai_values = [self._settings.value(f'AI_Code_Style/{self.ai_keys[i]}', '') for i in
+        self.ai_values = [SettingsManager.get_value(f'AI_Code_Style/{self.ai_keys[i]}', '') for i in
                           range(len(self.ai_keys))]
 
         self.ai_editors = [QLineEdit(self.ai_values[i]) for i in range(len(self.ai_labels))]
@@ -138,7 +137,7 @@ class GlobalSetting(QDialog):
             else:
                 commonLabelStyleLayout.addWidget(self.commonLabelStyle_editors[i], i, 1, 1, 2)
 
-            human_key = self._settings.value(f'Common_Label_Style/{self.commonLabelStyle_keys[i]}')
+            human_key = SettingsManager.get_value(f'Common_Label_Style/{self.commonLabelStyle_keys[i]}')
             if human_key:
                 self.commonLabelStyle_editors[i].setText(human_key)
 
@@ -167,7 +166,7 @@ class GlobalSetting(QDialog):
             chat_title_window_layout.addWidget(self.chat_color_editors[i], i, 1)
             chat_title_window_layout.addWidget(self.chat_buttons[i], i, 2)
 
-            chat_key = self._settings.value(f'Chat_TitleBar_Style/{self.chat_keys[i]}')
+            chat_key = SettingsManager.get_value(f'Chat_TitleBar_Style/{self.chat_keys[i]}')
             if chat_key:
                 self.chat_color_editors[i].setText(chat_key)
 
@@ -175,19 +174,19 @@ class GlobalSetting(QDialog):
         mainLayout.addWidget(chat_title_window_group)
 
     def handle_info_label_text_change(self, index, text):
-        self._settings.setValue(f'Info_Label_Style/{self.info_keys[index]}', text)
+        SettingsManager.set_value(f'Info_Label_Style/{self.info_keys[index]}', text)
 
     def handle_ai_code_view_text_change(self, index, text):
-        self._settings.setValue(f'AI_Code_Style/{self.ai_keys[index]}', text)
+        SettingsManager.set_value(f'AI_Code_Style/{self.ai_keys[index]}', text)
 
     def handle_common_label_text_change(self, index, text):
-        self._settings.setValue(f'Common_Label_Style/{self.commonLabelStyle_keys[index]}', text)
+        SettingsManager.set_value(f'Common_Label_Style/{self.commonLabelStyle_keys[index]}', text)
 
     def ai_provider_value_change(self, index, text):
-        self._settings.setValue(f'AI_Provider/{self.ai_provider_keys[index]}', text)
+        SettingsManager.set_value(f'AI_Provider/{self.ai_provider_keys[index]}', text)
 
     def handle_chat_title_bar_text_change(self, index, text):
-        self._settings.setValue(f'Chat_TitleBar_Style/{self.chat_keys[index]}', text)
+        SettingsManager.set_value(f'Chat_TitleBar_Style/{self.chat_keys[index]}', text)
 
     def ai_color_dialog(self, i):
         color = QColorDialog.getColor()
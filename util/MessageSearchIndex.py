@@ -0,0 +1,56 @@
+from collections import defaultdict
+
+
+class MessageSearchIndex:
+    """
+    Trigram index over the raw text of the messages of the open conversation, kept up to date as text is
+    appended. Text is only indexed when it is first searched, so opening a chat does not pay for it.
+
+    A search text is only matched against the messages holding all of its trigrams, and a search text that
+    extends the previous one only against the messages the previous one was found in.
+    """
+
+    def __init__(self):
+        self.postings = defaultdict(set)
+        self.tails = {}
+        self.pending = defaultdict(list)
+        self.last_search_text = None
+        self.last_hits = set()
+
+    @staticmethod
+    def get_trigrams(text):
+        return set(map("".join, zip(text, text[1:], text[2:])))
+
+    def clear(self):
+        self.postings.clear()
+        self.tails.clear()
+        self.pending.clear()
+        self.last_search_text = None
+
+    def add(self, uid, text):
+        self.pending[uid].append(text)
+        self.last_search_text = None
+
+    def index_pending(self):
+        # Appended text is indexed together with the last two characters before it
+        for uid, texts in self.pending.items():
+            text = self.tails.get(uid, "") + "".join(texts).lower()
+            for trigram in self.get_trigrams(text):
+                self.postings[trigram].add(uid)
+            self.tails[uid] = text[-2:]
+        self.pending.clear()
+
+    def get_candidates(self, search_text):
+        # None means that every message may contain the search text
+        search_text = search_text.lower()
+        if self.last_search_text is not None and search_text.startswith(self.last_search_text):
+            return self.last_hits
+        if len(search_text) < 3:
+            return None
+        self.index_pending()
+        postings = sorted((self.postings.get(trigram, set()) for trigram in self.get_trigrams(search_text)), key=len)
+        return postings[0].intersection(*postings[1:])
+
+    def set_hits(self, search_text, uids):
+        self.last_search_text = search_text.lower()
+        self.last_hits = set(uids)
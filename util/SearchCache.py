@@ -0,0 +1,147 @@
+import json
+import sqlite3
+import threading
+import time
+
+from util.Constants import Constants, DATABASE_MESSAGE
+
+
+class SearchCache:
+    """
+    Persistent cache of web search results, keyed on the full set of search parameters.
+
+    Searches run on the worker thread, so the cache uses its own sqlite3 connection guarded by a lock
+    instead of the Qt connection owned by the GUI thread.
+    """
+    KEY_FIELDS = [
+        'search_depth',
+        'topic',
+        'days',
+        'max_results',
+        'include_domains',
+        'exclude_domains',
+        'include_answer',
+        'include_raw_content',
+        'include_images',
+    ]
+
+    def __init__(self, db_filename=Constants.DATABASE_NAME, max_entries=Constants.SEARCH_CACHE_MAX_ENTRIES,
+                 ttl=None):
+        self.db_filename = db_filename
+        self.table_name = Constants.SEARCH_CACHE_TABLE
+        self.max_entries = max_entries
+        self.ttl = ttl if ttl is not None else Constants.SEARCH_CACHE_TTL
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.connection = None
+
+    def get_connection(self):
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.db_filename, check_same_thread=False)
+            self.create_table()
+        return self.connection
+
+    def create_table(self):
+        try:
+            with self.connection:
+                self.connection.execute(f"""
+                                CREATE TABLE IF NOT EXISTS {self.table_name}
+                                (
+                                    cache_key TEXT PRIMARY KEY,
+                                    topic TEXT NOT NULL,
+                                    response TEXT NOT NULL,
+                                    created_at REAL NOT NULL,
+                                    accessed_at REAL NOT NULL,
+                                    hit_count INTEGER DEFAULT 0 NOT NULL
+                                )
+                                """)
+                self.connection.execute(f"CREATE INDEX IF NOT EXISTS {Constants.SEARCH_CACHE_INDEX} "
+                                        f"ON {self.table_name} (accessed_at)")
+        except sqlite3.Error as e:
+            print(f"{DATABASE_MESSAGE.DATABASE_SEARCH_CACHE_CREATE_TABLE_ERROR} {e}")
+
+    @staticmethod
+    def normalize_query(query):
+        # Case and spacing do not change what the search engine returns
+        return " ".join(str(query).split()).casefold()
+
+    def make_key(self, query, search_args):
+        params = {'query': self.normalize_query(query)}
+        for field in self.KEY_FIELDS:
+            value = search_args.get(field)
+            if isinstance(value, (list, tuple, set)):
+                value = sorted(value)
+            params[field] = value
+        return json.dumps(params, sort_keys=True)
+
+    def get_ttl(self, topic):
+        return self.ttl.get(topic, Constants.SEARCH_CACHE_DEFAULT_TTL)
+
+    def get(self, query, search_args):
+        key = self.make_key(query, search_args)
+        now = time.time()
+        with self.lock:
+            try:
+                connection = self.get_connection()
+                with connection:
+                    row = connection.execute(
+                        f"SELECT topic, response, created_at FROM {self.table_name} WHERE cache_key = ?",
+                        (key,)).fetchone()
+                    if row is not None and now - row[2] > self.get_ttl(row[0]):
+                        connection.execute(f"DELETE FROM {self.table_name} WHERE cache_key = ?", (key,))
+                        row = None
+                    if row is None:
+                        self.misses += 1
+                        return None
+                    connection.execute(
+                        f"UPDATE {self.table_name} SET accessed_at = ?, hit_count = hit_count + 1 "
+                        f"WHERE cache_key = ?", (now, key))
+                self.hits += 1
+                return json.loads(row[1])
+            except (sqlite3.Error, ValueError) as e:
+                print(f"{DATABASE_MESSAGE.DATABASE_SEARCH_CACHE_READ_ERROR} {e}")
+                self.misses += 1
+                return None
+
+    def put(self, query, search_args, results):
+        key = self.make_key(query, search_args)
+        now = time.time()
+        with self.lock:
+            try:
+                connection = self.get_connection()
+                with connection:
+                    connection.execute(
+                        f"INSERT OR REPLACE INTO {self.table_name} "
+                        f"(cache_key, topic, response, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                        (key, search_args.get('topic') or "", json.dumps(results), now, now))
+                    # Least recently used entries beyond the cap are evicted
+                    connection.execute(
+                        f"DELETE FROM {self.table_name} WHERE cache_key IN "
+                        f"(SELECT cache_key FROM {self.table_name} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                        (self.max_entries,))
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                print(f"{DATABASE_MESSAGE.DATABASE_SEARCH_CACHE_WRITE_ERROR} {e}")
+
+    def get_stats(self):
+        with self.lock:
+            try:
+                entries = self.get_connection().execute(f"SELECT COUNT(*) FROM {self.table_name}").fetchone()[0]
+            except sqlite3.Error as e:
+                print(f"{DATABASE_MESSAGE.DATABASE_SEARCH_CACHE_READ_ERROR} {e}")
+                entries = 0
+            return {'hits': self.hits, 'misses': self.misses, 'entries': entries}
+
+    def clear(self):
+        with self.lock:
+            try:
+                with self.get_connection() as connection:
+                    connection.execute(f"DELETE FROM {self.table_name}")
+            except sqlite3.Error as e:
+                print(f"{DATABASE_MESSAGE.DATABASE_SEARCH_CACHE_WRITE_ERROR} {e}")
+
+    def close(self):
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
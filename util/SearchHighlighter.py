@@ -0,0 +1,47 @@
+import html
+import re
+from functools import lru_cache
+
+from util.Constants import UI
+
+
+class SearchHighlighter:
+    """
+    Finds a search text in a message and renders the message as HTML with every match highlighted.
+
+    Matches are found once on the raw text, so escaped HTML entities are never matched, and the offsets are kept
+    so the view can step through the single occurrences.
+    """
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def get_pattern(search_text):
+        return re.compile(re.escape(search_text), re.IGNORECASE)
+
+    @staticmethod
+    def find_matches(text, search_text):
+        if not text or not search_text:
+            return []
+        return [match.span() for match in SearchHighlighter.get_pattern(search_text).finditer(text)]
+
+    @staticmethod
+    def escape(text):
+        # Preserve carriage returns and tabs
+        return html.escape(text).replace('\n', '<br>').replace('\t', '&nbsp;' * 4)
+
+    @staticmethod
+    def to_html(text, matches, style, current_style=None, current_match=None):
+        parts = []
+        position = 0
+        for index, (start, end) in enumerate(matches):
+            parts.append(SearchHighlighter.escape(text[position:start]))
+            match_text = SearchHighlighter.escape(text[start:end])
+            if index == current_match:
+                # The anchor lets the view find where the current match is laid out
+                parts.append(f'<a name="{UI.CURRENT_MATCH_ANCHOR}">'
+                             f'<span style="{current_style}">{match_text}</span></a>')
+            else:
+                parts.append(f'<span style="{style}">{match_text}</span>')
+            position = end
+        parts.append(SearchHighlighter.escape(text[position:]))
+        return "".join(parts)
@@ -1,17 +1,85 @@
-from PyQt6.QtCore import QSettings
+from PyQt6.QtCore import QSettings, QCoreApplication, QThread, QTimer
 from util.Constants import Constants
 
 
 class SettingsManager:
+    """
+    Keeps the settings file behind an in-memory snapshot that is loaded once.
+
+    Reads are dictionary lookups. set_value() updates the snapshot at once and writes the file after a short
+    delay, so a burst of changes (typing in a setting field) costs one disk write. The version goes up with
+    every change, so widgets that keep styles built from settings know when to rebuild them.
+    """
     __settings = None
+    __values = None
+    __version = 0
+    __sync_timer = None
 
     @classmethod
     def initialize_settings(cls):
         if cls.__settings is None:
             cls.__settings = QSettings(Constants.SETTINGS_FILENAME, QSettings.Format.IniFormat)
+            cls.__values = {key: cls.__settings.value(key) for key in cls.__settings.allKeys()}
 
     @classmethod
     def get_settings(cls) -> QSettings:
         if cls.__settings is None:
             cls.initialize_settings()
         return cls.__settings
+
+    @classmethod
+    def get_value(cls, key, default=None):
+        if cls.__settings is None:
+            cls.initialize_settings()
+        return cls.__values.get(key, default)
+
+    @classmethod
+    def get_group(cls, group):
+        if cls.__settings is None:
+            cls.initialize_settings()
+        prefix = group + "/"
+        return {key[len(prefix):]: value for key, value in cls.__values.items() if key.startswith(prefix)}
+
+    @classmethod
+    def get_version(cls):
+        return cls.__version
+
+    @classmethod
+    def set_value(cls, key, value):
+        if cls.__settings is None:
+            cls.initialize_settings()
+        if key in cls.__values and cls.__values[key] == value:
+            return
+        cls.__values[key] = value
+        cls.__version += 1
+        cls.__settings.setValue(key, value)
+        cls.schedule_sync()
+
+    @classmethod
+    def remove_value(cls, key):
+        if cls.__settings is None:
+            cls.initialize_settings()
+        if cls.__values.pop(key, None) is None:
+            return
+        cls.__version += 1
+        cls.__settings.remove(key)
+        cls.schedule_sync()
+
+    @classmethod
+    def schedule_sync(cls):
+        # Without a running application (command line) or off the GUI thread the file is written right away
+        app = QCoreApplication.instance()
+        if app is None or QThread.currentThread() != app.thread():
+            cls.sync()
+            return
+        if cls.__sync_timer is None:
+            cls.__sync_timer = QTimer()
+            cls.__sync_timer.setSingleShot(True)
+            cls.__sync_timer.setInterval(Constants.SETTINGS_SYNC_DELAY_MS)
+            cls.__sync_timer.timeout.connect(cls.sync)
+        cls.__sync_timer.start()
+
+    @classmethod
+    def sync(cls):
+        if cls.__settings is not None:
+            cls.__settings.sync()
@@ -1,11 +1,26 @@
+import bisect
+import json
 import logging
+import re
+import time
 
 from PyQt6.QtSql import QSqlDatabase, QSqlQuery, QSqlTableModel
 
+from util.ChatType import ChatType
 from util.Constants import Constants, DATABASE_MESSAGE
+from util.DatabaseWriter import DatabaseWriter
+from util.Utility import Utility
 
 
 class SqliteDatabase:
+    CHAT_DETAIL_COLUMNS = "id, chat_main_id, chat_type, chat_model, chat, elapsed_time, finish_reason, created_at"
+    RUN_STATS_GROUPS = ["day", "model", "agent"]
+    RUN_STATS_LATENCY_COLUMNS = [f"latency_{index}" for index in range(len(Constants.RUN_STATS_LATENCY_BUCKETS) + 1)]
+    RUN_STATS_COLUMNS = ["runs", "errors", "force_stops", "elapsed_time", "ttft", "ttft_runs", "tokens_per_second",
+                         "tokens_per_second_runs", "completion_tokens", "search_runs", "search_count",
+                         "search_time"] + RUN_STATS_LATENCY_COLUMNS
+    RUN_STATS_REAL_COLUMNS = ["elapsed_time", "ttft", "tokens_per_second", "search_time"]
+
     def __init__(self, db_filename=Constants.DATABASE_NAME):
         self.initialize_vars(db_filename)
         self.initialize_db()
@@ -15,20 +30,63 @@ class SqliteDatabase:
         self.db_filename = db_filename
         self.db = None
         self.model = None
+        self.writer = None
+        self.queries = {}
 
         # Chat
         self.chat_main_table_name = Constants.CHAT_MAIN_TABLE
         self.chat_detail_table_name = Constants.CHAT_DETAIL_TABLE
+        self.chat_detail_fts_table_name = Constants.CHAT_DETAIL_FTS_TABLE
+        self.chat_summary_table_name = Constants.CHAT_SUMMARY_TABLE
+        self.chat_trace_table_name = Constants.CHAT_TRACE_TABLE
+        self.run_stats_table_name = Constants.RUN_STATS_TABLE
 
     def initialize_db(self):
+        # The Qt connection is used for reads (and the schema setup below); writes go through self.writer
         self.db = QSqlDatabase.addDatabase(Constants.SQLITE_DATABASE)
         self.db.setDatabaseName(self.db_filename)
+        self.db.setConnectOptions(f"QSQLITE_BUSY_TIMEOUT={Constants.DATABASE_BUSY_TIMEOUT_MS}")
         if not self.db.open():
             print(f"{DATABASE_MESSAGE.DATABASE_FAILED_OPEN}")
             return
 
         self.enable_foreign_key()
+        self.tune_connection()
         self.create_all_tables()
+        self.writer = DatabaseWriter(self.db_filename)
+
+    def tune_connection(self):
+        query = QSqlQuery(db=self.db)
+        for query_string in DATABASE_MESSAGE.DATABASE_TUNING_PRAGMAS:
+            if not query.exec(query_string):
+                print(f"{DATABASE_MESSAGE.DATABASE_TUNE_CONNECTION} {query_string} {query.lastError().text()}")
+
+    def get_query(self, query_string):
+        """
+        Return the prepared query for query_string, compiling it only the first time it is used.
+        Callers bind every parameter, run it, and call finish() once the rows are read.
+        """
+        query = self.queries.get(query_string)
+        if query is None:
+            query = QSqlQuery(db=self.db)
+            query.setForwardOnly(True)
+            if not query.prepare(query_string):
+                print(f"{DATABASE_MESSAGE.DATABASE_PREPARE_QUERY_ERROR} {query.lastError().text()}")
+                return query
+            self.queries[query_string] = query
+        return query
+
+    def flush(self):
+        if self.writer is not None:
+            self.writer.flush()
+
+    def close(self):
+        for query in self.queries.values():
+            query.finish()
+        self.queries.clear()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
 
     def enable_foreign_key(self):
         query = QSqlQuery(db=self.db)
@@ -46,6 +104,12 @@ class SqliteDatabase:
 
     def create_all_tables(self):
         self.create_chat_main()
+        self.create_chat_detail()
+        self.migrate_chat_detail_tables()
+        self.create_chat_detail_fts()
+        self.create_chat_summary()
+        self.create_chat_trace()
+        self.create_run_stats()
 
     def create_chat_main(self):
         query = QSqlQuery()
@@ -63,37 +127,26 @@ class SqliteDatabase:
             print(f"{DATABASE_MESSAGE.DATABASE_CHAT_CREATE_TABLE_ERROR} {e}")
 
     def add_chat_main(self, title):
-        query = QSqlQuery()
-        query.prepare(f"INSERT INTO {self.chat_main_table_name} (title) VALUES (:title)")
-        query.bindValue(":title", title)
         try:
-            if query.exec():
-                chat_main_id = query.lastInsertId()
-                self.create_chat_detail(chat_main_id)
-                return chat_main_id
+            last_id, _ = self.writer.execute_and_wait(
+                f"INSERT INTO {self.chat_main_table_name} (title) VALUES (:title)", {"title": title})
+            return last_id
         except Exception as e:
             print(f"{DATABASE_MESSAGE.DATABASE_CHAT_ADD_ERROR} {e}")
         return None
 
     def update_chat_main(self, id, title):
-        query = QSqlQuery()
-        query.prepare(f"UPDATE {self.chat_main_table_name} SET title = :title WHERE id = :id")
-        query.bindValue(":title", title)
-        query.bindValue(":id", id)
         try:
-            if query.exec():
-                return True
+            self.writer.execute_and_wait(f"UPDATE {self.chat_main_table_name} SET title = :title WHERE id = :id",
+                                         {"title": title, "id": id})
+            return True
         except Exception as e:
             print(f"{DATABASE_MESSAGE.DATABASE_CHAT_UPDATE_ERROR} {e}")
         return False
 
     def delete_chat_main_entry(self, id):
         try:
-            query = QSqlQuery()
-            query.prepare(f"DELETE FROM {self.chat_main_table_name} WHERE id = :id")
-            query.bindValue(":id", id)
-            if not query.exec():
-                raise Exception(query.lastError().text())
+            self.writer.execute_and_wait(f"DELETE FROM {self.chat_main_table_name} WHERE id = :id", {"id": id})
             logging.info(f"{DATABASE_MESSAGE.DATABASE_CHAT_MAIN_ENTRY_SUCCESS} {id}")
         except Exception as e:
             logging.error(f"{DATABASE_MESSAGE.DATABASE_CHAT_MAIN_ENTRY_FAIL} {id}: {e}")
@@ -101,19 +154,13 @@ class SqliteDatabase:
         return True
 
     def delete_chat_main(self, id):
-        try:
-            if not self.delete_chat_detail(id):
-                raise Exception(f"Failed to delete chat details for id {id}")
-            if not self.delete_chat_main_entry(id):
-                raise Exception(f"Failed to delete chat main entry for id {id}")
-        except Exception as e:
-            logging.error(f"Error deleting chat main for id {id}: {e}")
-            return False
-        return True
+        # Rows in chat_detail are removed by ON DELETE CASCADE
+        return self.delete_chat_main_entry(id)
 
     def get_all_chat_main_list(self):
-        query = QSqlQuery()
-        query.prepare(f"SELECT * FROM {self.chat_main_table_name} ORDER BY created_at DESC")
+        self.flush()
+        query = self.get_query(f"SELECT id, title, created_at FROM {self.chat_main_table_name} "
+                               f"ORDER BY created_at DESC")
         try:
             if query.exec():
                 results = []
@@ -125,16 +172,17 @@ class SqliteDatabase:
                 return results
         except Exception as e:
             print(f"{DATABASE_MESSAGE.DATABASE_RETRIEVE_DATA_FAIL} {self.chat_main_table_name}: {e}")
+        finally:
+            query.finish()
         return []
 
-    def create_chat_detail(self, chat_main_id):
+    def create_chat_detail(self):
         query = QSqlQuery()
-        chat_detail_table = f"{self.chat_detail_table_name}_{chat_main_id}"
         query_string = f"""
-          CREATE TABLE IF NOT EXISTS {chat_detail_table}
+          CREATE TABLE IF NOT EXISTS {self.chat_detail_table_name}
             (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                chat_main_id INTEGER,
+                chat_main_id INTEGER NOT NULL,
                 chat_type TEXT,
                 chat_model TEXT,   
                 chat TEXT,     
@@ -144,47 +192,201 @@ class SqliteDatabase:
                 FOREIGN KEY(chat_main_id) REFERENCES {self.chat_main_table_name}(id) ON DELETE CASCADE 
             )
          """
+        index_string = f"""
+          CREATE INDEX IF NOT EXISTS {Constants.CHAT_DETAIL_INDEX}
+            ON {self.chat_detail_table_name} (chat_main_id, id)
+         """
         try:
-            query.exec(query_string)
+            if not query.exec(query_string) or not query.exec(index_string):
+                raise Exception(query.lastError().text())
         except Exception as e:
-            print(f"{DATABASE_MESSAGE.DATABASE_CHAT_DETAIL_CREATE_TABLE_ERROR} {chat_main_id}: {e}")
+            print(f"{DATABASE_MESSAGE.DATABASE_CHAT_DETAIL_CREATE_TABLE_ERROR} {e}")
 
-    def insert_chat_detail(self, chat_main_id, chat_type, chat_model, chat, elapsed_time, finish_reason):
-        chat_detail_table = f"{self.chat_detail_table_name}_{chat_main_id}"
+    def get_legacy_chat_detail_tables(self):
         query = QSqlQuery()
-        query.prepare(
-            f"INSERT INTO {chat_detail_table} (chat_main_id, chat_type, chat_model, chat, elapsed_time, finish_reason) "
-            f" VALUES (:chat_main_id, :chat_type, :chat_model, :chat, :elapsed_time, :finish_reason)")
-        query.bindValue(":chat_main_id", chat_main_id)
-        query.bindValue(":chat_type", chat_type)
-        query.bindValue(":chat_model", chat_model)
-        query.bindValue(":chat", chat)
-        query.bindValue(":elapsed_time", elapsed_time)
-        query.bindValue(":finish_reason", finish_reason)
+        query.prepare("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE :prefix")
+        query.bindValue(":prefix", f"{self.chat_detail_table_name}_%")
+        legacy_tables = []
+        if query.exec():
+            while query.next():
+                name = query.value(0)
+                chat_main_id = Utility.extract_number_from_end(name)
+                if chat_main_id is not None and name == f"{self.chat_detail_table_name}_{chat_main_id}":
+                    legacy_tables.append((chat_main_id, name))
+        return sorted(legacy_tables)
+
+    def migrate_chat_detail_tables(self):
+        """Fold the per-chat chat_detail_<id> tables of older databases into the single chat_detail table."""
+        legacy_tables = self.get_legacy_chat_detail_tables()
+        if not legacy_tables:
+            return
+
+        self.db.transaction()
         try:
-            return query.exec()
+            query = QSqlQuery()
+            for chat_main_id, table_name in legacy_tables:
+                insert_string = f"""
+                  INSERT INTO {self.chat_detail_table_name}
+                    (chat_main_id, chat_type, chat_model, chat, elapsed_time, finish_reason, created_at)
+                  SELECT {chat_main_id}, chat_type, chat_model, chat, elapsed_time, finish_reason, created_at
+                    FROM {table_name}
+                   WHERE EXISTS (SELECT 1 FROM {self.chat_main_table_name} WHERE id = {chat_main_id})
+                   ORDER BY id
+                 """
+                if not query.exec(insert_string):
+                    raise Exception(f"{table_name}: {query.lastError().text()}")
+                if not query.exec(f"DROP TABLE {table_name}"):
+                    raise Exception(f"{table_name}: {query.lastError().text()}")
+                logging.info(f"{DATABASE_MESSAGE.DATABASE_DELETE_TABLE_SUCCESS} {table_name}")
+            self.db.commit()
+            logging.info(f"{DATABASE_MESSAGE.DATABASE_CHAT_DETAIL_MIGRATE_SUCCESS} {len(legacy_tables)}")
         except Exception as e:
-            print(f"{DATABASE_MESSAGE.DATABASE_CHAT_DETAIL_INSERT_ERROR} {e}")
-            return False
+            self.db.rollback()
+            logging.error(f"{DATABASE_MESSAGE.DATABASE_CHAT_DETAIL_MIGRATE_ERROR} {e}")
+
+    def create_chat_detail_fts(self):
+        fts_table = self.chat_detail_fts_table_name
+        detail_table = self.chat_detail_table_name
+        query = QSqlQuery()
+        query.prepare("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name")
+        query.bindValue(":name", fts_table)
+        fts_exists = query.exec() and query.next()
+
+        query_strings = [
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table}
+              USING fts5(chat, content='{detail_table}', content_rowid='id')
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {fts_table}_insert AFTER INSERT ON {detail_table} BEGIN
+              INSERT INTO {fts_table} (rowid, chat) VALUES (new.id, new.chat);
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {fts_table}_delete AFTER DELETE ON {detail_table} BEGIN
+              INSERT INTO {fts_table} ({fts_table}, rowid, chat) VALUES ('delete', old.id, old.chat);
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {fts_table}_update AFTER UPDATE OF chat ON {detail_table} BEGIN
+              INSERT INTO {fts_table} ({fts_table}, rowid, chat) VALUES ('delete', old.id, old.chat);
+              INSERT INTO {fts_table} (rowid, chat) VALUES (new.id, new.chat);
+            END
+            """,
+        ]
+        if not fts_exists:
+            # Index the messages that were stored before the full-text table existed
+            query_strings.append(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+
+        try:
+            for query_string in query_strings:
+                if not query.exec(query_string):
+                    raise Exception(query.lastError().text())
+        except Exception as e:
+            print(f"{DATABASE_MESSAGE.DATABASE_CHAT_DETAIL_FTS_CREATE_ERROR} {e}")
+
+    @staticmethod
+    def to_fts_query(text):
+        # Quote every word so user input can never be parsed as FTS5 syntax; the last word matches as a prefix
+        words = re.findall(r'\w+', text or "")
+        if not words:
+            return ""
+        return " ".join(f'"{word}"' for word in words) + "*"
+
+    def search_messages(self, text, limit=Constants.MESSAGE_SEARCH_LIMIT):
+        fts_query = self.to_fts_query(text)
+        if not fts_query:
+            return []
+        self.flush()
+
+        fts_table = self.chat_detail_fts_table_name
+
+        # bm25 has to score every match, so only rank the newest MESSAGE_SEARCH_RANK_WINDOW matches.
+        # Walking the matches in rowid order is lazy, which keeps frequent words fast on large databases.
+        query = self.get_query(f"SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH :query "
+                               f"ORDER BY rowid DESC LIMIT 1 OFFSET :offset")
+        query.bindValue(":query", fts_query)
+        query.bindValue(":offset", Constants.MESSAGE_SEARCH_RANK_WINDOW - 1)
+        min_rowid = query.value(0) if query.exec() and query.next() else 0
+        query.finish()
+
+        query = self.get_query(f"""
+            SELECT d.id, d.chat_main_id, m.title, d.chat_type, d.created_at,
+                   snippet({fts_table}, 0, :match_start, :match_end, '...', {Constants.MESSAGE_SEARCH_SNIPPET_TOKENS})
+              FROM {fts_table}
+              JOIN {self.chat_detail_table_name} d ON d.id = {fts_table}.rowid
+              JOIN {self.chat_main_table_name} m ON m.id = d.chat_main_id
+             WHERE {fts_table} MATCH :query AND {fts_table}.rowid >= :min_rowid
+             ORDER BY rank
+             LIMIT :limit
+        """)
+        query.bindValue(":match_start", Constants.MESSAGE_SEARCH_MATCH_START)
+        query.bindValue(":match_end", Constants.MESSAGE_SEARCH_MATCH_END)
+        query.bindValue(":query", fts_query)
+        query.bindValue(":min_rowid", min_rowid)
+        query.bindValue(":limit", limit)
 
-    def delete_chat_detail(self, id):
         try:
-            query = QSqlQuery()
-            table_name = f"{self.chat_detail_table_name}_{id}"
-            query.prepare(f"DROP TABLE IF EXISTS {table_name}")
             if not query.exec():
-                raise Exception(query.lastError().text())
-            logging.info(f"{DATABASE_MESSAGE.DATABASE_DELETE_TABLE_SUCCESS} {table_name}")
+                print(f"{DATABASE_MESSAGE.DATABASE_CHAT_DETAIL_SEARCH_ERROR} {query.lastError().text()}")
+                return []
         except Exception as e:
-            logging.error(f"{DATABASE_MESSAGE.DATABASE_CHAT_DETAIL_DELETE_ERROR} {id}: {e}")
-            return False
-        return True
+            print(f"{DATABASE_MESSAGE.DATABASE_EXECUTE_QUERY_ERROR} {e}")
+            return []
+
+        results = []
+        while query.next():
+            results.append({
+                "id": query.value(0),
+                "chat_main_id": query.value(1),
+                "title": query.value(2),
+                "chat_type": query.value(3),
+                "created_at": query.value(4),
+                "snippet": query.value(5),
+            })
+        query.finish()
+        return results
+
+    def insert_chat_detail(self, chat_main_id, chat_type, chat_model, chat, elapsed_time, finish_reason):
+        """
+        Insert the row and return the id SQLite gave it, once the insert is committed.
+        The caller waits for that commit: the id orders the message in the ConversationStore and keys its trace.
+        """
+        try:
+            last_id, _ = self.writer.execute_and_wait(
+                f"INSERT INTO {self.chat_detail_table_name} "
+                f"(chat_main_id, chat_type, chat_model, chat, elapsed_time, finish_reason) "
+                f" VALUES (:chat_main_id, :chat_type, :chat_model, :chat, :elapsed_time, :finish_reason)",
+                {"chat_main_id": chat_main_id, "chat_type": chat_type,
+                 "chat_model": chat_model, "chat": chat,
+                 "elapsed_time": elapsed_time,
+                 "finish_reason": finish_reason})
+            return last_id
+        except Exception as e:
+            print(f"{DATABASE_MESSAGE.DATABASE_CHAT_DETAIL_INSERT_ERROR} {e}")
+        return None
 
     def get_all_chat_details_list(self, chat_main_id):
-        chat_detail_table = f"{self.chat_detail_table_name}_{chat_main_id}"
-        query = QSqlQuery()
-        query.prepare(f"SELECT * FROM {chat_detail_table}")
+        query = self.get_query(f"SELECT {self.CHAT_DETAIL_COLUMNS} FROM {self.chat_detail_table_name} "
+                               f"WHERE chat_main_id = :chat_main_id ORDER BY id")
+        query.bindValue(":chat_main_id", chat_main_id)
+        return self.fetch_chat_details(query, chat_main_id)
+
+    def get_chat_details_page(self, chat_main_id, before_id=None, limit=Constants.CHAT_DETAIL_PAGE_SIZE):
+        """Return up to `limit` chat details older than `before_id` (newest page when None), oldest first."""
+        before_condition = "AND id < :before_id" if before_id is not None else ""
+        query = self.get_query(f"SELECT {self.CHAT_DETAIL_COLUMNS} FROM {self.chat_detail_table_name} "
+                               f"WHERE chat_main_id = :chat_main_id {before_condition} ORDER BY id DESC LIMIT :limit")
+        query.bindValue(":chat_main_id", chat_main_id)
+        if before_id is not None:
+            query.bindValue(":before_id", before_id)
+        query.bindValue(":limit", limit)
+        chat_details_list = self.fetch_chat_details(query, chat_main_id)
+        chat_details_list.reverse()
+        return chat_details_list
 
+    def fetch_chat_details(self, query, chat_main_id):
+        self.flush()
         try:
             if not query.exec():
                 print(f"{DATABASE_MESSAGE.DATABASE_CHAT_DETAIL_FETCH_ERROR} {chat_main_id}: {query.lastError().text()}")
@@ -193,18 +395,256 @@ class SqliteDatabase:
             print(f"{DATABASE_MESSAGE.DATABASE_EXECUTE_QUERY_ERROR} {e}")
             return []
 
+        # Columns are read by position, in the order of CHAT_DETAIL_COLUMNS
         chat_details_list = []
         while query.next():
             chat_detail = {
-                "id": query.value("id"),
-                "chat_main_id": query.value("chat_main_id"),
-                "chat_type": query.value("chat_type"),
-                "chat_model": query.value("chat_model"),
-                "chat": query.value("chat"),
-                "elapsed_time": query.value("elapsed_time"),
-                "finish_reason": query.value("finish_reason"),
-                "created_at": query.value("created_at")
+                "id": query.value(0),
+                "chat_main_id": query.value(1),
+                "chat_type": query.value(2),
+                "chat_model": query.value(3),
+                "chat": query.value(4),
+                "elapsed_time": query.value(5),
+                "finish_reason": query.value(6),
+                "created_at": query.value(7)
             }
             chat_details_list.append(chat_detail)
+        query.finish()
 
         return chat_details_list
+
+    def create_chat_summary(self):
+        query = QSqlQuery()
+        query_string = f"""
+          CREATE TABLE IF NOT EXISTS {self.chat_summary_table_name}
+            (
+                chat_main_id INTEGER PRIMARY KEY,
+                last_chat_detail_id INTEGER NOT NULL,
+                summary TEXT NOT NULL,
+                token_count INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY(chat_main_id) REFERENCES {self.chat_main_table_name}(id) ON DELETE CASCADE
+            )
+         """
+        try:
+            if not query.exec(query_string):
+                raise Exception(query.lastError().text())
+        except Exception as e:
+            print(f"{DATABASE_MESSAGE.DATABASE_CHAT_SUMMARY_CREATE_TABLE_ERROR} {e}")
+
+    def get_chat_summary(self, chat_main_id):
+        self.flush()
+        query = self.get_query(f"SELECT last_chat_detail_id, summary, token_count FROM {self.chat_summary_table_name} "
+                               f"WHERE chat_main_id = :chat_main_id")
+        query.bindValue(":chat_main_id", chat_main_id)
+        try:
+            if query.exec() and query.next():
+                return {
+                    "last_chat_detail_id": query.value(0),
+                    "summary": query.value(1),
+                    "token_count": query.value(2),
+                }
+        except Exception as e:
+            print(f"{DATABASE_MESSAGE.DATABASE_CHAT_SUMMARY_FETCH_ERROR} {chat_main_id}: {e}")
+        finally:
+            query.finish()
+        return None
+
+    def save_chat_summary(self, chat_main_id, last_chat_detail_id, summary, token_count):
+        try:
+            self.writer.execute(f"INSERT OR REPLACE INTO {self.chat_summary_table_name} "
+                                f"(chat_main_id, last_chat_detail_id, summary, token_count) "
+                                f"VALUES (:chat_main_id, :last_chat_detail_id, :summary, :token_count)",
+                                {"chat_main_id": chat_main_id, "last_chat_detail_id": last_chat_detail_id,
+                                 "summary": summary, "token_count": token_count})
+            return True
+        except Exception as e:
+            print(f"{DATABASE_MESSAGE.DATABASE_CHAT_SUMMARY_SAVE_ERROR} {chat_main_id}: {e}")
+        return False
+
+    def create_chat_trace(self):
+        # The columns hold the figures that are worth aggregating; the whole trace is kept as JSON
+        query = QSqlQuery()
+        query_string = f"""
+          CREATE TABLE IF NOT EXISTS {self.chat_trace_table_name}
+            (
+                chat_detail_id INTEGER PRIMARY KEY,
+                agent TEXT,
+                ttft REAL,
+                tokens_per_second REAL,
+                prompt_tokens INTEGER,
+                completion_tokens INTEGER,
+                search_count INTEGER,
+                search_time REAL,
+                handoff_count INTEGER,
+                trace TEXT NOT NULL,
+                FOREIGN KEY(chat_detail_id) REFERENCES {self.chat_detail_table_name}(id) ON DELETE CASCADE
+            )
+         """
+        try:
+            if not query.exec(query_string):
+                raise Exception(query.lastError().text())
+        except Exception as e:
+            print(f"{DATABASE_MESSAGE.DATABASE_CHAT_TRACE_CREATE_TABLE_ERROR} {e}")
+
+    def save_chat_trace(self, chat_detail_id, trace):
+        usage = trace.get('usage') or {}
+        try:
+            self.writer.execute(f"INSERT OR REPLACE INTO {self.chat_trace_table_name} "
+                                f"(chat_detail_id, agent, ttft, tokens_per_second, prompt_tokens, completion_tokens, "
+                                f"search_count, search_time, handoff_count, trace) "
+                                f"VALUES (:chat_detail_id, :agent, :ttft, :tokens_per_second, :prompt_tokens, "
+                                f":completion_tokens, :search_count, :search_time, :handoff_count, :trace)",
+                                {"chat_detail_id": chat_detail_id, "agent": trace.get('agent'),
+                                 "ttft": trace.get('ttft'), "tokens_per_second": trace.get('tokens_per_second'),
+                                 "prompt_tokens": usage.get('prompt_tokens'),
+                                 "completion_tokens": usage.get('completion_tokens'),
+                                 "search_count": len(trace.get('searches', [])),
+                                 "search_time": trace.get('search_time'),
+                                 "handoff_count": len(trace.get('handoffs', [])),
+                                 "trace": json.dumps(trace)})
+            return True
+        except Exception as e:
+            print(f"{DATABASE_MESSAGE.DATABASE_CHAT_TRACE_SAVE_ERROR} {chat_detail_id}: {e}")
+        return False
+
+    def create_run_stats(self):
+        """
+        Daily totals of the agent runs per model and agent, kept up to date by add_run_stats().
+        The dashboard reads only this table, so its queries do not depend on the number of messages.
+        """
+        query = QSqlQuery()
+        query.prepare("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name")
+        query.bindValue(":name", self.run_stats_table_name)
+        exists = query.exec() and query.next()
+        query.finish()
+
+        columns = ", ".join(f"{column} {'REAL' if column in self.RUN_STATS_REAL_COLUMNS else 'INTEGER'} "
+                            f"DEFAULT 0 NOT NULL" for column in self.RUN_STATS_COLUMNS)
+        query_string = f"""
+          CREATE TABLE IF NOT EXISTS {self.run_stats_table_name}
+            (
+                day TEXT NOT NULL,
+                model TEXT NOT NULL,
+                agent TEXT NOT NULL,
+                {columns},
+                PRIMARY KEY (day, model, agent)
+            )
+         """
+        try:
+            if not query.exec(query_string):
+                raise Exception(query.lastError().text())
+        except Exception as e:
+            print(f"{DATABASE_MESSAGE.DATABASE_RUN_STATS_CREATE_TABLE_ERROR} {e}")
+            return
+        if not exists:
+            self.backfill_run_stats()
+
+    def backfill_run_stats(self):
+        """Fill a new run_stats table from the answers stored so far; failed runs were never stored."""
+        elapsed_time = "CAST(d.elapsed_time AS REAL)"
+        completed = f"d.finish_reason = '{Constants.NORMAL_STOP}'"
+        edges = [None] + Constants.RUN_STATS_LATENCY_BUCKETS + [None]
+        latency_sums = []
+        for lower, upper in zip(edges, edges[1:]):
+            conditions = [completed]
+            if lower is not None:
+                conditions.append(f"{elapsed_time} >= {lower}")
+            if upper is not None:
+                conditions.append(f"{elapsed_time} < {upper}")
+            latency_sums.append(f"TOTAL({' AND '.join(conditions)})")
+        query_string = f"""
+          INSERT INTO {self.run_stats_table_name}
+            (day, model, agent, {", ".join(self.RUN_STATS_COLUMNS)})
+          SELECT date(d.created_at, 'localtime'), COALESCE(d.chat_model, ''), COALESCE(t.agent, ''),
+                 COUNT(*), 0, TOTAL(d.finish_reason = '{Constants.FORCE_STOP}'),
+                 TOTAL(CASE WHEN {completed} THEN {elapsed_time} END),
+                 TOTAL(t.ttft), COUNT(t.ttft), TOTAL(t.tokens_per_second), COUNT(t.tokens_per_second),
+                 TOTAL(t.completion_tokens), TOTAL(t.search_count > 0), TOTAL(t.search_count), TOTAL(t.search_time),
+                 {", ".join(latency_sums)}
+            FROM {self.chat_detail_table_name} d
+            LEFT JOIN {self.chat_trace_table_name} t ON t.chat_detail_id = d.id
+           WHERE d.chat_type = :chat_type
+           GROUP BY 1, 2, 3
+         """
+        query = QSqlQuery()
+        query.prepare(query_string)
+        query.bindValue(":chat_type", ChatType.AI.value)
+        if query.exec():
+            logging.info(f"{DATABASE_MESSAGE.DATABASE_RUN_STATS_BACKFILL_SUCCESS} {query.numRowsAffected()}")
+        else:
+            logging.error(f"{DATABASE_MESSAGE.DATABASE_RUN_STATS_BACKFILL_ERROR} {query.lastError().text()}")
+
+    def add_run_stats(self, model, agent, finish_reason, elapsed_time, trace=None):
+        """Add one finished, stopped or failed run to the totals of its day."""
+        trace = trace or {}
+        usage = trace.get('usage') or {}
+        searches = trace.get('searches') or []
+        completed = finish_reason == Constants.NORMAL_STOP
+        values = dict.fromkeys(self.RUN_STATS_COLUMNS, 0)
+        values.update({
+            "runs": 1,
+            "errors": int(finish_reason == Constants.ERROR_STOP),
+            "force_stops": int(finish_reason == Constants.FORCE_STOP),
+            "elapsed_time": elapsed_time if completed else 0,
+            "ttft": trace.get('ttft') or 0,
+            "ttft_runs": int(trace.get('ttft') is not None),
+            "tokens_per_second": trace.get('tokens_per_second') or 0,
+            "tokens_per_second_runs": int(trace.get('tokens_per_second') is not None),
+            "completion_tokens": usage.get('completion_tokens') or 0,
+            "search_runs": int(bool(searches)),
+            "search_count": len(searches),
+            "search_time": trace.get('search_time') or 0,
+        })
+        # Only answers that finished normally count towards the latency distribution
+        if completed:
+            bucket = bisect.bisect_right(Constants.RUN_STATS_LATENCY_BUCKETS, elapsed_time)
+            values[self.RUN_STATS_LATENCY_COLUMNS[bucket]] = 1
+        values.update({"day": time.strftime("%Y-%m-%d"), "model": model or "", "agent": agent or ""})
+
+        columns = ", ".join(self.RUN_STATS_COLUMNS)
+        parameters = ", ".join(f":{column}" for column in self.RUN_STATS_COLUMNS)
+        updates = ", ".join(f"{column} = {column} + excluded.{column}" for column in self.RUN_STATS_COLUMNS)
+        try:
+            self.writer.execute(f"INSERT INTO {self.run_stats_table_name} (day, model, agent, {columns}) "
+                                f"VALUES (:day, :model, :agent, {parameters}) "
+                                f"ON CONFLICT (day, model, agent) DO UPDATE SET {updates}", values)
+            return True
+        except Exception as e:
+            print(f"{DATABASE_MESSAGE.DATABASE_RUN_STATS_SAVE_ERROR} {e}")
+        return False
+
+    def get_run_stats(self, group_by, since_day, model=None, agent=None):
+        """Return the run totals since since_day (YYYY-MM-DD) grouped by day, model or agent."""
+        if group_by not in self.RUN_STATS_GROUPS:
+            raise ValueError(group_by)
+        self.flush()
+        conditions = ["day >= :since_day"]
+        if model is not None:
+            conditions.append("model = :model")
+        if agent is not None:
+            conditions.append("agent = :agent")
+        sums = ", ".join(f"TOTAL({column})" for column in self.RUN_STATS_COLUMNS)
+        query = self.get_query(f"SELECT {group_by}, {sums} FROM {self.run_stats_table_name} "
+                               f"WHERE {' AND '.join(conditions)} GROUP BY {group_by} ORDER BY {group_by}")
+        query.bindValue(":since_day", since_day)
+        if model is not None:
+            query.bindValue(":model", model)
+        if agent is not None:
+            query.bindValue(":agent", agent)
+
+        run_stats = []
+        try:
+            if not query.exec():
+                print(f"{DATABASE_MESSAGE.DATABASE_RUN_STATS_FETCH_ERROR} {query.lastError().text()}")
+                return run_stats
+            while query.next():
+                row = {group_by: query.value(0)}
+                for index, column in enumerate(self.RUN_STATS_COLUMNS, 1):
+                    row[column] = query.value(index)
+                run_stats.append(row)
+        except Exception as e:
+            print(f"{DATABASE_MESSAGE.DATABASE_RUN_STATS_FETCH_ERROR} {e}")
+        finally:
+            query.finish()
+        return run_stats
@@ -0,0 +1,81 @@
+from PyQt6.QtGui import QIcon, QPixmap
+from PyQt6.QtWidgets import QApplication
+
+from util.Constants import UI
+from util.SettingsManager import SettingsManager
+from util.Utility import Utility
+
+
+class StyleManager:
+    """
+    Icons, pixmaps and the application stylesheet, built once and shared by all widgets.
+
+    Icon files are looked up and loaded the first time they are asked for; painting code gets ready-made
+    pixmaps. Widgets are styled through object names in one stylesheet set on the application, which is only
+    generated again when the settings have changed.
+    """
+    __icons = {}
+    __pixmaps = {}
+    __style_sheet_version = None
+
+    @classmethod
+    def get_icon(cls, icon, folder='ico') -> QIcon:
+        key = (folder, icon)
+        if key not in cls.__icons:
+            cls.__icons[key] = QIcon(Utility.get_icon_path(folder, icon))
+        return cls.__icons[key]
+
+    @classmethod
+    def get_pixmap(cls, icon, size, folder='ico') -> QPixmap:
+        key = (folder, icon, size)
+        if key not in cls.__pixmaps:
+            cls.__pixmaps[key] = cls.get_icon(icon, folder).pixmap(size, size)
+        return cls.__pixmaps[key]
+
+    @classmethod
+    def apply_style_sheet(cls):
+        app = QApplication.instance()
+        if app is None or cls.__style_sheet_version == SettingsManager.get_version():
+            return
+        app.setStyleSheet(cls.build_style_sheet())
+        # Reading missing settings stores their defaults, which changes the version once more
+        cls.__style_sheet_version = SettingsManager.get_version()
+
+    @staticmethod
+    def build_style_sheet():
+        model_color = Utility.get_settings_value(section="Info_Label_Style", prop="model-color",
+                                                 default="green",
+                                                 save=True)
+        elapsed_time_color = Utility.get_settings_value(section="Info_Label_Style", prop="elapsedtime-color",
+                                                        default="orange",
+                                                        save=True)
+        finish_reason_color = Utility.get_settings_value(section="Info_Label_Style", prop="finishreason-color",
+                                                         default="blue",
+                                                         save=True)
+        trace_color = Utility.get_settings_value(section="Info_Label_Style", prop="trace-color",
+                                                 default="purple",
+                                                 save=True)
+        text_color = Utility.get_settings_value(section="Common_Label_Style", prop="color",
+                                                default="#000000",
+                                                save=True)
+        return f"""
+            QLabel#model_label {{
+                color: {model_color};
+            }}
+            QLabel#elapsed_time_label {{
+                color: {elapsed_time_color};
+            }}
+            QLabel#finish_reason_label {{
+                color: {finish_reason_color};
+            }}
+            QLabel#finish_reason_label[force_stop="true"] {{
+                color: red;
+            }}
+            QLabel#trace_label {{
+                color: {trace_color};
+            }}
+            QTextBrowser#chat_text_view {{
+                color: {text_color};
+            }}
+            {UI.PROGRESS_BAR_STYLE}
+            """
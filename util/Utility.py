@@ -32,60 +32,39 @@ class Utility:
 
     @staticmethod
     def get_settings_value(section: str, prop: str, default: str, save: bool) -> str:
-        settings = SettingsManager.get_settings()
-        settings.beginGroup(section)
-
-        value = settings.value(prop, None)
+        value = SettingsManager.get_value(f"{section}/{prop}")
 
         if value is None:
             if save:
-                settings.setValue(prop, default)
-                settings.sync()
+                SettingsManager.set_value(f"{section}/{prop}", default)
             value = default
 
-        settings.endGroup()
         return value
 
     @staticmethod
     def get_system_value(section: str, prefix: str, default: str, length: int) -> dict:
-        settings = SettingsManager.get_settings()
-
-        if section not in settings.childGroups():
-            settings.beginGroup(section)
+        if not SettingsManager.get_group(section):
             for i in range(1, length + 1):
-                settings.setValue(f"{prefix}{i}", default)
-            settings.endGroup()
+                SettingsManager.set_value(f"{section}/{prefix}{i}", default)
 
-        settings.beginGroup(section)
-        values = {f"{prefix}{i}": settings.value(f"{prefix}{i}", default) for i in range(1, length + 1)}
-        settings.endGroup()
+        return {f"{prefix}{i}": SettingsManager.get_value(f"{section}/{prefix}{i}", default)
+                for i in range(1, length + 1)}
 
-        return values
+    @staticmethod
+    def get_tavily_domain_list(domain_type):
+        domains = SettingsManager.get_group(f"Tavily_{domain_type}_Domain_List")
+        # Values read back from the file are strings
+        return [domain for domain, value in domains.items() if value in (True, 'true', 'True')]
 
     @staticmethod
     def add_tavily_model_list(domain_list, domain_type):
-        settings = SettingsManager.get_settings()
-        settings.beginGroup(f"Tavily_{domain_type}_Domain_List")
-
-        if domain_list and domain_type == 'Include':
+        if domain_list and domain_type in ('Include', 'Exclude'):
             for domain in domain_list:
-                settings.setValue(domain, True)
-
-        if domain_list and domain_type == 'Exclude':
-            for domain in domain_list:
-                settings.setValue(domain, True)
-
-        settings.endGroup()
+                SettingsManager.set_value(f"Tavily_{domain_type}_Domain_List/{domain}", True)
 
     @staticmethod
     def remove_tavily_model_list(domain, domain_type):
-        settings = SettingsManager.get_settings()
-        settings.beginGroup(f"Tavily_{domain_type}_Domain_List")
-
-        if settings.contains(domain):
-            settings.remove(domain)
-
-        settings.endGroup()
+        SettingsManager.remove_value(f"Tavily_{domain_type}_Domain_List/{domain}")
 
     @staticmethod
     def extract_number_from_end(name):